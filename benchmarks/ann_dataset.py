@@ -0,0 +1,157 @@
+"""
+Shared ANN benchmark datasets: memory-mapped vectors plus exact ground truth.
+
+A dataset is a directory holding
+
+    base.npy     (n, dim) float32, L2-normalized, opened with mmap_mode="r"
+    queries.npy  (q, dim) float32, L2-normalized
+    truth.npy    (q, k)   int64 ids of the exact cosine top-k
+    meta.json    sizes, seed and source
+
+Every backend is benchmarked against the same files, so recall numbers are
+comparable across backends and across runs. Build one with
+
+    python benchmarks/ann_dataset.py --out data/clustered-100k --vectors 100000 --dim 384
+    python benchmarks/ann_dataset.py --out data/my-corpus --base base.npy --query-file q.npy
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+
+def _normalize(x):
+    return x / np.maximum(np.linalg.norm(x, axis=1, keepdims=True), 1e-12)
+
+
+def clustered_chunks(n, dim, clusters=256, chunk_size=50_000, seed=0):
+    """
+    Yield float32 chunks of normalized vectors around `clusters` random centroids.
+    Clustered data gives ANN indexes realistic structure; uniform noise does not.
+    """
+    rng = np.random.default_rng(seed)
+    centroids = _normalize(rng.standard_normal((clusters, dim)).astype(np.float32))
+    for start in range(0, n, chunk_size):
+        size = min(chunk_size, n - start)
+        labels = rng.integers(0, clusters, size)
+        noise = rng.standard_normal((size, dim)).astype(np.float32) * (0.6 / np.sqrt(dim))
+        yield _normalize(centroids[labels] + noise).astype(np.float32)
+
+
+def exact_top_k(base, queries, k, chunk_size=100_000):
+    """
+    Exact cosine top-k ids of normalized `queries` over a (memory-mapped) `base`,
+    scanned in chunks so the corpus never has to fit in RAM.
+    """
+    best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    best_ids = np.zeros((len(queries), k), dtype=np.int64)
+    for start in range(0, len(base), chunk_size):
+        chunk = np.asarray(base[start:start + chunk_size], dtype=np.float32)
+        scores = queries @ chunk.T
+        top = min(k, scores.shape[1])
+        part = np.argpartition(-scores, top - 1, axis=1)[:, :top]
+        merged_scores = np.concatenate([best_scores, np.take_along_axis(scores, part, axis=1)], axis=1)
+        merged_ids = np.concatenate([best_ids, part + start], axis=1)
+        order = np.argsort(-merged_scores, axis=1)[:, :k]
+        best_scores = np.take_along_axis(merged_scores, order, axis=1)
+        best_ids = np.take_along_axis(merged_ids, order, axis=1)
+    return best_ids
+
+
+def build_dataset(out, vectors=100_000, dim=384, queries=1_000, k=100, seed=0, base=None, query_file=None):
+    """
+    Write base/queries/truth/meta to `out`. Synthetic clustered vectors by default;
+    pass `base` (and optionally `query_file`) .npy paths to use an existing corpus.
+    """
+    os.makedirs(out, exist_ok=True)
+    started = time.perf_counter()
+    if base:
+        source = np.load(base, mmap_mode="r")
+        vectors, dim = source.shape
+        stored = np.lib.format.open_memmap(os.path.join(out, "base.npy"), "w+", np.float32, (vectors, dim))
+        for start in range(0, vectors, 50_000):
+            stored[start:start + 50_000] = _normalize(np.asarray(source[start:start + 50_000], dtype=np.float32))
+        if query_file:
+            query_vectors = _normalize(np.load(query_file).astype(np.float32))
+        else:
+            # Held-out style queries: perturbed copies of random corpus vectors
+            rng = np.random.default_rng(seed)
+            picks = np.sort(rng.choice(vectors, queries, replace=False))
+            query_vectors = _normalize(stored[picks] + rng.standard_normal((queries, dim)).astype(np.float32) * 0.05)
+    else:
+        stored = np.lib.format.open_memmap(os.path.join(out, "base.npy"), "w+", np.float32, (vectors, dim))
+        chunks = clustered_chunks(vectors + queries, dim, seed=seed)
+        offset, query_parts = 0, []
+        for chunk in chunks:
+            # The first `vectors` rows form the corpus, the rest are queries from the same distribution
+            take = max(0, min(len(chunk), vectors - offset))
+            stored[offset:offset + take] = chunk[:take]
+            query_parts.append(chunk[take:])
+            offset += take
+        query_vectors = np.concatenate(query_parts)[:queries]
+    stored.flush()
+    np.save(os.path.join(out, "queries.npy"), query_vectors.astype(np.float32))
+
+    truth = exact_top_k(np.load(os.path.join(out, "base.npy"), mmap_mode="r"), query_vectors, k)
+    np.save(os.path.join(out, "truth.npy"), truth)
+    meta = {"vectors": int(vectors), "dim": int(dim), "queries": len(query_vectors), "k": int(k),
+            "metric": "cosine", "seed": seed, "source": os.path.abspath(base) if base else "clustered"}
+    with open(os.path.join(out, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    print(f"📦 {out}: {vectors:,} x {dim} base, {len(query_vectors):,} queries, "
+          f"top-{k} ground truth in {time.perf_counter() - started:.1f}s")
+    return meta
+
+
+class Dataset:
+    """
+    Read-only view of a dataset directory; `base` is memory-mapped.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.base = np.load(os.path.join(path, "base.npy"), mmap_mode="r")
+        self.queries = np.load(os.path.join(path, "queries.npy"))
+        self.truth = np.load(os.path.join(path, "truth.npy"))
+
+    @property
+    def dim(self):
+        return self.base.shape[1]
+
+    def batches(self, batch_size):
+        """
+        Yield (ids, vectors) batches of the base set, read lazily from the memmap.
+        """
+        for start in range(0, len(self.base), batch_size):
+            vectors = np.asarray(self.base[start:start + batch_size])
+            yield np.arange(start, start + len(vectors)), vectors
+
+    def recall(self, results, k):
+        """
+        Mean recall@k of per-query result id lists against the ground truth.
+        """
+        hits = [len(set(map(int, found[:k])) & set(expected[:k].tolist())) for found, expected in zip(results, self.truth)]
+        return float(np.mean(hits)) / k
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a shared ANN benchmark dataset")
+    parser.add_argument("--out", required=True, help="Dataset directory")
+    parser.add_argument("--vectors", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("-k", type=int, default=100, help="Ground-truth depth (>= the k you benchmark)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--base", help="Existing (n, dim) .npy corpus instead of synthetic vectors")
+    parser.add_argument("--query-file", help="Existing (q, dim) .npy queries (with --base)")
+    args = parser.parse_args()
+    build_dataset(args.out, args.vectors, args.dim, args.queries, args.k, args.seed, args.base, args.query_file)
+
+
+if __name__ == "__main__":
+    main()
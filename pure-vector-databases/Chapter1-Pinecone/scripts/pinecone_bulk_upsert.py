@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# 🚚 Size-aware parallel bulk upsert for Pinecone
+"""
+Upload large NumPy embedding matrices to a Pinecone index:
+- Split rows into batches bounded by both vector count and serialized payload size
+- Send batches concurrently from a thread pool with a bounded number in flight
+- Retry throttled / transient failures with exponential backoff and jitter
+- Report vectors/sec
+
+Works with any object exposing `upsert(vectors=..., namespace=...)`: the
+Pinecone SDK `Index`, or the `RestIndex` client from pinecone_mock_server.py.
+"""
+
+import json
+import random
+import time
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+
+# Pinecone data-plane limits for a single upsert request
+MAX_BATCH_VECTORS = 1000
+MAX_BATCH_BYTES = 2 * 1024 * 1024
+
+# HTTP statuses worth retrying: throttling and transient server errors
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# Failures without an HTTP status worth retrying: refused/reset connections and
+# timeouts, from urllib (RestIndex) or urllib3 (the Pinecone SDK)
+TRANSIENT_ERRORS = (ConnectionError, TimeoutError, urllib.error.URLError)
+try:
+    from urllib3 import exceptions as urllib3_exceptions
+    TRANSIENT_ERRORS += (urllib3_exceptions.ProtocolError, urllib3_exceptions.TimeoutError,
+                         urllib3_exceptions.NewConnectionError, urllib3_exceptions.MaxRetryError)
+except ImportError:
+    pass
+
+
+def _row_sizes(embeddings, metadata, ids):
+    """
+    Estimate the JSON size of every row without serializing all vectors.
+    Vector size is measured on a sample (float reprs vary little in length);
+    ids and metadata are measured exactly.
+    """
+    if not len(embeddings):
+        return np.zeros(0, dtype=np.int64)
+    sample = embeddings[np.linspace(0, len(embeddings) - 1, num=min(32, len(embeddings)), dtype=int)]
+    vector_bytes = int(max(len(json.dumps(row.tolist())) for row in sample) * 1.1)
+    overhead = len('{"id":"","values":,"metadata":},')
+    sizes = np.full(len(embeddings), vector_bytes + overhead, dtype=np.int64)
+    sizes += np.fromiter((len(str(i)) for i in ids), dtype=np.int64, count=len(ids))
+    if metadata is not None:
+        sizes += np.fromiter((len(json.dumps(md)) for md in metadata), dtype=np.int64, count=len(metadata))
+    return sizes
+
+
+def plan_batches(embeddings, ids, metadata=None, max_vectors=MAX_BATCH_VECTORS, max_bytes=MAX_BATCH_BYTES):
+    """
+    Return (start, stop) row ranges such that every batch stays under both
+    the vector-count and payload-size limits.
+    """
+    sizes = _row_sizes(embeddings, metadata, ids)
+    if not len(sizes):
+        return []
+    if sizes.max() > max_bytes:
+        raise ValueError(f"A single vector (~{sizes.max()} bytes) exceeds the {max_bytes}-byte request limit")
+
+    bounds, start, total = [], 0, 0
+    for i, size in enumerate(sizes):
+        if i - start >= max_vectors or total + size > max_bytes:
+            bounds.append((start, i))
+            start, total = i, 0
+        total += size
+    bounds.append((start, len(sizes)))
+    return bounds
+
+
+def _is_retryable(exc):
+    status = getattr(exc, "status", None) or getattr(exc, "status_code", None)
+    if status is not None:
+        return int(status) in RETRYABLE_STATUSES
+    # No status: retry only when the request never got an answer, never on bugs
+    # such as TypeError/KeyError
+    return isinstance(exc, TRANSIENT_ERRORS)
+
+
+def with_retries(call, max_retries=5, backoff=0.5):
+    """
+    Run `call()`, retrying throttled / transient failures with exponential
+    backoff and jitter. Returns (result, retry count).
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return call(), attempt
+        except Exception as exc:
+            if attempt == max_retries or not _is_retryable(exc):
+                raise
+            time.sleep(backoff * (2 ** attempt) * (0.5 + random.random()))
+
+
+def _send_batch(index, namespace, ids, embeddings, metadata, start, stop, max_retries, backoff):
+    """
+    Upsert one batch, retrying transient failures. Returns the retry count.
+    """
+    values = embeddings[start:stop].tolist()  # One C-level conversion per batch
+    vectors = [
+        {"id": str(ids[i]), "values": values[i - start], **({"metadata": metadata[i]} if metadata is not None else {})}
+        for i in range(start, stop)
+    ]
+    _, retries = with_retries(lambda: index.upsert(vectors=vectors, namespace=namespace), max_retries, backoff)
+    return retries
+
+
+def bulk_upsert(index, ids, embeddings, metadata=None, namespace="",
+                max_batch_vectors=MAX_BATCH_VECTORS, max_batch_bytes=MAX_BATCH_BYTES,
+                max_in_flight=8, max_retries=5, backoff=0.5):
+    """
+    Upsert an (n, dim) embedding matrix with optional per-row metadata.
+
+    Batches are planned by count and size, then sent from a thread pool that
+    keeps at most `max_in_flight` requests outstanding. Returns a stats dict.
+    """
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    if len(ids) != len(embeddings) or (metadata is not None and len(metadata) != len(embeddings)):
+        raise ValueError("ids, embeddings and metadata must have the same length")
+
+    bounds = plan_batches(embeddings, ids, metadata, max_batch_vectors, max_batch_bytes)
+    args = (index, namespace, ids, embeddings, metadata)
+
+    retries = 0
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        pending = set()
+        for start, stop in bounds:
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                retries += sum(f.result() for f in done)
+            pending.add(executor.submit(_send_batch, *args, start, stop, max_retries, backoff))
+        retries += sum(f.result() for f in wait(pending).done)
+    elapsed = time.perf_counter() - started
+
+    stats = {
+        "vectors": len(embeddings),
+        "batches": len(bounds),
+        "retries": retries,
+        "seconds": elapsed,
+        "vectors_per_sec": len(embeddings) / elapsed if elapsed > 0 else float("inf"),
+    }
+    print(f"✅ Upserted {stats['vectors']} vectors in {stats['batches']} batches "
+          f"({stats['vectors_per_sec']:.0f} vectors/sec, {retries} retries) into namespace '{namespace}'.")
+    return stats
+
+
+def main():
+    """
+    Benchmark serial vs parallel bulk upsert against the local mock data
+    plane (default) or a real index host.
+    """
+    import argparse
+    from pinecone_mock_server import RestIndex, start_mock_server
+
+    parser = argparse.ArgumentParser(description="Pinecone bulk upsert throughput benchmark")
+    parser.add_argument("--vectors", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--in-flight", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--host", help="Real index host; defaults to an in-process mock")
+    parser.add_argument("--api-key", default="mock")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock per-request latency (s)")
+    parser.add_argument("--throttle-rate", type=float, default=0.05, help="Mock 429 probability")
+    args = parser.parse_args()
+
+    server = None
+    if args.host:
+        index, host = RestIndex(args.host, args.api_key), args.host
+    else:
+        server, state, host = start_mock_server(latency=args.latency, throttle_rate=args.throttle_rate)
+        index = RestIndex(host)
+    print(f"🚀 Bulk upsert benchmark against {host}")
+
+    rng = np.random.default_rng(0)
+    embeddings = rng.random((args.vectors, args.dim), dtype=np.float32)
+    ids = [f"vec-{i}" for i in range(args.vectors)]
+    genres = ["comedy", "thriller", "drama"]
+    metadata = [{"genre": genres[i % 3], "year": 2000 + i % 25} for i in range(args.vectors)]
+
+    for in_flight in args.in_flight:
+        namespace = f"bench-{in_flight}"
+        stats = bulk_upsert(index, ids, embeddings, metadata, namespace=namespace,
+                            max_in_flight=in_flight, backoff=0.05)
+        # The stats call is throttled like any other request
+        index_stats, _ = with_retries(index.describe_index_stats, backoff=0.05)
+        count = index_stats["namespaces"].get(namespace, {}).get("vectorCount")
+        print(f"  • in-flight={in_flight:<3} {stats['vectors_per_sec']:>9.0f} vectors/sec, "
+              f"{stats['batches']} batches, {stats['retries']} retries, stored={count}")
+
+    if server is not None:
+        print(f"🧪 Mock served {state.requests} requests ({state.throttled} throttled)")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+# 🧮 In-process exact-search engine with Pinecone's upsert/query/filter surface
+"""
+An offline stand-in for a Pinecone index:
+- Same upsert / query / describe_index_stats / delete surface, per namespace
+- Exact cosine, euclidean and dotproduct scoring by vectorized brute force
+  over a contiguous float32 matrix, with argpartition top-k selection
+- Metadata filters ($eq/$ne/$in/$nin/$gt/$gte/$lt/$lte/$exists, $and/$or)
+  evaluated through per-field indexes: row-id sets (bitmaps) for strings and
+  booleans, sorted columns for numbers
+
+Use it as a fast test double, or as a recall oracle: exact_top_k gives the
+ground truth an ANN index should be measured against.
+"""
+
+import numbers
+
+import numpy as np
+
+METRICS = ("cosine", "euclidean", "dotproduct")
+
+
+def _is_number(value):
+    """
+    True for ints and floats, NumPy scalars included; booleans are categorical.
+    """
+    return isinstance(value, numbers.Real) and not isinstance(value, (bool, np.bool_))
+
+
+class _FieldIndex:
+    """
+    Index over one metadata field.
+
+    Strings and booleans map each value to the set of rows holding it; numbers
+    live in a float64 column (NaN where absent) whose argsort is rebuilt
+    lazily after writes, so range filters become two binary searches.
+    """
+
+    def __init__(self):
+        self.values = {}     # categorical value -> set of rows
+        self.column = np.full(0, np.nan)
+        self._order = None   # argsort of column, None when stale
+
+    def add(self, row, value):
+        for item in value if isinstance(value, list) else [value]:
+            if _is_number(item):
+                self._grow(row + 1)
+                self.column[row] = item
+                self._order = None
+            else:
+                self.values.setdefault(item, set()).add(row)
+
+    def remove(self, row, value):
+        for item in value if isinstance(value, list) else [value]:
+            if _is_number(item):
+                self.column[row] = np.nan
+                self._order = None
+            else:
+                self.values.get(item, set()).discard(row)
+
+    def _grow(self, size):
+        if len(self.column) < size:
+            grown = np.full(max(size, 2 * len(self.column)), np.nan)
+            grown[:len(self.column)] = self.column
+            self.column = grown
+
+    def _sorted(self):
+        if self._order is None:
+            present = np.flatnonzero(~np.isnan(self.column))
+            self._order = present[np.argsort(self.column[present], kind="stable")]
+            self._sorted_values = self.column[self._order]
+        return self._order, self._sorted_values
+
+    def range_rows(self, low=-np.inf, high=np.inf, low_inclusive=True, high_inclusive=True):
+        order, values = self._sorted()
+        start = np.searchsorted(values, low, side="left" if low_inclusive else "right")
+        stop = np.searchsorted(values, high, side="right" if high_inclusive else "left")
+        return order[start:stop]
+
+    def equal_rows(self, value):
+        if _is_number(value):
+            return self.range_rows(value, value)
+        return np.fromiter(self.values.get(value, ()), dtype=np.int64)
+
+    def present_rows(self):
+        rows = set().union(*self.values.values()) if self.values else set()
+        rows.update(self._sorted()[0].tolist())
+        return np.fromiter(rows, dtype=np.int64)
+
+
+class _Namespace:
+    """
+    Vectors of one namespace in a contiguous, capacity-doubling float32 matrix.
+    Deleted or overwritten rows are masked out via `alive`.
+    """
+
+    def __init__(self, dimension, metric):
+        self.metric = metric
+        self.matrix = np.zeros((16, dimension), dtype=np.float32)
+        self.sq_norms = np.zeros(16, dtype=np.float32)
+        self.alive = np.zeros(16, dtype=bool)
+        self.ids = []
+        self.metadata = []
+        self.row_of = {}
+        self.fields = {}
+
+    @property
+    def count(self):
+        return len(self.row_of)
+
+    def upsert(self, ids, embeddings, metadata):
+        n = len(ids)
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        size = len(self.ids)
+        if size + n > len(self.matrix):
+            capacity = max(size + n, 2 * len(self.matrix))
+            for name in ("matrix", "sq_norms", "alive"):
+                old = getattr(self, name)
+                grown = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+                grown[:size] = old[:size]
+                setattr(self, name, grown)
+
+        rows = np.arange(size, size + n)
+        for doc_id in ids:
+            if doc_id in self.row_of:
+                self._retire(self.row_of[doc_id])
+        if self.metric == "cosine":
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.where(norms == 0, 1, norms)
+        self.matrix[rows] = embeddings
+        self.sq_norms[rows] = np.einsum("ij,ij->i", embeddings, embeddings)
+        self.alive[rows] = True
+        for row, doc_id, md in zip(rows.tolist(), ids, metadata):
+            self.ids.append(doc_id)
+            self.metadata.append(md)
+            self.row_of[doc_id] = row
+            for field, value in md.items():
+                self.fields.setdefault(field, _FieldIndex()).add(row, value)
+
+    def delete(self, ids):
+        for doc_id in ids:
+            row = self.row_of.pop(doc_id, None)
+            if row is not None:
+                self._retire(row)
+
+    def _retire(self, row):
+        self.alive[row] = False
+        for field, value in self.metadata[row].items():
+            self.fields[field].remove(row, value)
+        self.metadata[row] = {}
+
+    def candidate_rows(self, flt):
+        """
+        Rows matching a filter, as a sorted int array, or None for no filter.
+        """
+        if not flt:
+            return None
+        return np.intersect1d(self._evaluate(flt), self._all_rows())
+
+    def _all_rows(self):
+        return np.flatnonzero(self.alive[:len(self.ids)])
+
+    def _evaluate(self, flt):
+        result = None
+        for key, condition in flt.items():
+            if key == "$and":
+                rows = self._intersect([self._evaluate(sub) for sub in condition])
+            elif key == "$or":
+                rows = np.unique(np.concatenate([self._evaluate(sub) for sub in condition] or [np.empty(0, np.int64)]))
+            else:
+                rows = self._evaluate_field(key, condition)
+            result = rows if result is None else np.intersect1d(result, rows)
+        return result if result is not None else self._all_rows()
+
+    def _intersect(self, row_sets):
+        result = row_sets[0] if row_sets else self._all_rows()
+        for rows in row_sets[1:]:
+            result = np.intersect1d(result, rows)
+        return result
+
+    def _evaluate_field(self, field, condition):
+        index = self.fields.get(field, _FieldIndex())
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        result = None
+        for op, value in condition.items():
+            if op == "$eq":
+                rows = np.unique(index.equal_rows(value))
+            elif op == "$in":
+                rows = np.unique(np.concatenate([index.equal_rows(v) for v in value] or [np.empty(0, np.int64)]))
+            elif op in ("$ne", "$nin"):
+                excluded = [value] if op == "$ne" else value
+                excluded_rows = np.concatenate([index.equal_rows(v) for v in excluded] or [np.empty(0, np.int64)])
+                rows = np.setdiff1d(self._all_rows(), excluded_rows)
+            elif op == "$gt":
+                rows = np.sort(index.range_rows(low=value, low_inclusive=False))
+            elif op == "$gte":
+                rows = np.sort(index.range_rows(low=value))
+            elif op == "$lt":
+                rows = np.sort(index.range_rows(high=value, high_inclusive=False))
+            elif op == "$lte":
+                rows = np.sort(index.range_rows(high=value))
+            elif op == "$exists":
+                present = np.unique(index.present_rows())
+                rows = present if value else np.setdiff1d(self._all_rows(), present)
+            else:
+                raise ValueError(f"Unsupported filter operator '{op}' on field '{field}'")
+            result = rows if result is None else np.intersect1d(result, rows)
+        return result
+
+    def scores(self, queries, rows):
+        """
+        Score queries (q, dim) against the given rows, or every row when rows is None.
+        Returned so that higher is always better.
+        """
+        matrix = self.matrix[:len(self.ids)] if rows is None else self.matrix[rows]
+        dots = queries @ matrix.T
+        if self.metric == "euclidean":
+            sq_norms = self.sq_norms[:len(self.ids)] if rows is None else self.sq_norms[rows]
+            # -||q - x||^2 = 2 q.x - ||x||^2 - ||q||^2
+            return 2 * dots - sq_norms - np.einsum("ij,ij->i", queries, queries)[:, None]
+        return dots
+
+
+class LocalIndex:
+    """
+    In-process replacement for `pc.Index(...)` with exact search.
+    """
+
+    def __init__(self, dimension, metric="cosine"):
+        if metric not in METRICS:
+            raise ValueError(f"metric must be one of {METRICS}")
+        self.dimension = dimension
+        self.metric = metric
+        self.namespaces = {}
+
+    def _namespace(self, namespace):
+        if namespace not in self.namespaces:
+            self.namespaces[namespace] = _Namespace(self.dimension, self.metric)
+        return self.namespaces[namespace]
+
+    def upsert(self, vectors, namespace=""):
+        """
+        Accepts Pinecone-style dicts {"id", "values", "metadata"} or
+        (id, values[, metadata]) tuples.
+        """
+        ids, values, metadata = [], [], []
+        for v in vectors:
+            if isinstance(v, dict):
+                ids.append(v["id"]); values.append(v["values"]); metadata.append(v.get("metadata") or {})
+            else:
+                ids.append(v[0]); values.append(v[1]); metadata.append(v[2] if len(v) > 2 else {})
+        return self.upsert_arrays(ids, np.asarray(values, dtype=np.float32), metadata, namespace)
+
+    def upsert_arrays(self, ids, embeddings, metadata=None, namespace=""):
+        """
+        Fast path: an (n, dim) matrix plus ids and optional metadata dicts.
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2 or embeddings.shape[1] != self.dimension:
+            raise ValueError(f"Expected vectors of dimension {self.dimension}")
+        if len(set(ids)) != len(ids):
+            raise ValueError("Duplicate ids in a single upsert")
+        metadata = metadata if metadata is not None else [{}] * len(ids)
+        self._namespace(namespace).upsert(list(ids), embeddings, metadata)
+        return {"upserted_count": len(ids)}
+
+    def delete(self, ids=None, namespace="", delete_all=False):
+        ns = self._namespace(namespace)
+        if delete_all:
+            self.namespaces.pop(namespace, None)
+        else:
+            ns.delete(ids or [])
+        return {}
+
+    def describe_index_stats(self, namespace=None):
+        namespaces = {name: {"vector_count": ns.count} for name, ns in self.namespaces.items()}
+        return {
+            "dimension": self.dimension,
+            "namespaces": namespaces,
+            "total_vector_count": sum(ns["vector_count"] for ns in namespaces.values()),
+        }
+
+    def query_many(self, vectors, top_k=10, namespace="", filter=None):
+        """
+        Exact top-k for a batch of queries in one matrix product.
+        Returns (ids, scores) lists, one per query, best first.
+        """
+        queries = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        ns = self.namespaces.get(namespace)
+        if ns is None or ns.count == 0:
+            return [[] for _ in queries], [np.empty(0, np.float32) for _ in queries]
+        if self.metric == "cosine":
+            norms = np.linalg.norm(queries, axis=1, keepdims=True)
+            queries = queries / np.where(norms == 0, 1, norms)
+
+        rows = ns.candidate_rows(filter)
+        if rows is None and ns.count == len(ns.ids):
+            # No filter and no dead rows: score the whole matrix without a gather
+            rows_map = np.arange(len(ns.ids))
+            scores = ns.scores(queries, None)
+        else:
+            rows_map = ns._all_rows() if rows is None else rows
+            scores = ns.scores(queries, rows_map)
+
+        k = min(top_k, scores.shape[1])
+        if k == 0:
+            return [[] for _ in queries], [np.empty(0, np.float32) for _ in queries]
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        ids = [[ns.ids[r] for r in rows_map[row]] for row in top]
+        if self.metric == "euclidean":
+            top_scores = -top_scores  # Report squared distance, lower is closer
+        return ids, list(top_scores)
+
+    def query(self, vector, top_k=10, namespace="", filter=None, include_values=False,
+              include_metadata=False, **_):
+        """
+        Same arguments and response shape as `Index.query`.
+        """
+        ids, scores = self.query_many([vector], top_k, namespace, filter)
+        ns = self.namespaces.get(namespace)
+        matches = []
+        for doc_id, score in zip(ids[0], scores[0]):
+            match = {"id": doc_id, "score": float(score)}
+            row = ns.row_of[doc_id]
+            if include_values:
+                match["values"] = ns.matrix[row].tolist()
+            if include_metadata:
+                match["metadata"] = ns.metadata[row]
+            matches.append(match)
+        return {"matches": matches, "namespace": namespace}
+
+    def exact_top_k(self, vectors, top_k=10, namespace="", filter=None):
+        """
+        Ground-truth ids for recall measurement.
+        """
+        return self.query_many(vectors, top_k, namespace, filter)[0]
+
+
+def recall_at_k(approx_ids, exact_ids):
+    """
+    Mean fraction of the exact top-k found by an approximate search.
+    """
+    hits = [len(set(a) & set(e)) / max(len(e), 1) for a, e in zip(approx_ids, exact_ids)]
+    return float(np.mean(hits)) if hits else 0.0
+
+
+def main():
+    """
+    Replay the pinecone_demo.py walkthrough offline, then time a filtered
+    query over a larger synthetic namespace.
+    """
+    import time
+
+    dimension, namespace = 1536, "example-namespace"
+    index = LocalIndex(dimension, metric="cosine")
+    vectors = [
+        {"id": "A", "values": [0.1] * dimension, "metadata": {"genre": "comedy", "year": 2020}},
+        {"id": "B", "values": [0.15] * dimension, "metadata": {"genre": "comedy", "year": 2021}},
+        {"id": "C", "values": [0.5] * dimension, "metadata": {"genre": "thriller", "year": 2022}},
+    ]
+    index.upsert(vectors=vectors, namespace=namespace)
+    response = index.query(vector=[0.11] * dimension, top_k=3, include_metadata=True, namespace=namespace,
+                           filter={"genre": {"$eq": "comedy"}, "year": {"$gte": 2020}})
+    print("📋 Results for the demo query:")
+    for match in response["matches"]:
+        print(f"- ID: {match['id']} | Score: {match['score']:.4f} | {match['metadata']}")
+
+    n = 200_000
+    rng = np.random.default_rng(0)
+    genres = np.array(["comedy", "thriller", "drama", "horror"])
+    index.upsert_arrays(
+        [f"v{i}" for i in range(n)], rng.standard_normal((n, dimension), dtype=np.float32),
+        [{"genre": str(genres[i % 4]), "year": int(1990 + i % 35)} for i in range(n)],
+        namespace="synthetic",
+    )
+    query = rng.standard_normal(dimension, dtype=np.float32)
+    flt = {"genre": {"$in": ["comedy", "drama"]}, "year": {"$gte": 2020}}
+    started = time.perf_counter()
+    response = index.query(vector=query, top_k=10, namespace="synthetic", filter=flt)
+    print(f"\n⏱️ Filtered exact query over {n} vectors: {(time.perf_counter() - started) * 1000:.1f} ms, "
+          f"top id {response['matches'][0]['id']}")
+
+
+if __name__ == "__main__":
+    main()
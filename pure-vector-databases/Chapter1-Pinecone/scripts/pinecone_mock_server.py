@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# 🧪 Local mock of the Pinecone data-plane REST API
+"""
+A small in-process HTTP server that behaves like a Pinecone index host for
+offline testing and benchmarking:
+- POST /vectors/upsert enforces the 1000-vector and 2 MB request limits
+- POST /query runs an exact search (with metadata filters) via LocalIndex
+- POST /describe_index_stats reports per-namespace vector counts
+- Optional artificial latency (global or per namespace) and random 429
+  throttling to exercise retries and timeouts
+
+RestIndex is a minimal client for the same endpoints, so scripts can target
+either this mock or a real index host without the SDK.
+"""
+
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pinecone_local_engine import LocalIndex
+
+MAX_REQUEST_BYTES = 2 * 1024 * 1024
+MAX_UPSERT_VECTORS = 1000
+
+
+class PineconeHTTPError(Exception):
+    """Non-2xx response from the data plane; `status` carries the HTTP code."""
+
+    def __init__(self, status, body):
+        super().__init__(f"HTTP {status}: {body}")
+        self.status = status
+
+
+class MockIndexState:
+    """
+    Index contents held in a LocalIndex, created on the first upsert with the
+    dimension of the vectors it receives.
+    """
+
+    def __init__(self, latency=0.0, throttle_rate=0.0, metric="cosine"):
+        self.latency = latency
+        self.namespace_latency = {}  # Extra delay for specific namespaces
+        self.throttle_rate = throttle_rate
+        self.metric = metric
+        self.engine = None
+        self.requests = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    def upsert(self, vectors, namespace):
+        if not vectors:
+            return {"upsertedCount": 0}
+        with self.lock:
+            if self.engine is None:
+                self.engine = LocalIndex(len(vectors[0]["values"]), self.metric)
+            self.engine.upsert(vectors, namespace=namespace)
+        return {"upsertedCount": len(vectors)}
+
+    def query(self, body):
+        namespace = body.get("namespace", "")
+        time.sleep(self.namespace_latency.get(namespace, 0.0))
+        if self.engine is None:
+            return {"matches": [], "namespace": namespace}
+        with self.lock:
+            return self.engine.query(
+                vector=body["vector"], top_k=body.get("topK", 10), namespace=namespace,
+                filter=body.get("filter"), include_values=body.get("includeValues", False),
+                include_metadata=body.get("includeMetadata", False),
+            )
+
+    def describe_index_stats(self):
+        if self.engine is None:
+            return {"namespaces": {}, "dimension": 0, "totalVectorCount": 0}
+        with self.lock:
+            stats = self.engine.describe_index_stats()
+        return {
+            "namespaces": {ns: {"vectorCount": v["vector_count"]} for ns, v in stats["namespaces"].items()},
+            "dimension": stats["dimension"],
+            "totalVectorCount": stats["total_vector_count"],
+        }
+
+
+def _make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        routes = {
+            "/vectors/upsert": lambda body: _upsert(state, body),
+            "/query": lambda body: state.query(body),
+            "/describe_index_stats": lambda body: state.describe_index_stats(),
+        }
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            raw = self.rfile.read(length)
+            state.requests += 1
+            if state.latency:
+                time.sleep(state.latency)
+            if random.random() < state.throttle_rate:
+                state.throttled += 1
+                return self._reply(429, {"error": {"code": "RESOURCE_EXHAUSTED", "message": "Too many requests"}})
+            if length > MAX_REQUEST_BYTES:
+                return self._reply(400, {"error": {"code": "INVALID_ARGUMENT",
+                                                   "message": f"Request size {length} exceeds the limit"}})
+            route = self.routes.get(self.path)
+            if route is None:
+                return self._reply(404, {"error": {"code": "NOT_FOUND", "message": self.path}})
+            try:
+                return self._reply(200, route(json.loads(raw or b"{}")))
+            except ValueError as exc:
+                return self._reply(400, {"error": {"code": "INVALID_ARGUMENT", "message": str(exc)}})
+
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass  # Keep benchmark output clean
+
+    return Handler
+
+
+def _upsert(state, body):
+    vectors = body.get("vectors", [])
+    if len(vectors) > MAX_UPSERT_VECTORS:
+        raise ValueError(f"Upsert batch of {len(vectors)} exceeds {MAX_UPSERT_VECTORS} vectors")
+    return state.upsert(vectors, body.get("namespace", ""))
+
+
+def start_mock_server(port=0, latency=0.0, throttle_rate=0.0):
+    """
+    Start the mock in a daemon thread. Returns (server, state, host_url);
+    call server.shutdown() when done.
+    """
+    state = MockIndexState(latency=latency, throttle_rate=throttle_rate)
+    server = ThreadingHTTPServer(("127.0.0.1", port), _make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class RestIndex:
+    """
+    Minimal data-plane client (upsert / query / describe_index_stats) over plain HTTP.
+    """
+
+    def __init__(self, host, api_key="mock", timeout=30):
+        self.host = host if host.startswith("http") else f"https://{host}"
+        self.api_key = api_key
+        self.timeout = timeout
+
+    def _post(self, path, payload):
+        request = urllib.request.Request(
+            self.host + path,
+            data=json.dumps(payload).encode(),
+            headers={"Api-Key": self.api_key, "Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as exc:
+            raise PineconeHTTPError(exc.code, exc.read().decode(errors="replace")) from None
+
+    def upsert(self, vectors, namespace=""):
+        return self._post("/vectors/upsert", {"vectors": vectors, "namespace": namespace})
+
+    def query(self, vector, top_k=10, namespace="", filter=None, include_values=False, include_metadata=False):
+        payload = {"vector": list(map(float, vector)), "topK": top_k, "namespace": namespace,
+                   "includeValues": include_values, "includeMetadata": include_metadata}
+        if filter:
+            payload["filter"] = filter
+        return self._post("/query", payload)
+
+    def describe_index_stats(self, namespace=None):
+        return self._post("/describe_index_stats", {})
+
+
+if __name__ == "__main__":
+    server, state, url = start_mock_server(port=5080)
+    print(f"🧪 Mock Pinecone index host listening on {url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
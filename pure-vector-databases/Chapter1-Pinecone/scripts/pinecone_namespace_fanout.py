@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# 🌐 Multi-namespace query fan-out with a merged global top-k
+"""
+Query many namespaces (tenant shards) of one Pinecone index at once:
+- One `index.query` per namespace, run concurrently on a bounded thread pool
+- The same filter applied to every shard
+- Per-shard matches merged into a global top-k by score
+- A per-shard timeout: shards that miss it are reported and skipped, and the
+  partial result is returned instead of waiting for the slowest partition
+- Per-shard latency and status so slow partitions are easy to spot
+"""
+
+import heapq
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Metrics whose scores rank best-first in descending order; euclidean is the opposite
+HIGHER_IS_BETTER = {"cosine": True, "dotproduct": True, "euclidean": False}
+
+
+def _query_shard(index, namespace, vector, top_k, filter, include_metadata):
+    started = time.perf_counter()
+    response = index.query(vector=vector, top_k=top_k, namespace=namespace, filter=filter,
+                           include_values=False, include_metadata=include_metadata)
+    latency_ms = (time.perf_counter() - started) * 1000
+    matches = [
+        {"id": m["id"], "score": m["score"], "namespace": namespace,
+         **({"metadata": m.get("metadata")} if include_metadata else {})}
+        for m in response["matches"]
+    ]
+    return matches, latency_ms
+
+
+def fanout_query(index, vector, namespaces, top_k=10, filter=None, metric="cosine",
+                 max_workers=16, shard_timeout=None, include_metadata=True):
+    """
+    Query every namespace concurrently and merge into one top-k.
+
+    `shard_timeout` (seconds) is counted from when the fan-out starts, so a
+    shard still queued behind `max_workers` busy ones uses up its budget too.
+    Returns {"matches", "shards", "partial"}: "shards" maps each namespace to
+    its status ("ok", "timeout" or "error"), latency_ms and match count.
+    """
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(namespaces)) or 1)
+    started = time.perf_counter()
+    futures = {
+        executor.submit(_query_shard, index, ns, vector, top_k, filter, include_metadata): ns
+        for ns in namespaces
+    }
+    done, not_done = wait(futures, timeout=shard_timeout)
+    # Don't block on stragglers: their results are dropped when they finish
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    shards, candidates = {}, []
+    for future in done:
+        ns = futures[future]
+        try:
+            matches, latency_ms = future.result()
+        except Exception as exc:
+            shards[ns] = {"status": "error", "error": str(exc), "latency_ms": None, "matches": 0}
+            continue
+        shards[ns] = {"status": "ok", "latency_ms": latency_ms, "matches": len(matches)}
+        candidates.extend(matches)
+    waited_ms = (time.perf_counter() - started) * 1000
+    for future in not_done:
+        shards[futures[future]] = {"status": "timeout", "latency_ms": waited_ms, "matches": 0}
+
+    pick = heapq.nlargest if HIGHER_IS_BETTER[metric] else heapq.nsmallest
+    return {
+        "matches": pick(top_k, candidates, key=lambda m: m["score"]),
+        "shards": shards,
+        "partial": len(done) < len(namespaces) or any(s["status"] != "ok" for s in shards.values()),
+    }
+
+
+def slowest_shards(result, n=5):
+    """
+    The n namespaces with the highest latency in a fanout_query result.
+    """
+    timed = [(ns, s["latency_ms"]) for ns, s in result["shards"].items() if s["latency_ms"] is not None]
+    return sorted(timed, key=lambda item: item[1], reverse=True)[:n]
+
+
+def main():
+    """
+    Fan a filtered query out over 24 tenant namespaces of a mock index, two
+    of which are slow, and compare against the exact merged answer.
+    """
+    import numpy as np
+    from pinecone_bulk_upsert import bulk_upsert
+    from pinecone_local_engine import LocalIndex
+    from pinecone_mock_server import RestIndex, start_mock_server
+
+    dimension, per_namespace = 384, 2000
+    namespaces = [f"tenant-{i:02d}" for i in range(24)]
+    server, state, host = start_mock_server()
+    index = RestIndex(host)
+    oracle = LocalIndex(dimension)
+
+    rng = np.random.default_rng(0)
+    genres = ["comedy", "thriller", "drama"]
+    for ns in namespaces:
+        embeddings = rng.standard_normal((per_namespace, dimension), dtype=np.float32)
+        ids = [f"{ns}-{i}" for i in range(per_namespace)]
+        metadata = [{"genre": genres[i % 3], "year": 2000 + i % 25} for i in range(per_namespace)]
+        bulk_upsert(index, ids, embeddings, metadata, namespace=ns, max_in_flight=4)
+        oracle.upsert_arrays(ids, embeddings, metadata, namespace=ns)
+
+    state.namespace_latency.update({"tenant-07": 0.4, "tenant-19": 2.0})
+    query = rng.standard_normal(dimension, dtype=np.float32)
+    flt = {"genre": {"$eq": "comedy"}, "year": {"$gte": 2020}}
+
+    result = fanout_query(index, query, namespaces, top_k=10, filter=flt, max_workers=32, shard_timeout=1.0)
+    statuses = [s["status"] for s in result["shards"].values()]
+    print(f"\n🌐 Queried {len(namespaces)} namespaces: {statuses.count('ok')} ok, "
+          f"{statuses.count('timeout')} timed out (partial={result['partial']})")
+    print("🐢 Slowest shards:", ", ".join(f"{ns} {ms:.0f} ms" for ns, ms in slowest_shards(result, 3)))
+
+    exact = sorted(
+        (m for ns in namespaces for m in oracle.query(query, 10, namespace=ns, filter=flt)["matches"]),
+        key=lambda m: m["score"], reverse=True,
+    )[:10]
+    found = {m["id"] for m in result["matches"]}
+    print(f"🎯 Overlap with exact global top-10: {len(found & {m['id'] for m in exact})}/10")
+    for m in result["matches"][:3]:
+        print(f"- ID: {m['id']} | Score: {m['score']:.4f} | Namespace: {m['namespace']}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
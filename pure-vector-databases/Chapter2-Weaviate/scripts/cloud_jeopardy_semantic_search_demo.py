@@ -1,26 +1,30 @@
 """
-Weaviate Jeopardy Semantic Search (10 Items, 2 Queries)
+Weaviate Jeopardy Semantic Search (10 Items, 3 Queries)
 
 Demonstrates:
 1. Connect to Weaviate
 2. Create/reuse 'Question' collection
 3. Insert 10 hardcoded Q&A
 4. Log insertions
-5. Perform semantic searches (2 queries) w/ deduplication
+5. Perform semantic searches (concurrent, coalesced) w/ deduplication
 6. Show top result w/ similarity
 7. Print the entire dataset at the end
 8. Close connection
 """
 
+import asyncio
 import weaviate
 from weaviate.classes.init import Auth
 from weaviate.classes.config import Configure
-from weaviate.classes.query import MetadataQuery
+from weaviate_async_search import run_queries
+
+CLUSTER_URL = "k2ecrve7srg1jgxghzo2ta.c0.asia-southeast1.gcp.weaviate.cloud"
+API_KEY = "***"
 
 def main():
   client = weaviate.connect_to_weaviate_cloud(
-      cluster_url="k2ecrve7srg1jgxghzo2ta.c0.asia-southeast1.gcp.weaviate.cloud",
-      auth_credentials=Auth.api_key("***"),
+      cluster_url=CLUSTER_URL,
+      auth_credentials=Auth.api_key(API_KEY),
   ); print("🔌 Connected")
 
   try:
@@ -53,16 +57,9 @@ def main():
       print(f" {i}. Q: {qq} | A: {aa} | Cat: {cc}")
 
 
-  for uq in ("animal with long trunk","organ that stores glycogen"):
-      print(f"\n🔍 Query: {uq}")
-      resp = q.query.near_text(query=uq,limit=5,auto_limit=1,return_metadata=MetadataQuery(distance=True))
-      seen,unique=set(),[]
-      for o in resp.objects:
-          if o.uuid not in seen:
-              seen.add(o.uuid); unique.append(o)
-      if unique:
-          o=unique[0]; p=o.properties; d=o.metadata.distance
-          print(f"→ {p['answer']} (Q: {p['question']}) dist={d:.4f}")
+  # All queries run concurrently over one async connection; duplicates are coalesced
+  queries = ("animal with long trunk","organ that stores glycogen","Animal with long trunk")
+  asyncio.run(run_queries(CLUSTER_URL, API_KEY, queries))
   client.close(); print("🔒 Closed")
 
 if __name__=="__main__":
@@ -10,20 +10,17 @@ This script demonstrates:
 
 from sentence_transformers import SentenceTransformer
 import weaviate
+import os
+import sys
+# Shared helpers (embedding cache) live in <repo>/shared
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "shared"))
+from embedding_cache import EmbeddingCache
+from weaviate_batch_import import CALL_SUMMARY_CLASS, batch_import
+from instrumentation import count, request, stage
 
 client = weaviate.Client(url="http://localhost:8081")  # 1️⃣ Connect
 client.schema.delete_all()  # 2️⃣ Reset schema
-client.schema.create_class({
-   "class": "CallSummary",
-   "description": "Telecom customer call summaries with metadata",
-   "vectorizer": "none",
-   "properties": [
-       {"name": "summary","dataType": ["text"]},
-       {"name": "agent","dataType": ["text"]},
-       {"name": "date","dataType": ["date"]},
-       {"name": "issueType","dataType": ["text"]}
-   ]
-})
+client.schema.create_class(CALL_SUMMARY_CLASS)
 print("✅ Created CallSummary class")
 
 model = SentenceTransformer("all-MiniLM-L6-v2")  # 3️⃣ Load model
@@ -39,26 +36,37 @@ for r in records:
    print(f" - {r['summary']} [{r['agent']}, {r['date']}, {r['issueType']}]")
 
 # 5️⃣ Insert records with vectors, collection is CallSummary
-for rec in records:
-   client.data_object.create(data_object=rec, class_name="CallSummary", vector=model.encode(rec["summary"]).tolist())
-print("✅ Inserted all records with embeddings")
+# Summaries are embedded in batches (cached on disk by (model, text)) and sent
+# through the batch API instead of one create call per object
+cache = EmbeddingCache("all-MiniLM-L6-v2", model.get_sentence_embedding_dimension())
+stats = batch_import(client, records, lambda texts: cache.embed(texts, model.encode))
+cache.close()
+print(f"✅ Inserted {stats['objects'] - stats['failed']} records with embeddings")
 
 # 6️⃣ Define & print query
 query_text = "5G connection lost during handover"
 print(f"\n🔍 Query: \"{query_text}\"")
-query_vec = model.encode(query_text).tolist()
 
 # 7️⃣ Search with vector + metadata filter
-response = (client.query
-   .get("CallSummary", ["summary", "agent", "date", "issueType", "_additional {certainty}"])
-   .with_near_vector({"vector": query_vec})
-   .with_where({"path": ["issueType"], "operator": "Equal", "valueText": "handover"})
-   .with_limit(5)
-   .do())
+# With VECTORDB_TIMING=1 the embed / round-trip / decode stages are timed and summarized at exit
+with request("weaviate.query"):
+   with stage("embed"):
+      query_vec = model.encode(query_text).tolist()
+   count("rows_embedded")
+   query = (client.query
+      .get("CallSummary", ["summary", "agent", "date", "issueType", "_additional {certainty}"])
+      .with_near_vector({"vector": query_vec})
+      .with_where({"path": ["issueType"], "operator": "Equal", "valueText": "handover"})
+      .with_limit(5))
+   with stage("weaviate.round_trip"):
+      response = query.do()
+   with stage("weaviate.decode"):
+      hits = response["data"]["Get"]["CallSummary"]
+   count("hits_returned", len(hits))
 
 # 8️⃣ Display results
 print("\n📋 Search Results (issueType = 'handover'):\n")
-for idx, m in enumerate(response["data"]["Get"]["CallSummary"], 1):
+for idx, m in enumerate(hits, 1):
    print(f"Result {idx}:")
    print(f" • Summary:   {m['summary']}")
    print(f" • Agent:     {m['agent']}")
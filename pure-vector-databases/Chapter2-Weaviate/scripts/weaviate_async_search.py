@@ -0,0 +1,162 @@
+"""
+Weaviate Async Multi-Query Search Front End (v4 client)
+
+Runs many semantic searches at once instead of one after another:
+1. All queries share one async connection and run concurrently (bounded)
+2. Identical in-flight queries are coalesced into a single request
+3. Queries that differ only in case or whitespace share one request, which
+   searches the first caller's original text; with a client-side `embed_fn`
+   every distinct query is embedded once and equal vectors share one
+   near_vector request
+4. Deduplication and top-1 selection happen in a single pass over the hits
+5. Per-query latency percentiles are reported
+"""
+
+import asyncio
+import hashlib
+import re
+import time
+
+import numpy as np
+import weaviate
+from weaviate.classes.init import Auth
+from weaviate.classes.query import MetadataQuery
+
+
+def normalize_query(text):
+    """
+    Coalescing key of a query (case- and whitespace-insensitive). Only used as
+    a key: the text sent to the vectorizer is always a caller's original one.
+    """
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def dedup_top1(objects):
+    """
+    One pass over the hits: drop repeated UUIDs and track the closest object.
+    Returns (best, unique).
+    """
+    seen, unique, best = set(), [], None
+    for o in objects:
+        if o.uuid in seen:
+            continue
+        seen.add(o.uuid)
+        unique.append(o)
+        if best is None or o.metadata.distance < best.metadata.distance:
+            best = o
+    return best, unique
+
+
+class SearchFrontEnd:
+    """
+    Concurrent, coalescing search over one collection of a WeaviateAsyncClient.
+
+    Without `embed_fn` queries go through near_text and the server vectorizes
+    them. With `embed_fn(list_of_texts) -> (n, dim)` the front end embeds
+    distinct texts in one batch and searches with near_vector.
+    """
+
+    def __init__(self, collection, limit=5, auto_limit=1, concurrency=16, embed_fn=None):
+        self.collection = collection
+        self.limit = limit
+        self.auto_limit = auto_limit
+        self.embed_fn = embed_fn
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._inflight = {}
+        self._text_keys = {}  # normalized text -> vector digest
+        self._vectors = {}    # vector digest -> vector, stored once per distinct vector
+        self.latencies_ms = []
+        self.requests = 0
+        self.coalesced = 0
+
+    async def _request(self, key, text):
+        async with self._semaphore:
+            self.requests += 1
+            if key in self._vectors:
+                resp = await self.collection.query.near_vector(
+                    near_vector=self._vectors[key], limit=self.limit, auto_limit=self.auto_limit,
+                    return_metadata=MetadataQuery(distance=True))
+            else:
+                resp = await self.collection.query.near_text(
+                    query=text, limit=self.limit, auto_limit=self.auto_limit,
+                    return_metadata=MetadataQuery(distance=True))
+        return dedup_top1(resp.objects)
+
+    async def search(self, text, key=None):
+        """
+        Search one query, joining an identical request if one is in flight.
+        Returns (best, unique) as produced by dedup_top1.
+        """
+        key = key or normalize_query(text)
+        started = time.perf_counter()
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._request(key, text))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        try:
+            return await asyncio.shield(task)  # One caller cancelling must not cancel the others
+        finally:
+            self.latencies_ms.append((time.perf_counter() - started) * 1000)
+
+    async def search_many(self, texts):
+        """
+        Run all queries concurrently; results come back in input order.
+        """
+        keys = [normalize_query(t) for t in texts]
+        if self.embed_fn is not None:
+            # Embed the first original text seen for each new key
+            first = {}
+            for text, key in zip(texts, keys):
+                first.setdefault(key, text)
+            new = [k for k in first if k not in self._text_keys]
+            if new:
+                vectors = np.asarray(self.embed_fn([first[k] for k in new]), dtype=np.float32)
+                for text, vector in zip(new, vectors):
+                    digest = hashlib.blake2b(vector.tobytes(), digest_size=16).hexdigest()
+                    self._text_keys[text] = digest
+                    self._vectors.setdefault(digest, vector.tolist())
+            # Texts with identical vectors share one request key
+            keys = [self._text_keys[k] for k in keys]
+        return await asyncio.gather(*(self.search(t, key) for t, key in zip(texts, keys)))
+
+    def latency_report(self):
+        if not self.latencies_ms:
+            return {}
+        lat = np.asarray(self.latencies_ms)
+        return {
+            "queries": len(lat),
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "p50_ms": float(np.percentile(lat, 50)),
+            "p95_ms": float(np.percentile(lat, 95)),
+            "p99_ms": float(np.percentile(lat, 99)),
+            "max_ms": float(lat.max()),
+        }
+
+
+async def run_queries(cluster_url, api_key, queries, collection_name="Question", concurrency=16, embed_fn=None):
+    """
+    Open an async connection, run `queries` concurrently and print the top hit of each.
+    """
+    client = weaviate.use_async_with_weaviate_cloud(cluster_url=cluster_url, auth_credentials=Auth.api_key(api_key))
+    await client.connect()
+    try:
+        front_end = SearchFrontEnd(client.collections.get(collection_name), concurrency=concurrency, embed_fn=embed_fn)
+        started = time.perf_counter()
+        results = await front_end.search_many(queries)
+        elapsed = time.perf_counter() - started
+        for uq, (best, unique) in zip(queries, results):
+            print(f"\n🔍 Query: {uq}")
+            if best is not None:
+                p = best.properties
+                print(f"→ {p['answer']} (Q: {p['question']}) dist={best.metadata.distance:.4f} [{len(unique)} unique hits]")
+        report = front_end.latency_report()
+        print(f"\n⏱️ {report['queries']} queries in {elapsed:.2f}s with {report['requests']} requests "
+              f"({report['coalesced']} coalesced): p50={report['p50_ms']:.1f}ms "
+              f"p95={report['p95_ms']:.1f}ms p99={report['p99_ms']:.1f}ms")
+        return results, report
+    finally:
+        await client.close()
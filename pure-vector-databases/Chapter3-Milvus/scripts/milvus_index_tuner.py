@@ -0,0 +1,228 @@
+# Index autotuner: pick the cheapest Milvus index that meets a recall target
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+from pymilvus import connections, Collection, CollectionSchema, FieldSchema, DataType, utility
+
+# pymilvus connection alias the tuner's ORM calls go through
+ALIAS = "index_tuner"
+# Tuned index + search params per collection, reused by collection.search
+PROFILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "milvus_index_profiles.json")
+
+# Candidate index builds and the search-time knob swept for each
+CANDIDATES = (
+    [("IVF_FLAT", {"nlist": nlist}) for nlist in (64, 128, 256, 1024)]
+    + [("IVF_SQ8", {"nlist": nlist}) for nlist in (128, 256, 1024)]
+    + [("HNSW", {"M": m, "efConstruction": 200}) for m in (8, 16, 32)]
+)
+NPROBES = (1, 4, 8, 16, 32, 64)
+EFS = (16, 32, 64, 128, 256)
+
+
+def search_param_grid(index_type, build_params, k):
+    if index_type == "HNSW":
+        return [{"ef": ef} for ef in EFS if ef >= k]
+    return [{"nprobe": nprobe} for nprobe in NPROBES if nprobe <= build_params["nlist"]]
+
+
+def exact_top_k(corpus, queries, k, metric="COSINE"):
+    """
+    Ground-truth neighbours by brute force (row indices into corpus).
+    """
+    if metric == "COSINE":
+        corpus = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+        queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    if metric == "L2":
+        scores = -(np.sum(corpus ** 2, axis=1)[None, :] - 2 * queries @ corpus.T)
+    else:
+        scores = queries @ corpus.T
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return [set(row.tolist()) for row in top]
+
+
+def estimate_index_mb(index_type, build_params, n, dim):
+    """
+    Rough in-memory size when Milvus doesn't report segment memory.
+    """
+    if index_type == "IVF_SQ8":
+        size = n * dim + build_params["nlist"] * dim * 4
+    elif index_type == "HNSW":
+        size = n * dim * 4 + n * build_params["M"] * 2 * 8
+    else:
+        size = n * dim * 4 + build_params["nlist"] * dim * 4
+    return size / 2**20
+
+
+def sample_collection(collection, n, vector_field="vector", batch_size=1000):
+    """
+    Pull up to n vectors out of an existing (loaded) collection.
+    """
+    iterator = collection.query_iterator(batch_size=batch_size, limit=n, output_fields=[vector_field])
+    vectors = []
+    while True:
+        batch = iterator.next()
+        if not batch:
+            break
+        vectors.extend(row[vector_field] for row in batch)
+    iterator.close()
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def _loaded_mb(col, using):
+    try:
+        segments = utility.get_query_segment_info(col, using=using)
+        total = sum(getattr(seg, "mem_size", 0) for seg in segments)
+        return total / 2**20 if total else None
+    except Exception:
+        return None
+
+
+def tune_index(using, corpus, queries, k=10, target_recall=0.95, metric="COSINE",
+               candidates=CANDIDATES, tuning_collection="index_tuning_sample"):
+    """
+    Build every candidate index on a sample collection and measure recall@k,
+    QPS, latency, build time and memory for each search-time setting.
+    `using` is the alias of a pymilvus connection (connections.connect).
+
+    Returns (recommendation, rows): the fastest configuration meeting
+    `target_recall` (or the most accurate one if none does), and all results.
+    """
+    dim = corpus.shape[1]
+    truth = exact_top_k(corpus, queries, k, metric)
+
+    if utility.has_collection(tuning_collection, using=using):
+        utility.drop_collection(tuning_collection, using=using)
+    schema = CollectionSchema([
+        FieldSchema("id", DataType.INT64, is_primary=True),
+        FieldSchema("vector", DataType.FLOAT_VECTOR, dim=dim),
+    ])
+    collection = Collection(tuning_collection, schema=schema, using=using)
+    for start in range(0, len(corpus), 10_000):
+        chunk = corpus[start:start + 10_000]
+        collection.insert([list(range(start, start + len(chunk))), chunk.tolist()])
+    collection.flush()
+
+    rows = []
+    query_list = queries.tolist()
+    for index_type, build_params in candidates:
+        collection.release()
+        if collection.has_index():
+            collection.drop_index()
+        index_params = {"index_type": index_type, "metric_type": metric, "params": build_params}
+        started = time.perf_counter()
+        collection.create_index("vector", index_params)
+        utility.wait_for_index_building_complete(tuning_collection, using=using)
+        build_seconds = time.perf_counter() - started
+        collection.load()
+        memory_mb = _loaded_mb(tuning_collection, using) or estimate_index_mb(index_type, build_params, len(corpus), dim)
+
+        for params in search_param_grid(index_type, build_params, k):
+            search_params = {"metric_type": metric, "params": params}
+            latencies, recalls = [], []
+            for query, expected in zip(query_list, truth):
+                t0 = time.perf_counter()
+                hits = collection.search(data=[query], anns_field="vector", param=search_params, limit=k)
+                latencies.append((time.perf_counter() - t0) * 1000)
+                recalls.append(len({hit.id for hit in hits[0]} & expected) / k)
+            rows.append({
+                "index_params": index_params,
+                "search_params": search_params,
+                "recall": float(np.mean(recalls)),
+                "qps": 1000 / float(np.mean(latencies)),
+                "p50_ms": float(np.percentile(latencies, 50)),
+                "p99_ms": float(np.percentile(latencies, 99)),
+                "build_s": build_seconds,
+                "memory_mb": memory_mb,
+            })
+            print(f" • {index_type:<8} {json.dumps(build_params):<34} {json.dumps(params):<16} "
+                  f"recall={rows[-1]['recall']:.3f} p50={rows[-1]['p50_ms']:.2f}ms qps={rows[-1]['qps']:.0f}")
+
+    collection.release()
+    utility.drop_collection(tuning_collection, using=using)
+
+    passing = [row for row in rows if row["recall"] >= target_recall]
+    if passing:
+        best = min(passing, key=lambda row: (row["p50_ms"], row["memory_mb"]))
+    else:
+        best = max(rows, key=lambda row: (row["recall"], -row["p50_ms"]))
+    return best, rows
+
+
+def save_profile(collection_name, recommendation, k, target_recall, path=PROFILE_PATH):
+    """
+    Persist the recommended index and search params for a collection.
+    """
+    profiles = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            profiles = json.load(f)
+    profiles[collection_name] = {**recommendation, "k": k, "target_recall": target_recall,
+                                 "tuned_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    with open(path, "w") as f:
+        json.dump(profiles, f, indent=2)
+
+
+def load_tuned_profile(collection_name, path=PROFILE_PATH):
+    """
+    The saved profile for a collection, or None if it was never tuned.
+    Use profile["index_params"] for create_index and profile["search_params"]
+    as the `param` of collection.search.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f).get(collection_name)
+
+
+def apply_profile(collection, profile, field="vector"):
+    """
+    Rebuild a collection's vector index with the tuned configuration.
+    """
+    collection.release()
+    if collection.has_index():
+        collection.drop_index()
+    collection.create_index(field, profile["index_params"])
+    collection.load()
+    print(f"✅ Applied {profile['index_params']['index_type']} {profile['index_params']['params']} "
+          f"to '{collection.name}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Milvus index autotuner")
+    parser.add_argument("--uri", default="http://localhost:19530")
+    parser.add_argument("--token", default="root:Milvus")
+    parser.add_argument("--collection", required=True, help="Collection to sample and tune")
+    parser.add_argument("--sample", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=200, help="Held-out sample vectors used as queries")
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    parser.add_argument("--metric", default="COSINE", choices=["COSINE", "IP", "L2"])
+    parser.add_argument("--apply", action="store_true", help="Rebuild the collection's index with the result")
+    args = parser.parse_args()
+
+    connections.connect(alias=ALIAS, uri=args.uri, token=args.token)
+    collection = Collection(args.collection, using=ALIAS)
+    collection.load()
+    vectors = sample_collection(collection, args.sample + args.queries)
+    rng = np.random.default_rng(0)
+    rng.shuffle(vectors)
+    queries, corpus = vectors[:args.queries], vectors[args.queries:]
+    print(f"🎯 Tuning '{args.collection}' on {len(corpus):,} sampled vectors, {len(queries)} held-out queries, "
+          f"recall@{args.k} >= {args.target_recall}")
+
+    best, _ = tune_index(ALIAS, corpus, queries, args.k, args.target_recall, args.metric)
+    print(f"\n🏆 Recommended: {best['index_params']} with search params {best['search_params']['params']} "
+          f"(recall={best['recall']:.3f}, p50={best['p50_ms']:.2f}ms, build={best['build_s']:.1f}s, "
+          f"~{best['memory_mb']:.0f} MB)")
+    save_profile(args.collection, best, args.k, args.target_recall)
+    print(f"💾 Saved to {PROFILE_PATH}")
+    if args.apply:
+        apply_profile(collection, best)
+
+
+if __name__ == "__main__":
+    main()
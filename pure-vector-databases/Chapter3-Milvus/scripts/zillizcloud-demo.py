@@ -5,6 +5,14 @@ from pymilvus import (
    DataType, CollectionSchema, FieldSchema, Collection, utility
 )
 from pymilvus import model
+from milvus_index_tuner import load_tuned_profile
+import os
+import sys
+# Shared helpers (embedding cache) live in <repo>/shared
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "shared"))
+from embedding_cache import EmbeddingCache
+from sync_manifest import SyncManifest, incremental_sync
+from exact_rerank import VectorStore, rerank_hits
 
 # 1️⃣ Connect to Zilliz Cloud token="username:password", db_066b992836da859 is a use name
 client = MilvusClient(alias="default",uri="https://in03-066b992836da859.serverless.gcp-us-west1.cloud.zilliz.com",token="db_066b992836da859:*******") 
@@ -12,15 +20,25 @@ client = MilvusClient(alias="default",uri="https://in03-066b992836da859.serverle
 client = MilvusClient(connection_alias="default")
 
 # 2️⃣ Recreate collection schema with title field
-if client.has_collection("recipes"):
+# SYNC_MODE=incremental keeps the existing collection and only re-embeds, upserts or
+# deletes the recipes that changed since the last run (tracked in a local manifest)
+incremental = os.environ.get("SYNC_MODE") == "incremental"
+manifest = SyncManifest.for_collection("milvus-recipes", model_id="pymilvus-default-embedding")
+# Full-precision copies of the vectors, keyed by id, for the client-side re-rank.
+# Unchanged recipes are never re-upserted, so an empty store (new or wiped) forces a rebuild
+store = VectorStore("milvus-recipes", dim=768)
+if client.has_collection("recipes") and not (incremental and len(manifest) and len(store)):
    client.drop_collection("recipes")
 
-schema = CollectionSchema([
-   FieldSchema("id", DataType.INT64, is_primary=True),
-   FieldSchema("vector", DataType.FLOAT_VECTOR, dim=768),
-   FieldSchema("title", DataType.VARCHAR, max_length=512)
-])
-client.create_collection("recipes", schema=schema)
+if not client.has_collection("recipes"):
+   manifest.reset()
+   store.clear()
+   schema = CollectionSchema([
+      FieldSchema("id", DataType.INT64, is_primary=True),
+      FieldSchema("vector", DataType.FLOAT_VECTOR, dim=768),
+      FieldSchema("title", DataType.VARCHAR, max_length=512)
+   ])
+   client.create_collection("recipes", schema=schema)
 
 # 3️⃣ Prepare embeddings and data
 ef = model.DefaultEmbeddingFunction()
@@ -36,26 +54,49 @@ texts = [
    "Caprese Salad with tomato, basil, mozzarella",
    "Garlic Shrimp Linguine with parsley and lemon"
 ]
-vectors = ef.encode_documents(texts)
+# Documents are keyed by title here; a real corpus would use a stable key (path, URL, row id)
+documents = {text: {"title": text} for text in texts}
 
-entities = [
-   {"id": i+1, "vector": vectors[i], "title": texts[i]}
-   for i in range(len(texts))
-]
+# Embeddings are cached on disk by (model, text), so re-runs only embed new texts
+cache = EmbeddingCache("pymilvus-default-embedding", ef.dim)
+
+# 4️⃣ Upsert new/changed recipes and delete vanished ones
+def upsert_recipes(ids, vectors, docs):
+   client.upsert("recipes", [
+      {"id": doc_id, "vector": vec, "title": doc["title"]}
+      for doc_id, vec, doc in zip(ids, vectors, docs)
+   ])
+   store.put(ids, vectors)
+   for doc_id, doc in zip(ids, docs):
+      print(f"• ID {doc_id}: {doc['title']}")
 
-# 4️⃣ Insert data
-res = client.insert("recipes", entities)
-print(f"\n✅ Inserted {res['insert_count']} recipes:")
-for e in entities:
-   print(f"• ID {e['id']}: {e['title']}")
+def delete_recipes(ids):
+   client.delete("recipes", ids=ids)
+   store.delete(ids)
+
+print("\n✅ Upserted recipes:")
+stats = incremental_sync(
+   documents, manifest,
+   embed_fn=lambda batch: cache.embed(batch, ef.encode_documents),
+   upsert_fn=upsert_recipes,
+   delete_fn=delete_recipes,
+   text_field="title",
+)
+cache.close()
+store.flush()
+print("🔄 Sync:", stats)
+print("🗄️ Embedding cache:", cache.stats())
 
 # 5️⃣ Index & load collection
+# Use the configuration from milvus_index_tuner.py when this collection has been tuned
+profile = load_tuned_profile("recipes")
 collection = Collection("recipes", using="default")
-collection.create_index("vector", {
-   "index_type": "IVF_FLAT",
-   "metric_type": "COSINE",
-   "params": {"nlist": 128}
-})
+if not collection.has_index():
+   collection.create_index("vector", profile["index_params"] if profile else {
+      "index_type": "IVF_FLAT",
+      "metric_type": "COSINE",
+      "params": {"nlist": 128}
+   })
 collection.load()
 utility.wait_for_loading_complete("recipes")
 print("Collection indexed & loaded")
@@ -67,9 +108,17 @@ print(f"\n🔍 Query: {query}")
 print("🔢 Vector sample:", [round(f,4) for f in q_vec[:5]], "...")
 
 # 7️⃣ Perform search with metadata
-res_search = collection.search(data=[q_vec],anns_field="vector",param={"metric_type": "COSINE", "params": {}},limit=3,output_fields=["title"])
+# RERANK_OVERSAMPLE=4 fetches 4x the candidates from the (approximate) IVF index and
+# re-ranks them exactly against the local full-precision store; 1 (default) disables it
+oversample = int(os.environ.get("RERANK_OVERSAMPLE", "1"))
+search_params = profile["search_params"] if profile else {"metric_type": "COSINE", "params": {}}
+res_search = collection.search(data=[q_vec],anns_field="vector",param=search_params,limit=3 * oversample,output_fields=["title"])
+if oversample > 1:
+   hits = rerank_hits(store, q_vec, res_search[0], k=3, score=lambda hit: hit.distance)
+else:
+   hits = [(hit, hit.distance) for hit in res_search[0]]
 
 # 8️⃣ Print top-3 results
 print("\n📊 Top 3 Search Results:")
-for hit in res_search[0]:
-   print(f"• ID {hit.id}, Title: {hit.entity.get('title')}, Distance: {hit.distance:.4f}")
\ No newline at end of file
+for hit, score in hits:
+   print(f"• ID {hit.id}, Title: {hit.entity.get('title')}, Distance: {score:.4f}")
\ No newline at end of file
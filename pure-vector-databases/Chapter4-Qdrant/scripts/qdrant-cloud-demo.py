@@ -1,7 +1,12 @@
 # 1. Install dependencies:
-# pip install qdrant-client
+# pip install qdrant-client fastembed
 
 from qdrant_client import QdrantClient, models
+import os
+import sys
+# Shared helpers (embedding service) live in <repo>/shared
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "shared"))
+from embedding_service import get_encoder
 
 # 2. Initialize the Qdrant Cloud client
 #    Use the full URL (including https://) and your API key from the Cloud dashboard.
@@ -17,14 +22,6 @@ collection = "entertainment_collection"
 if client.collection_exists(collection):
    client.delete_collection(collection)
 
-# 3b. Create the collection with FastEmbed-compatible vector params:
-# get_fastembed_vector_params() ensures correct embedding dimension, HNSW index config, and other settings.
-# Leveraging a powerful helper from the FastEmbed integration to automatically configure the vector storage in Qdrant.
-client.create_collection(
-   collection_name=collection,
-   vectors_config=client.get_fastembed_vector_params()
-)
-
 # 4. Define 8 entertainment-themed text entries with metadata
 docs = [
    "Romantic comedy movie about two unlikely lovers.",
@@ -38,10 +35,23 @@ docs = [
 ]
 metadata = [{"description": text} for text in docs]
 
-# 5. Insert documents using FastEmbed's `add` method
-#    This automatically embeds documents and uploads them to the Qdrant collection.
-#    Returns list of generated IDs (UUIDs) for each document.
-ids = client.add(collection_name=collection, documents=docs, metadata=metadata)
+# 5. Embed the documents with FastEmbed and upload them.
+#    The FastEmbed model is served warm by shared/embedding_service.py when it is running
+#    (EMBEDDING_SERVICE=start launches it), otherwise it is loaded in-process on first use.
+embedder = get_encoder("BAAI/bge-small-en-v1.5", backend="fastembed")
+vectors = embedder.encode(docs, kind="document")
+
+# 5a. Create the collection with the model's dimension (384) and cosine distance
+client.create_collection(
+   collection_name=collection,
+   vectors_config=models.VectorParams(size=vectors.shape[1], distance=models.Distance.COSINE)
+)
+ids = list(range(1, len(docs) + 1))
+client.upsert(
+   collection_name=collection,
+   points=[models.PointStruct(id=i, vector=vec.tolist(), payload=meta) for i, vec, meta in zip(ids, vectors, metadata)],
+   wait=True
+)
 
 # Print confirmation of insertion
 print("✅ Inserted entertainment documents:")
@@ -52,16 +62,16 @@ for doc_id, meta in zip(ids, metadata):
 query = input("\nEnter your entertainment search query: ")
 print(f"\n🔍 Searching for: \"{query}\"")
 
-# 7. Perform semantic search using FastEmbed `query` method
-#    This auto-embeds the user query and retrieves top-N semantically similar documents.
-results = client.query(
+# 7. Embed the query (FastEmbed query_embed) and retrieve the top-N semantically similar documents
+results = client.query_points(
    collection_name=collection,
-   query_text=query,
+   query=embedder.encode(query, kind="query").tolist(),
+   with_payload=True,
    limit=3  # Fetch the top 3 results
-)
+).points
 
 # 8. Display the search results with similarity scores and metadata
 print("\n🎯 Top matches:")
 for res in results:
-   desc = res.metadata.get("description", "<no description>")
+   desc = res.payload.get("description", "<no description>")
    print(f"- id={res.id}, score={res.score:.3f}: \"{desc}\"")
\ No newline at end of file
@@ -1,9 +1,19 @@
 # Step 1: Import required libraries
 # - QdrantClient manages connection and vector operations.
-# - SentenceTransformer handles text → vector embeddings.
+# - The SentenceTransformer model handles text → vector embeddings; it is served warm by
+#   shared/embedding_service.py when that is running, otherwise loaded in-process on first use.
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
-from sentence_transformers import SentenceTransformer
+from qdrant_client.models import PointIdsList, PointStruct
+import os
+import sys
+# Shared helpers (embedding cache) live in <repo>/shared
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "shared"))
+from embedding_cache import EmbeddingCache
+from sync_manifest import SyncManifest, incremental_sync
+from instrumentation import count, request, stage, timed
+from embedding_service import get_encoder
+from qdrant_quantization import create_quantized_collection, quantized_search_params
+from exact_rerank import VectorStore, rerank_hits
 # --------------------------------------------------------------------------
 # Step 2: Connect to a local Qdrant instance.
 # Ensure Qdrant is running on http://localhost:6333 (e.g., via Docker).
@@ -13,20 +23,33 @@ client = QdrantClient(url="http://localhost:6333")  # REST API endpoint
 collection_name = "ads_collection"
 
 # If collection exists, delete it to reset. Qdrant enforces fixed vector dimension.
-if client.collection_exists(collection_name):
+# SYNC_MODE=incremental keeps it instead and only re-embeds, upserts or deletes the
+# ads that changed since the last run (tracked in a local manifest).
+incremental = os.environ.get("SYNC_MODE") == "incremental"
+manifest = SyncManifest.for_collection(f"qdrant-{collection_name}", model_id="sentence-transformers/all-MiniLM-L6-v2")
+# Full-precision copies of the vectors, keyed by point id, for the client-side re-rank.
+# Unchanged ads are never re-upserted, so an empty store (new or wiped) forces a rebuild.
+store = VectorStore(f"qdrant-{collection_name}", dim=384)
+if client.collection_exists(collection_name) and not (incremental and len(manifest) and len(store)):
    client.delete_collection(collection_name)
 
 # Create collection with vectors of 384 dimensions, using cosine similarity.
 # This matches the output of all-MiniLM-L6-v2 embeddings (384‑dim) :contentReference[oaicite:1]{index=1}.
-client.create_collection(
-   collection_name=collection_name,
-   vectors_config=VectorParams(size=384, distance=Distance.COSINE),
-)
+# QDRANT_QUANTIZATION=scalar|product|binary keeps a compressed copy in RAM and the
+# float32 originals on disk; "none" (default) stores plain float32 vectors in RAM.
+quantization = os.environ.get("QDRANT_QUANTIZATION", "none")
+if not client.collection_exists(collection_name):
+   manifest.reset()
+   store.clear()
+   create_quantized_collection(client, collection_name, dim=384, mode=quantization)
 
 # --------------------------------------------------------------------------
 # Step 4: Initialize embedding model.
 # Using a lightweight yet powerful model to generate semantic embeddings.
-embed = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+# EMBEDDING_SERVICE=start keeps the model warm in a background service across runs.
+embed = get_encoder("sentence-transformers/all-MiniLM-L6-v2")
+# Model calls are timed when VECTORDB_TIMING=1 (no-op otherwise)
+encode = timed("embed")(embed.encode)
 
 # --------------------------------------------------------------------------
 # Step 5: Define 8 real advertisement text lines to insert.
@@ -42,30 +65,61 @@ ads = [
 ]
 
 # --------------------------------------------------------------------------
-# Step 6: Encode ads, create PointStruct objects, and upsert them.
-points = []
-for i, text in enumerate(ads, start=1):
-   vec = embed.encode(text).tolist()  # -> 384-dim vector
-   points.append(PointStruct(id=i, vector=vec, payload={"ad_text": text}))
+# Step 6: Encode new/changed ads, upsert them as PointStructs and delete vanished ones.
+# Embeddings are cached on disk by (model, text), so re-runs only encode new ads.
+cache = EmbeddingCache("sentence-transformers/all-MiniLM-L6-v2", 384)
+
+def upsert_ads(ids, vectors, docs):
+   points = [PointStruct(id=doc_id, vector=vec.tolist(), payload=doc) for doc_id, vec, doc in zip(ids, vectors, docs)]
+   client.upsert(collection_name=collection_name, points=points, wait=True)
+   store.put(ids, vectors)
+   # Display the inserted ads for confirmation.
+   for pt in points:
+      print(f"- id={pt.id}: \"{pt.payload['ad_text']}\"")
 
-client.upsert(collection_name=collection_name, points=points, wait=True)
+def delete_ads(ids):
+   client.delete(collection_name, points_selector=PointIdsList(points=ids), wait=True)
+   store.delete(ids)
 
-# Display the inserted ads for confirmation.
-print("Inserted ads:")
-for pt in points:
-   print(f"- id={pt.id}: \"{pt.payload['ad_text']}\"")
+print("Upserted ads:")
+# Ads are keyed by their text here; a real corpus would use a stable key (path, URL, row id)
+stats = incremental_sync(
+   {text: {"ad_text": text} for text in ads}, manifest,
+   embed_fn=lambda batch: cache.embed(batch, encode),
+   upsert_fn=upsert_ads,
+   delete_fn=delete_ads,
+   text_field="ad_text",
+)
+cache.close()
+store.flush()
+print("Sync:", stats)
 
 # --------------------------------------------------------------------------
 # Step 7: Interactive search query from the user.
 user_query = input("\nEnter your search query: ")
 print(f"\nSearching for: \"{user_query}\"")
 
-# Encode user query into vector.
-q_vec = embed.encode(user_query).tolist()
-
-# Step 8: Execute semantic nearest-neighbor search.
-results = client.query_points(collection_name=collection_name,query=q_vec,with_payload=True,limit=3
-).points
+# Step 8: Encode the user query and execute semantic nearest-neighbor search.
+# Quantized collections oversample candidates and rescore them with the originals.
+# RERANK_OVERSAMPLE=4 fetches 4x the candidates and re-ranks them exactly on the client
+# against the local full-precision store (two-stage retrieval); 1 (default) disables it.
+# With VECTORDB_TIMING=1 each stage is timed and a summary is printed at exit.
+with request("qdrant.query"):
+   q_vec = encode(user_query, kind="query").tolist()
+   count("rows_embedded")
+   count("query_vector_bytes", 4 * len(q_vec))
+   oversample = int(os.environ.get("RERANK_OVERSAMPLE", "1"))
+   with stage("qdrant.round_trip"):
+      results = client.query_points(collection_name=collection_name,query=q_vec,with_payload=True,limit=3 * oversample,
+         search_params=quantized_search_params(quantization)
+      ).points
+   if oversample > 1:
+      with stage("rerank"):
+         reranked = rerank_hits(store, q_vec, results, k=3)
+      for pt, score in reranked:
+         pt.score = score
+      results = [pt for pt, _ in reranked]
+   count("hits_returned", len(results))
 
 # Step 9: Print top 3 matching ads with similarity scores.
 print("\nTop matching ads:")
@@ -0,0 +1,169 @@
+# Quantized Qdrant collections: scalar int8, product and binary quantization
+#
+# Step 1: quantization_config() builds the compressed copy Qdrant keeps in RAM,
+#         while the original float32 vectors can move to disk (on_disk=True).
+# Step 2: quantized_search_params() sets oversampling + rescoring at query time:
+#         fetch `limit * oversampling` candidates with the quantized vectors,
+#         then re-rank them with the originals.
+# Step 3: the benchmark reports estimated RAM, recall@k against exact float32
+#         search and p50/p99 latency for each mode.
+
+import argparse
+import time
+
+import numpy as np
+from qdrant_client import QdrantClient, models
+
+QUANTIZATION_MODES = ("none", "scalar", "product", "binary")
+
+
+# --------------------------------------------------------------------------
+# Step 1: Collection creation
+def quantization_config(mode, always_ram=True):
+    """
+    Qdrant quantization config for a mode name, or None for plain float32.
+    """
+    if mode == "none":
+        return None
+    if mode == "scalar":
+        return models.ScalarQuantization(scalar=models.ScalarQuantizationConfig(
+            type=models.ScalarType.INT8, quantile=0.99, always_ram=always_ram))
+    if mode == "product":
+        return models.ProductQuantization(product=models.ProductQuantizationConfig(
+            compression=models.CompressionRatio.X16, always_ram=always_ram))
+    if mode == "binary":
+        return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=always_ram))
+    raise ValueError(f"Unknown quantization mode '{mode}', expected one of {QUANTIZATION_MODES}")
+
+
+def create_quantized_collection(client, collection_name, dim=384, mode="scalar", on_disk=True,
+                                distance=models.Distance.COSINE, hnsw_m=16):
+    """
+    (Re)create a collection whose originals live on disk and whose quantized
+    vectors (and HNSW graph) stay in RAM. mode="none" keeps float32 in RAM,
+    matching the original demo.
+    """
+    if client.collection_exists(collection_name):
+        client.delete_collection(collection_name)
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=models.VectorParams(size=dim, distance=distance, on_disk=on_disk and mode != "none"),
+        quantization_config=quantization_config(mode),
+        hnsw_config=models.HnswConfigDiff(m=hnsw_m, on_disk=False),
+    )
+
+
+# --------------------------------------------------------------------------
+# Step 2: Query-time rescoring
+# Binary codes lose the most information, so they need the most candidates
+DEFAULT_OVERSAMPLING = {"none": 1.0, "scalar": 2.0, "product": 3.0, "binary": 4.0}
+
+
+def quantized_search_params(mode, oversampling=None, rescore=True, hnsw_ef=None):
+    """
+    SearchParams that oversample with quantized vectors and rescore with the originals.
+    """
+    if mode == "none":
+        return models.SearchParams(hnsw_ef=hnsw_ef)
+    return models.SearchParams(
+        hnsw_ef=hnsw_ef,
+        quantization=models.QuantizationSearchParams(
+            ignore=False,
+            rescore=rescore,
+            oversampling=oversampling or DEFAULT_OVERSAMPLING[mode],
+        ),
+    )
+
+
+def estimate_ram_mb(n, dim, mode, on_disk=True, hnsw_m=16):
+    """
+    Rough resident size of a collection: the vectors kept in RAM plus the HNSW links.
+    """
+    float_bytes = 0 if on_disk and mode != "none" else n * dim * 4
+    code_bytes = {"none": 0, "scalar": n * dim, "product": n * dim * 4 // 16, "binary": n * dim // 8}[mode]
+    graph_bytes = n * hnsw_m * 2 * 4
+    return (float_bytes + code_bytes + graph_bytes) / 2**20
+
+
+# --------------------------------------------------------------------------
+# Step 3: Benchmark
+def clustered_vectors(n, dim, n_clusters=64, noise=0.35, seed=0):
+    """
+    Normalized vectors around random centroids, closer to real embeddings than uniform noise.
+    """
+    rng = np.random.default_rng(seed)
+    centroids = rng.standard_normal((n_clusters, dim), dtype=np.float32)
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+    vectors = centroids[rng.integers(0, n_clusters, n)]
+    vectors = vectors + rng.standard_normal((n, dim), dtype=np.float32) * (noise / np.sqrt(dim))
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def wait_until_indexed(client, collection_name, timeout=600):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if client.get_collection(collection_name).status == models.CollectionStatus.GREEN:
+            return
+        time.sleep(0.5)
+    raise TimeoutError(f"Collection '{collection_name}' still optimizing after {timeout}s")
+
+
+def benchmark_mode(client, mode, corpus, queries, truth, k=10, oversampling=None, rescore=True, on_disk=True):
+    collection_name = f"quantization_bench_{mode}"
+    create_quantized_collection(client, collection_name, corpus.shape[1], mode, on_disk)
+    started = time.perf_counter()
+    client.upload_collection(collection_name=collection_name, vectors=corpus, ids=range(len(corpus)),
+                             batch_size=1024, wait=True)
+    wait_until_indexed(client, collection_name)
+    build_seconds = time.perf_counter() - started
+
+    params = quantized_search_params(mode, oversampling, rescore)
+    latencies, recalls = [], []
+    for query, expected in zip(queries, truth):
+        t0 = time.perf_counter()
+        points = client.query_points(collection_name=collection_name, query=query, limit=k,
+                                     search_params=params).points
+        latencies.append((time.perf_counter() - t0) * 1000)
+        recalls.append(len({p.id for p in points} & expected) / k)
+    client.delete_collection(collection_name)
+    return {
+        "mode": mode,
+        "ram_mb": estimate_ram_mb(len(corpus), corpus.shape[1], mode, on_disk),
+        "recall": float(np.mean(recalls)),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "build_s": build_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Qdrant quantization benchmark")
+    parser.add_argument("--url", default="http://localhost:6333",
+                        help="Qdrant URL; ':memory:' runs local mode, which ignores quantization")
+    parser.add_argument("--vectors", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--modes", nargs="+", default=list(QUANTIZATION_MODES), choices=QUANTIZATION_MODES)
+    parser.add_argument("--oversampling", type=float, help="Override the per-mode default")
+    parser.add_argument("--no-rescore", action="store_true")
+    args = parser.parse_args()
+
+    client = QdrantClient(":memory:") if args.url == ":memory:" else QdrantClient(url=args.url)
+    vectors = clustered_vectors(args.vectors + args.queries, args.dim)
+    corpus, queries = vectors[args.queries:], vectors[:args.queries]
+
+    # Exact float32 ground truth; points are uploaded with ids 0..n-1
+    scores = queries @ corpus.T
+    truth = [set(row.tolist()) for row in np.argpartition(-scores, args.k - 1, axis=1)[:, :args.k]]
+
+    print(f"📏 {len(corpus):,} x {args.dim}-dim vectors, {len(queries)} queries, recall@{args.k}")
+    print(f"{'mode':<8} {'RAM (est.)':>11} {'recall':>7} {'p50':>9} {'p99':>9} {'build':>8}")
+    for mode in args.modes:
+        row = benchmark_mode(client, mode, corpus, queries, truth, args.k, args.oversampling, not args.no_rescore)
+        print(f"{row['mode']:<8} {row['ram_mb']:>8.1f} MB {row['recall']:>7.3f} {row['p50_ms']:>7.2f}ms "
+              f"{row['p99_ms']:>7.2f}ms {row['build_s']:>7.1f}s")
+
+
+if __name__ == "__main__":
+    main()
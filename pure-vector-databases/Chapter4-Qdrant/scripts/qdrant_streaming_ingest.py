@@ -0,0 +1,232 @@
+# Streaming ingest pipeline for Qdrant: lazy read -> batched encode -> parallel upload
+#
+# Step 1: documents are read lazily (a file or a generator), never all in memory.
+# Step 2: they are encoded in batches, optionally by a pool of worker processes
+#         that each load the SentenceTransformer once.
+# Step 3: encoded batches flow through a bounded queue to several upload threads,
+#         so encoding of batch N+1 overlaps with uploading batch N.
+# Vectors go to Qdrant as NumPy arrays via upload_collection, never as Python lists.
+
+import argparse
+import contextlib
+import hashlib
+import itertools
+import json
+import multiprocessing
+import queue
+import threading
+import time
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, VectorParams
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+DIMENSION = 384
+_STOP = object()
+
+
+# --------------------------------------------------------------------------
+# Step 1: Lazy document sources
+def read_documents(path):
+    """
+    Yield {"text", ...payload} dicts from a .jsonl file (one object with a
+    "text" key per line) or a plain text file (one document per line).
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            yield json.loads(line) if path.endswith(".jsonl") else {"text": line}
+
+
+def synthetic_ads(n):
+    """
+    Yield n ad-like documents built from templates, for benchmarking.
+    """
+    hooks = ["Limited Time Offer", "Discover the Secret", "Join Thousands", "Boost Your Skills",
+             "Unlock Your Discount", "Experience Luxury", "Elevate Your Career", "Turn Dreams into Reality"]
+    topics = ["ageless beauty", "top-rated courses", "exclusive workshops", "smart home gadgets",
+              "travel deals", "fitness plans", "gourmet meals", "premium software"]
+    for i in range(n):
+        yield {"text": f"{hooks[i % len(hooks)]}: {topics[(i * 7) % len(topics)]} #{i}", "source": "synthetic"}
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+# --------------------------------------------------------------------------
+# Step 2: Encoders (run in worker processes when processes > 1)
+_model = None
+
+
+def _load_model(model_name):
+    global _model
+    if model_name == "hash":
+        _model = "hash"
+    else:
+        from sentence_transformers import SentenceTransformer  # Heavy import, only in encoders
+        _model = SentenceTransformer(model_name)
+
+
+def _hash_encode(texts):
+    """
+    Model-free stand-in: deterministic pseudo-embeddings, for testing the pipeline.
+    """
+    seeds = [int.from_bytes(hashlib.blake2b(t.encode(), digest_size=8).digest(), "little") for t in texts]
+    vectors = np.stack([np.random.default_rng(seed).standard_normal(DIMENSION) for seed in seeds])
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _encode_batch(batch):
+    started = time.perf_counter()
+    texts = [doc["text"] for doc in batch]
+    if _model == "hash":
+        vectors = _hash_encode(texts)
+    else:
+        vectors = _model.encode(texts, batch_size=len(texts), convert_to_numpy=True, normalize_embeddings=True)
+    return batch, vectors.astype(np.float32), time.perf_counter() - started
+
+
+# --------------------------------------------------------------------------
+# Step 3: The pipeline
+def stream_ingest(client, collection_name, documents, batch_size=256, processes=1, upload_workers=2,
+                  queue_size=8, model_name=MODEL_NAME, start_id=1, serialize_uploads=False):
+    """
+    Encode and upload documents with the encoder and uploaders overlapping.
+    Set `serialize_uploads` for local-mode clients, which are not thread-safe.
+    Point ids are assigned in document order from `start_id`. The first upload
+    error stops the pipeline and is re-raised.
+
+    Returns per-stage stats: docs/sec for read, encode and upload (each
+    measured over the time that stage was busy) and end-to-end.
+    """
+    encoded = queue.Queue(maxsize=queue_size)  # Back-pressure: encoders wait when uploads lag
+    stats = {"docs": 0, "batches": 0, "read_s": 0.0, "encode_s": 0.0, "upload_s": 0.0}
+    lock = threading.Lock()
+    upload_lock = threading.Lock() if serialize_uploads else contextlib.nullcontext()
+    errors = []
+    failed = threading.Event()  # Set on the first error; stops encoding, uploaders drain
+
+    def timed_batches():
+        iterator = batched(documents, batch_size)
+        while True:
+            t0 = time.perf_counter()
+            batch = next(iterator, None)
+            stats["read_s"] += time.perf_counter() - t0
+            if batch is None:
+                return
+            yield batch
+
+    next_id = itertools.count(start_id)
+
+    def send(item):
+        # Ids follow document order (imap preserves it), not upload completion order
+        batch, vectors, encode_seconds = item
+        encoded.put((batch, [next(next_id) for _ in batch], vectors, encode_seconds))
+
+    def produce():
+        try:
+            if processes > 1:
+                ctx = multiprocessing.get_context("spawn")  # Safe with torch's threads
+                with ctx.Pool(processes, initializer=_load_model, initargs=(model_name,)) as pool:
+                    for item in pool.imap(_encode_batch, timed_batches()):
+                        if failed.is_set():
+                            break
+                        send(item)
+            else:
+                _load_model(model_name)
+                for batch in timed_batches():
+                    if failed.is_set():
+                        break
+                    send(_encode_batch(batch))
+        except Exception as exc:
+            errors.append(exc)
+            failed.set()
+        finally:
+            for _ in range(upload_workers):
+                encoded.put(_STOP)
+
+    def upload():
+        while (item := encoded.get()) is not _STOP:
+            if failed.is_set():
+                continue  # Keep draining so the producer never blocks on a full queue
+            batch, ids, vectors, encode_seconds = item
+            try:
+                with upload_lock:
+                    t0 = time.perf_counter()
+                    client.upload_collection(collection_name=collection_name, vectors=vectors,
+                                             payload=batch, ids=ids, batch_size=len(batch), wait=True)
+                    elapsed = time.perf_counter() - t0
+            except Exception as exc:
+                errors.append(exc)
+                failed.set()
+                continue
+            with lock:
+                stats["upload_s"] += elapsed
+                stats["encode_s"] += encode_seconds
+                stats["docs"] += len(batch)
+                stats["batches"] += 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=produce)] + [threading.Thread(target=upload) for _ in range(upload_workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+    stats["wall_s"] = time.perf_counter() - started
+    docs = stats["docs"]
+    for stage in ("read", "encode", "upload"):
+        # Encode/upload time is summed over parallel workers, so divide by their count
+        parallelism = {"encode": processes, "upload": 1 if serialize_uploads else upload_workers}.get(stage, 1)
+        busy = stats[f"{stage}_s"] / parallelism
+        stats[f"{stage}_docs_per_sec"] = docs / busy if busy else float("inf")
+    stats["docs_per_sec"] = docs / stats["wall_s"] if stats["wall_s"] else float("inf")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming encode + upload pipeline for Qdrant")
+    parser.add_argument("--url", help="Qdrant URL, e.g. http://localhost:6333 (default: in-memory local mode)")
+    parser.add_argument("--path", help="Local-mode storage directory instead of :memory:")
+    parser.add_argument("--input", help=".jsonl or .txt file of documents (default: synthetic ads)")
+    parser.add_argument("--docs", type=int, default=20000, help="Synthetic document count")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--processes", type=int, default=1, help="Encoder processes")
+    parser.add_argument("--upload-workers", type=int, default=2)
+    parser.add_argument("--queue-size", type=int, default=8)
+    parser.add_argument("--model", default=MODEL_NAME, help="SentenceTransformer name, or 'hash' to skip the model")
+    args = parser.parse_args()
+
+    if args.url:
+        client = QdrantClient(url=args.url)
+    else:
+        client = QdrantClient(path=args.path) if args.path else QdrantClient(":memory:")
+
+    collection_name = "ads_stream_collection"
+    if client.collection_exists(collection_name):
+        client.delete_collection(collection_name)
+    client.create_collection(collection_name=collection_name,
+                             vectors_config=VectorParams(size=DIMENSION, distance=Distance.COSINE))
+
+    documents = read_documents(args.input) if args.input else synthetic_ads(args.docs)
+    stats = stream_ingest(client, collection_name, documents, args.batch_size, args.processes,
+                          args.upload_workers, args.queue_size, args.model, serialize_uploads=not args.url)
+
+    print(f"Ingested {stats['docs']} documents in {stats['batches']} batches ({stats['wall_s']:.1f}s)")
+    print(f"- read:   {stats['read_docs_per_sec']:>12,.0f} docs/sec")
+    print(f"- encode: {stats['encode_docs_per_sec']:>12,.0f} docs/sec ({args.processes} process(es))")
+    print(f"- upload: {stats['upload_docs_per_sec']:>12,.0f} docs/sec ({args.upload_workers} worker(s))")
+    print(f"- end-to-end: {stats['docs_per_sec']:>8,.0f} docs/sec")
+    print(f"Collection now holds {client.count(collection_name).count} points")
+
+
+if __name__ == "__main__":
+    main()
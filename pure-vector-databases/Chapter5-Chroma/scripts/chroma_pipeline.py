@@ -0,0 +1,287 @@
+"""
+Persistent Chroma ingestion and query pipeline with cold-start measurement.
+
+Chroma's embedded PersistentClient runs in-process, needing no server and no
+GPU. This script:
+
+1. Ingests a corpus into a PersistentClient collection with explicit HNSW
+   parameters (space, M, construction_ef, search_ef, sync_threshold). Batches
+   are bounded by record count (the client's max batch size) and by payload
+   bytes.
+2. Reopens the persisted collection in a fresh process and times each step
+   with its RSS: importing chromadb, opening the client, getting the
+   collection, and the first query (which loads the HNSW index from disk).
+3. Measures warm single-query latency and batched multi-query throughput
+   (many query embeddings per collection.query call).
+
+    python scripts/chroma_pipeline.py --docs 200000 --dim 384               # Synthetic vectors
+    python scripts/chroma_pipeline.py --input corpus.jsonl --backend sentence-transformers
+    python scripts/chroma_pipeline.py --skip-ingest --queries 500           # Re-measure an existing store
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "chroma_data")
+CATEGORIES = ["news", "sports", "tech", "finance", "health"]
+
+
+def rss_mb():
+    """
+    Current resident set size (falls back to peak RSS off Linux).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def open_collection(path, name, space="cosine", m=16, construction_ef=100, search_ef=64,
+                    sync_threshold=1000, reset=False):
+    """
+    Get or create a persistent collection with explicit HNSW parameters.
+    HNSW parameters are fixed at creation, so changing them requires reset=True.
+    """
+    import chromadb
+    client = chromadb.PersistentClient(path=path)
+    if reset and name in [getattr(c, "name", c) for c in client.list_collections()]:
+        client.delete_collection(name)
+    collection = client.get_or_create_collection(name, metadata={
+        "hnsw:space": space,
+        "hnsw:M": m,
+        "hnsw:construction_ef": construction_ef,
+        "hnsw:search_ef": search_ef,
+        # Inserts are flushed to the on-disk index every sync_threshold records
+        "hnsw:sync_threshold": sync_threshold,
+    })
+    return client, collection
+
+
+def synthetic_records(n, dim, seed=0, clusters=64):
+    """
+    Yield (id, embedding, document, metadata) around `clusters` centroids.
+    """
+    rng = np.random.default_rng(seed)
+    centroids = rng.standard_normal((clusters, dim)).astype(np.float32)
+    for start in range(0, n, 10_000):
+        size = min(10_000, n - start)
+        labels = rng.integers(0, clusters, size)
+        vectors = centroids[labels] + rng.standard_normal((size, dim)).astype(np.float32) * 0.5
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        for i in range(size):
+            doc_id = start + i
+            category = CATEGORIES[labels[i] % len(CATEGORIES)]
+            yield str(doc_id), vectors[i], f"Synthetic {category} document {doc_id}", {"category": category}
+
+
+def jsonl_records(path, encoder, embed_batch=256):
+    """
+    Yield records from a .jsonl file of {"id", "text", ...metadata} lines.
+    Rows without an "embedding" field are embedded in batches with `encoder`.
+    """
+    def flush(rows):
+        missing = [row for row in rows if "embedding" not in row]
+        if missing:
+            for row, vector in zip(missing, encoder.encode([row["text"] for row in missing])):
+                row["embedding"] = vector
+        for row in rows:
+            metadata = {k: v for k, v in row.items() if k not in ("id", "text", "embedding")}
+            yield str(row["id"]), np.asarray(row["embedding"], dtype=np.float32), row["text"], metadata or None
+
+    rows = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                rows.append(json.loads(line))
+                if len(rows) == embed_batch:
+                    yield from flush(rows)
+                    rows = []
+    yield from flush(rows)
+
+
+def bounded_batches(records, max_items, max_bytes):
+    """
+    Group records into batches limited both by count and by estimated payload size.
+    """
+    batch, size = [], 0
+    for record in records:
+        _, embedding, document, metadata = record
+        record_bytes = embedding.nbytes + len(document.encode()) + (len(json.dumps(metadata)) if metadata else 0)
+        if batch and (len(batch) >= max_items or size + record_bytes > max_bytes):
+            yield batch
+            batch, size = [], 0
+        batch.append(record)
+        size += record_bytes
+    if batch:
+        yield batch
+
+
+def ingest(client, collection, records, max_batch_bytes=32 << 20):
+    """
+    Upsert all records in size-bounded batches. Returns (records, seconds).
+    """
+    max_items = client.get_max_batch_size()
+    total, started = 0, time.perf_counter()
+    for batch in bounded_batches(records, max_items, max_batch_bytes):
+        ids, embeddings, documents, metadatas = zip(*batch)
+        collection.upsert(ids=list(ids), embeddings=np.stack(embeddings), documents=list(documents),
+                          metadatas=list(metadatas) if any(metadatas) else None)
+        total += len(batch)
+        if total % 50_000 < len(batch):
+            print(f"   … {total:,} records, {total / (time.perf_counter() - started):,.0f}/s", flush=True)
+    return total, time.perf_counter() - started
+
+
+def batched_search(collection, query_vectors, k=10, batch_size=32, where=None):
+    """
+    Run many queries with one collection.query call per `batch_size` embeddings.
+    Returns per-query lists of (id, distance).
+    """
+    results = []
+    for start in range(0, len(query_vectors), batch_size):
+        reply = collection.query(query_embeddings=np.asarray(query_vectors[start:start + batch_size]),
+                                 n_results=k, where=where, include=["distances"])
+        results.extend(list(zip(ids, distances)) for ids, distances in zip(reply["ids"], reply["distances"]))
+    return results
+
+
+def cold_start_probe(path, name, queries_file, k, query_batch):
+    """
+    Runs in a fresh process: time and RSS of each step of reopening the store,
+    then warm single-query latency and batched throughput. Prints one JSON line.
+    """
+    report = {"rss_start_mb": rss_mb()}
+    started = time.perf_counter()
+    import chromadb
+    report["import_s"], report["rss_after_import_mb"] = time.perf_counter() - started, rss_mb()
+
+    started = time.perf_counter()
+    client = chromadb.PersistentClient(path=path)
+    report["open_client_s"], report["rss_after_open_mb"] = time.perf_counter() - started, rss_mb()
+
+    started = time.perf_counter()
+    collection = client.get_collection(name)
+    report["get_collection_s"] = time.perf_counter() - started
+    report["records"] = collection.count()
+
+    queries = np.load(queries_file)
+    # The first query loads the collection's HNSW segment from disk
+    started = time.perf_counter()
+    collection.query(query_embeddings=queries[:1], n_results=k, include=["distances"])
+    report["first_query_s"], report["rss_after_first_query_mb"] = time.perf_counter() - started, rss_mb()
+
+    latencies = []
+    for vector in queries:
+        started = time.perf_counter()
+        collection.query(query_embeddings=vector[None, :], n_results=k, include=["distances"])
+        latencies.append((time.perf_counter() - started) * 1000)
+    report["warm_p50_ms"] = float(np.percentile(latencies, 50))
+    report["warm_p99_ms"] = float(np.percentile(latencies, 99))
+    report["single_qps"] = len(queries) / (sum(latencies) / 1000)
+
+    started = time.perf_counter()
+    batched_search(collection, queries, k, query_batch)
+    report["batched_qps"] = len(queries) / (time.perf_counter() - started)
+    report["rss_end_mb"] = rss_mb()
+    print(json.dumps(report))
+
+
+def measure_cold_start(path, name, query_vectors, k=10, query_batch=32):
+    """
+    Reopen the persisted collection in a fresh interpreter and collect its report.
+    """
+    queries_file = os.path.join(path, "probe_queries.npy")
+    np.save(queries_file, np.asarray(query_vectors, dtype=np.float32))
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--probe", "--path", path, "--collection", name,
+         "--probe-queries", queries_file, "-k", str(k), "--query-batch", str(query_batch)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    report = json.loads(output.strip().splitlines()[-1])
+    report["process_s"] = time.perf_counter() - started
+    os.remove(queries_file)
+    return report
+
+
+def print_report(report):
+    print("\n🧊 Cold start (fresh process):")
+    print(f"   import chromadb     {report['import_s'] * 1000:>9.0f} ms   RSS {report['rss_after_import_mb']:>7.0f} MB")
+    print(f"   PersistentClient    {report['open_client_s'] * 1000:>9.0f} ms   RSS {report['rss_after_open_mb']:>7.0f} MB")
+    print(f"   get_collection      {report['get_collection_s'] * 1000:>9.0f} ms   ({report['records']:,} records)")
+    print(f"   first query (HNSW)  {report['first_query_s'] * 1000:>9.0f} ms   RSS {report['rss_after_first_query_mb']:>7.0f} MB")
+    print(f"   whole process       {report['process_s'] * 1000:>9.0f} ms")
+    print("\n🔥 Warm queries:")
+    print(f"   single query        p50 {report['warm_p50_ms']:.2f} ms, p99 {report['warm_p99_ms']:.2f} ms "
+          f"({report['single_qps']:,.0f} QPS)")
+    print(f"   batched queries     {report['batched_qps']:,.0f} QPS")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Persistent Chroma ingest + cold/warm query benchmark")
+    parser.add_argument("--path", default=DEFAULT_PATH, help="PersistentClient directory")
+    parser.add_argument("--collection", default="documents")
+    parser.add_argument("--input", help=".jsonl corpus ({id, text, ...metadata[, embedding]} per line)")
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2", help="Embedding model for --input")
+    parser.add_argument("--backend", default="sentence-transformers", help="embedding_service backend for --input")
+    parser.add_argument("--docs", type=int, default=100_000, help="Synthetic records when no --input")
+    parser.add_argument("--dim", type=int, default=384, help="Synthetic vector dimension")
+    parser.add_argument("--skip-ingest", action="store_true", help="Only measure the existing collection")
+    parser.add_argument("--max-batch-mb", type=float, default=32, help="Payload bound per upsert batch")
+    parser.add_argument("--space", default="cosine", choices=["cosine", "l2", "ip"])
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--construction-ef", type=int, default=100)
+    parser.add_argument("--search-ef", type=int, default=64)
+    parser.add_argument("--sync-threshold", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--query-batch", type=int, default=32, help="Query embeddings per collection.query call")
+    parser.add_argument("--probe", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--probe-queries", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    path = os.path.abspath(args.path)
+
+    if args.probe:
+        cold_start_probe(path, args.collection, args.probe_queries, args.k, args.query_batch)
+        return
+
+    if not args.skip_ingest:
+        client, collection = open_collection(path, args.collection, args.space, args.m, args.construction_ef,
+                                             args.search_ef, args.sync_threshold, reset=True)
+        if args.input:
+            # Shared helpers (embedding service) live in <repo>/shared
+            sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "shared"))
+            from embedding_service import get_encoder
+            records = jsonl_records(args.input, get_encoder(args.model, args.backend))
+        else:
+            records = synthetic_records(args.docs, args.dim)
+        print(f"📥 Ingesting into {path} ({args.collection}, M={args.m}, construction_ef={args.construction_ef})")
+        total, seconds = ingest(client, collection, records, int(args.max_batch_mb * 2**20))
+        print(f"✅ {total:,} records in {seconds:.1f}s ({total / seconds:,.0f}/s)")
+        del client, collection
+
+    # Queries: perturbed copies of stored vectors, so they look like real traffic
+    import chromadb
+    client = chromadb.PersistentClient(path=path)
+    if args.collection not in [getattr(c, "name", c) for c in client.list_collections()]:
+        sys.exit(f"❌ No collection '{args.collection}' in {path}; run without --skip-ingest first")
+    collection = client.get_collection(args.collection)
+    if collection.count() == 0:
+        sys.exit(f"❌ Collection '{args.collection}' in {path} is empty; run without --skip-ingest first")
+    stored = collection.peek(limit=min(args.queries, collection.count()))["embeddings"]
+    rng = np.random.default_rng(1)
+    picks = np.asarray(stored, dtype=np.float32)[rng.integers(0, len(stored), args.queries)]
+    queries = picks + rng.standard_normal(picks.shape).astype(np.float32) * 0.05
+    print_report(measure_cold_start(path, args.collection, queries, args.k, args.query_batch))
+
+
+if __name__ == "__main__":
+    main()
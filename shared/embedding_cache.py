@@ -0,0 +1,226 @@
+"""
+Persistent, content-addressed embedding cache.
+
+Every demo re-embeds its whole corpus on each run. EmbeddingCache keeps the
+vectors on disk, keyed by a hash of (model id, text), so a warm re-ingest only
+pays for texts it has never seen:
+
+- vectors live in a memory-mapped float32 file (one row per slot)
+- keys are 16-byte BLAKE2b digests in a second memory-mapped file, with an
+  in-memory dict from digest to slot rebuilt on open
+- hits are served straight from the memory map (a zero-copy view when the
+  hit slots are contiguous, e.g. re-ingesting a corpus in the same order)
+- misses are embedded in a single batch call
+- the least recently used slots are evicted once `max_bytes` is reached
+
+    cache = EmbeddingCache("all-MiniLM-L6-v2", dim=384)
+    vectors = cache.embed(texts, model.encode)
+"""
+
+import hashlib
+import json
+import os
+import re
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "EMBEDDING_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "ai-vectordatabases", "embeddings")
+)
+KEY_BYTES = 16
+
+
+def cache_key(model_id, text):
+    """
+    Content address of one embedding: BLAKE2b-128 of the model id and text.
+    """
+    digest = hashlib.blake2b(digest_size=KEY_BYTES)
+    digest.update(model_id.encode())
+    digest.update(b"\0")
+    digest.update(text.encode())
+    return digest.digest()
+
+
+class EmbeddingCache:
+    """
+    Disk-backed cache of embeddings for a single model.
+    """
+
+    def __init__(self, model_id, dim, directory=DEFAULT_CACHE_DIR, max_bytes=1 << 30):
+        self.model_id = model_id
+        self.dim = dim
+        self.max_entries = max(1, max_bytes // (dim * 4))
+        self.directory = os.path.join(directory, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_id))
+        os.makedirs(self.directory, exist_ok=True)
+        self._header_path = os.path.join(self.directory, "header.json")
+        self.hits = 0
+        self.misses = 0
+
+        header = {"model_id": model_id, "dim": dim, "capacity": 0, "clock": 0}
+        if os.path.exists(self._header_path):
+            with open(self._header_path) as f:
+                header = json.load(f)
+            if header["dim"] != dim or header["model_id"] != model_id:
+                raise ValueError(f"Cache at {self.directory} holds {header['model_id']} ({header['dim']} dims)")
+        self._clock = header["clock"]
+        self._open(header["capacity"])
+
+        # Rebuild the digest -> slot map; an all-zero key marks a free slot
+        self._slots = {}
+        used = np.flatnonzero(self._keys.any(axis=1))
+        for slot in used.tolist():
+            self._slots[self._keys[slot].tobytes()] = slot
+        self._free = sorted(set(range(len(self._keys))) - set(used.tolist()), reverse=True)
+
+    def _file(self, name):
+        return os.path.join(self.directory, name)
+
+    def _map(self, name, dtype, shape):
+        path = self._file(name)
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        with open(path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        if size == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+
+    def _open(self, capacity):
+        self._vectors = self._map("vectors.f32", np.float32, (capacity, self.dim))
+        self._keys = self._map("keys.bin", np.uint8, (capacity, KEY_BYTES))
+        self._last_used = self._map("last_used.u64", np.uint64, (capacity,))
+
+    def _grow(self, needed):
+        old = len(self._keys)
+        capacity = min(self.max_entries, max(needed, 2 * old, 1024))
+        self.flush()
+        self._open(capacity)
+        self._free.extend(range(capacity - 1, old - 1, -1))
+
+    def _evict(self, needed, protected):
+        """
+        Free at least `needed` slots (plus 10% headroom) by evicting the
+        least recently used entries, never touching `protected` slots.
+        """
+        used = np.fromiter(self._slots.values(), dtype=np.int64)
+        used = used[~np.isin(used, protected)]
+        count = min(len(used), max(needed, self.max_entries // 10))
+        victims = used[np.argpartition(self._last_used[used], count - 1)[:count]]
+        for slot in victims.tolist():
+            del self._slots[self._keys[slot].tobytes()]
+        self._keys[victims] = 0
+        self._free.extend(victims.tolist())
+
+    def _allocate(self, n, protected):
+        if len(self._free) < n and len(self._keys) < self.max_entries:
+            self._grow(len(self._slots) + n)
+        if len(self._free) < n:
+            self._evict(n - len(self._free), protected)
+        return [self._free.pop() for _ in range(n)]
+
+    def __len__(self):
+        return len(self._slots)
+
+    def lookup(self, text):
+        """
+        Zero-copy view of one cached embedding, or None.
+        """
+        slot = self._slots.get(cache_key(self.model_id, text))
+        if slot is None:
+            return None
+        self._clock += 1
+        self._last_used[slot] = self._clock
+        return self._vectors[slot]
+
+    def embed(self, texts, embed_fn):
+        """
+        Return an (n, dim) float32 array of embeddings for `texts`, calling
+        `embed_fn(list_of_texts)` once for all distinct cache misses.
+        """
+        texts = list(texts)
+        keys = [cache_key(self.model_id, text) for text in texts]
+        slots = np.array([self._slots.get(key, -1) for key in keys], dtype=np.int64)
+        missing = np.flatnonzero(slots < 0)
+        self.misses += len(missing)
+        self.hits += len(texts) - len(missing)
+
+        if len(missing):
+            # Embed each distinct missing text once
+            first_index = {}
+            for i in missing.tolist():
+                first_index.setdefault(keys[i], i)
+            new_keys = list(first_index)
+            vectors = np.asarray(embed_fn([texts[first_index[k]] for k in new_keys]), dtype=np.float32)
+            if vectors.shape != (len(new_keys), self.dim):
+                raise ValueError(f"embed_fn returned shape {vectors.shape}, expected ({len(new_keys)}, {self.dim})")
+            if len(new_keys) + int((slots >= 0).sum()) > self.max_entries:
+                # Can't hold them all: serve this call without caching
+                lookup = dict(zip(new_keys, vectors))
+                result = np.empty((len(texts), self.dim), dtype=np.float32)
+                hit = slots >= 0
+                result[hit] = self._vectors[slots[hit]]
+                for i in missing.tolist():
+                    result[i] = lookup[keys[i]]
+                return result
+            new_slots = self._allocate(len(new_keys), protected=slots[slots >= 0])
+            for key, slot, vector in zip(new_keys, new_slots, vectors):
+                self._vectors[slot] = vector
+                self._keys[slot] = np.frombuffer(key, dtype=np.uint8)
+                self._slots[key] = slot
+            slots = np.array([self._slots[key] for key in keys], dtype=np.int64)
+
+        self._clock += 1
+        self._last_used[slots] = self._clock
+        if len(slots) and slots[0] >= 0 and np.all(np.diff(slots) == 1):
+            return self._vectors[slots[0]:slots[0] + len(slots)]  # Contiguous: zero-copy view
+        return np.asarray(self._vectors[slots])
+
+    def flush(self):
+        """
+        Write the memory maps and header to disk.
+        """
+        for array in (self._vectors, self._keys, self._last_used):
+            if isinstance(array, np.memmap):
+                array.flush()
+        with open(self._header_path, "w") as f:
+            json.dump({"model_id": self.model_id, "dim": self.dim,
+                       "capacity": len(self._keys), "clock": self._clock}, f)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._slots),
+            "capacity": len(self._keys),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "disk_mb": len(self._keys) * (self.dim * 4 + KEY_BYTES + 8) / 2**20,
+        }
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    def slow_embed(texts):
+        time.sleep(0.002 * len(texts))  # Stand-in for model inference
+        rng = np.random.default_rng(len(texts))
+        return rng.standard_normal((len(texts), 384), dtype=np.float32)
+
+    corpus = [f"Document number {i} about vector databases." for i in range(5000)]
+    with tempfile.TemporaryDirectory() as directory:
+        for run in ("cold", "warm"):
+            cache = EmbeddingCache("demo-model", 384, directory=directory)
+            started = time.perf_counter()
+            cache.embed(corpus, slow_embed)
+            print(f"🗄️ {run} ingest of {len(corpus)} texts: {time.perf_counter() - started:.3f}s {cache.stats()}")
+            cache.close()
@@ -0,0 +1,458 @@
+"""
+Warm, dynamically batching embedding service over a Unix socket.
+
+Every demo run pays for importing torch / onnxruntime and loading the model
+before it embeds a single query. This service loads the model once and keeps
+it warm. Requests from any number of processes and threads are gathered into
+micro-batches: a batch closes when it reaches --max-batch texts or when its
+oldest request has waited --max-wait-ms. Each batch is one model call.
+
+    python shared/embedding_service.py serve --model sentence-transformers/all-MiniLM-L6-v2
+    python shared/embedding_service.py serve --model BAAI/bge-small-en-v1.5 --backend fastembed
+    python shared/embedding_service.py bench --model sentence-transformers/all-MiniLM-L6-v2 --backend int8
+
+Clients only import the standard library and NumPy:
+
+    from embedding_service import get_encoder
+    encoder = get_encoder("sentence-transformers/all-MiniLM-L6-v2")
+    vectors = encoder.encode(texts)                  # (n, dim) float32
+    query = encoder.encode("some text", kind="query")
+
+get_encoder() behaviour depends on EMBEDDING_SERVICE:
+- auto (default): use the running service for that model/backend, else load in-process
+- start: launch the service in the background if it isn't running
+- off: always load in-process
+
+Backends:
+- sentence-transformers: PyTorch
+- int8: dynamically quantized Linear layers (CPU)
+- onnx: sentence-transformers ONNX; use --onnx-file for a quantized export
+- fastembed: ONNX runtime
+- hash: deterministic pseudo-embeddings, to measure the service itself
+
+Wire format, both directions: a 4-byte big-endian length, then a JSON header.
+Embed responses are followed by n * dim little-endian float32 values.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+DEFAULT_SOCKET_DIR = os.environ.get(
+    "EMBEDDING_SOCKET_DIR", os.path.join(os.path.expanduser("~"), ".cache", "ai-vectordatabases", "sockets")
+)
+BACKENDS = ("sentence-transformers", "int8", "onnx", "fastembed", "hash")
+HEADER = struct.Struct("!I")
+
+
+def default_socket_path(model, backend="sentence-transformers"):
+    os.makedirs(DEFAULT_SOCKET_DIR, exist_ok=True)
+    return os.path.join(DEFAULT_SOCKET_DIR, re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{model}-{backend}") + ".sock")
+
+
+def load_model(model, backend="sentence-transformers", onnx_file=None, hash_dim=384):
+    """
+    Import and load the model; returns encode(texts, kind) -> (n, dim) float32.
+    `kind` is "query" or "document" (only FastEmbed embeds them differently).
+    """
+    if backend == "hash":
+        def encode(texts, kind="document"):
+            out = np.empty((len(texts), hash_dim), dtype=np.float32)
+            for i, text in enumerate(texts):
+                seed = int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+                out[i] = np.random.default_rng(seed).standard_normal(hash_dim)
+            return out / np.linalg.norm(out, axis=1, keepdims=True)
+        return encode
+
+    if backend == "fastembed":
+        from fastembed import TextEmbedding
+        embedder = TextEmbedding(model)
+
+        def encode(texts, kind="document"):
+            vectors = embedder.query_embed(texts) if kind == "query" else embedder.passage_embed(texts)
+            return np.asarray(list(vectors), dtype=np.float32)
+        return encode
+
+    from sentence_transformers import SentenceTransformer
+    if backend == "onnx":
+        st = SentenceTransformer(model, device="cpu", backend="onnx",
+                                 model_kwargs={"file_name": onnx_file} if onnx_file else None)
+    else:
+        st = SentenceTransformer(model, device="cpu")
+        if backend == "int8":
+            import torch
+            st = torch.quantization.quantize_dynamic(st, {torch.nn.Linear}, dtype=torch.qint8)
+
+    def encode(texts, kind="document"):
+        return st.encode(texts, batch_size=max(1, len(texts)), convert_to_numpy=True).astype(np.float32, copy=False)
+    return encode
+
+
+class _Encoder:
+    def encode(self, texts, kind="document"):
+        """
+        SentenceTransformer-style: a str gives a 1-D vector, a list gives (n, dim).
+        """
+        if isinstance(texts, str):
+            return self._encode([texts], kind)[0]
+        return self._encode(list(texts), kind)
+
+
+class LocalEncoder(_Encoder):
+    """
+    In-process fallback; the model is imported and loaded on first use.
+    """
+
+    def __init__(self, model, backend="sentence-transformers", onnx_file=None):
+        self.model = model
+        self.backend = backend
+        self.onnx_file = onnx_file
+        self._encode_fn = None
+        self._lock = threading.Lock()
+
+    def _encode(self, texts, kind):
+        with self._lock:
+            if self._encode_fn is None:
+                self._encode_fn = load_model(self.model, self.backend, self.onnx_file)
+            return self._encode_fn(texts, kind)
+
+
+def _send(sock, header, payload=b""):
+    body = json.dumps(header).encode()
+    sock.sendall(HEADER.pack(len(body)) + body + payload)
+
+
+def _recv_exactly(sock, size):
+    view = memoryview(bytearray(size))
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if not n:
+            raise ConnectionError("embedding service closed the connection")
+        received += n
+    return view.obj
+
+
+class EmbeddingClient(_Encoder):
+    """
+    Client for a running service; one connection per thread, so concurrent
+    threads land in the same server-side micro-batch.
+    """
+
+    def __init__(self, socket_path, timeout=60):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _socket(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _call(self, message):
+        sock = self._socket()
+        try:
+            _send(sock, message)
+            (length,) = HEADER.unpack(_recv_exactly(sock, HEADER.size))
+            header = json.loads(_recv_exactly(sock, length))
+            if "error" in header:
+                raise RuntimeError(f"embedding service: {header['error']}")
+            payload = _recv_exactly(sock, header["n"] * header["dim"] * 4) if "n" in header else None
+            return header, payload
+        except (OSError, ConnectionError):
+            sock.close()
+            self._local.sock = None
+            raise
+
+    def _encode(self, texts, kind):
+        header, payload = self._call({"op": "embed", "texts": texts, "kind": kind})
+        return np.frombuffer(payload, dtype="<f4").reshape(header["n"], header["dim"])
+
+    def info(self):
+        return self._call({"op": "info"})[0]
+
+    def ping(self):
+        try:
+            self.info()
+            return True
+        except OSError:
+            return False
+
+    def close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+
+def start_service(model, backend="sentence-transformers", socket_path=None, wait=300, **options):
+    """
+    Launch `serve` as a detached background process and wait until it answers.
+    Returns the Popen handle (the service outlives this process unless stopped).
+    """
+    socket_path = socket_path or default_socket_path(model, backend)
+    command = [sys.executable, os.path.abspath(__file__), "serve", "--model", model, "--backend", backend,
+               "--socket", socket_path]
+    for name, value in options.items():
+        if value is not None:
+            command += [f"--{name.replace('_', '-')}", str(value)]
+    log = open(os.path.join(tempfile.gettempdir(), os.path.basename(socket_path) + ".log"), "ab")
+    process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+                               start_new_session=True)
+    client = EmbeddingClient(socket_path)
+    deadline = time.monotonic() + wait
+    while not client.ping():
+        if process.poll() is not None:
+            raise RuntimeError(f"embedding service exited with {process.returncode}; see {log.name}")
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"embedding service did not start within {wait}s; see {log.name}")
+        time.sleep(0.1)
+    client.close()
+    return process
+
+
+def get_encoder(model, backend="sentence-transformers", socket_path=None, mode=None):
+    """
+    Encoder for `model`: the warm service when available, else a lazy in-process model.
+    """
+    mode = mode or os.environ.get("EMBEDDING_SERVICE", "auto")
+    if mode != "off":
+        socket_path = socket_path or default_socket_path(model, backend)
+        client = EmbeddingClient(socket_path)
+        if client.ping():
+            return client
+        if mode == "start":
+            start_service(model, backend, socket_path)
+            return client
+    return LocalEncoder(model, backend)
+
+
+class MicroBatcher:
+    """
+    Gathers concurrent embed requests into batches of up to `max_batch` texts,
+    waiting at most `max_wait` seconds for a batch to fill, and runs them on a
+    single model thread so the event loop keeps accepting requests meanwhile.
+    """
+
+    def __init__(self, encode_fn, max_batch=64, max_wait_ms=2.0):
+        self.encode_fn = encode_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(1)
+        self.batches = 0
+        self.texts = 0
+
+    async def submit(self, texts, kind):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((texts, kind, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            size = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+            while size < self.max_batch:
+                try:
+                    item = self.queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self.queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                batch.append(item)
+                size += len(item[0])
+
+            # Queries and documents may embed differently (FastEmbed), so one call per kind
+            for kind in {item[1] for item in batch}:
+                group = [item for item in batch if item[1] == kind]
+                texts = [text for item in group for text in item[0]]
+                try:
+                    vectors = await loop.run_in_executor(self.executor, self.encode_fn, texts, kind)
+                except Exception as exc:
+                    for _, _, future in group:
+                        if not future.done():
+                            future.set_exception(exc)
+                    continue
+                self.batches += 1
+                self.texts += len(texts)
+                offset = 0
+                for item_texts, _, future in group:
+                    if not future.done():
+                        future.set_result(vectors[offset:offset + len(item_texts)])
+                    offset += len(item_texts)
+
+
+async def _serve(args):
+    started = time.perf_counter()
+    encode_fn = load_model(args.model, args.backend, args.onnx_file)
+    dim = int(encode_fn(["warm-up"], "query").shape[1])
+    print(f"🧠 Loaded {args.model} ({args.backend}, dim {dim}) in {time.perf_counter() - started:.1f}s", flush=True)
+
+    batcher = MicroBatcher(encode_fn, args.max_batch, args.max_wait_ms)
+    last_request = time.monotonic()
+    done = asyncio.Event()
+
+    async def handle(reader, writer):
+        nonlocal last_request
+        try:
+            while True:
+                (length,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+                message = json.loads(await reader.readexactly(length))
+                last_request = time.monotonic()
+                op = message.get("op")
+                payload = b""
+                if op == "embed":
+                    try:
+                        vectors = await batcher.submit(message["texts"], message.get("kind", "document"))
+                        header = {"n": len(vectors), "dim": dim}
+                        payload = np.ascontiguousarray(vectors, dtype="<f4").tobytes()
+                    except Exception as exc:
+                        header = {"error": f"{type(exc).__name__}: {exc}"}
+                elif op == "info":
+                    header = {"model": args.model, "backend": args.backend, "dim": dim, "batches": batcher.batches,
+                              "texts": batcher.texts, "mean_batch": batcher.texts / max(batcher.batches, 1)}
+                elif op == "shutdown":
+                    header = {"ok": True}
+                    done.set()
+                else:
+                    header = {"error": f"unknown op {op!r}"}
+                body = json.dumps(header).encode()
+                writer.write(HEADER.pack(len(body)) + body + payload)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    if os.path.exists(args.socket):
+        os.unlink(args.socket)
+    server = await asyncio.start_unix_server(handle, path=args.socket)
+    os.chmod(args.socket, 0o600)
+    batch_task = asyncio.create_task(batcher.run())
+    print(f"🔌 Listening on {args.socket} (max batch {args.max_batch}, max wait {args.max_wait_ms} ms)", flush=True)
+
+    async def idle_watchdog():
+        while args.idle_timeout:
+            await asyncio.sleep(min(args.idle_timeout, 30))
+            if time.monotonic() - last_request > args.idle_timeout:
+                print(f"💤 Idle for {args.idle_timeout}s, exiting", flush=True)
+                done.set()
+                return
+
+    watchdog = asyncio.create_task(idle_watchdog())
+    try:
+        await done.wait()
+    finally:
+        server.close()
+        batch_task.cancel()
+        watchdog.cancel()
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+def _percentiles(latencies):
+    return np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def _hammer(encoder, texts, concurrency):
+    """
+    Send one single-text query per request from `concurrency` threads.
+    Returns (QPS, p50 ms, p99 ms).
+    """
+    def one(text):
+        started = time.perf_counter()
+        encoder.encode([text], kind="query")
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        latencies = list(pool.map(one, texts))
+    return (len(texts) / (time.perf_counter() - started), *_percentiles(latencies))
+
+
+def bench(args):
+    texts = [f"Limited time offer number {i}: discover the secret to ageless beauty!" for i in range(args.requests)]
+    socket_path = os.path.join(tempfile.gettempdir(), f"embedding-bench-{os.getpid()}.sock")
+    process = start_service(args.model, args.backend, socket_path, onnx_file=args.onnx_file,
+                            max_batch=args.max_batch, max_wait_ms=args.max_wait_ms)
+    try:
+        # 1. A fresh script embedding one query: import + load vs connect to the warm service
+        here = os.path.dirname(os.path.abspath(__file__))
+        snippets = {
+            "in-process": f"LocalEncoder({args.model!r}, {args.backend!r}, {args.onnx_file!r})",
+            "service": f"EmbeddingClient({socket_path!r})",
+        }
+        print(f"\n🚀 Fresh process, one query ({args.model}, {args.backend}):")
+        for label, constructor in snippets.items():
+            code = f"import sys; sys.path.insert(0, {here!r}); from embedding_service import *; " \
+                   f"{constructor}.encode('hello world', kind='query')"
+            started = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], check=True)
+            print(f"   {label:<12} {(time.perf_counter() - started) * 1000:>9.0f} ms")
+
+        # 2. Warm single-query latency and 3. throughput under concurrency
+        local, client = LocalEncoder(args.model, args.backend, args.onnx_file), EmbeddingClient(socket_path)
+        local.encode(["warm-up"])
+        print(f"\n{'concurrency':>11} {'path':<12} {'QPS':>9} {'p50':>9} {'p99':>9}")
+        for concurrency in args.concurrency:
+            for label, encoder in (("in-process", local), ("service", client)):
+                qps, p50, p99 = _hammer(encoder, texts, concurrency)
+                print(f"{concurrency:>11} {label:<12} {qps:>9,.0f} {p50:>7.2f}ms {p99:>7.2f}ms")
+        info = client.info()
+        print(f"\n📦 Service batched {info['texts']:,} texts into {info['batches']:,} model calls "
+              f"(mean batch {info['mean_batch']:.1f})")
+        client._call({"op": "shutdown"})
+    finally:
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm, dynamically batching embedding service")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("serve", "bench"):
+        command = sub.add_parser(name)
+        command.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+        command.add_argument("--backend", default="sentence-transformers", choices=BACKENDS)
+        command.add_argument("--onnx-file", help="ONNX file inside the model repo, e.g. onnx/model_quint8_avx2.onnx")
+        command.add_argument("--max-batch", type=int, default=64, help="Texts per model call")
+        command.add_argument("--max-wait-ms", type=float, default=2.0, help="Longest a request waits for a batch to fill")
+    serve = sub.choices["serve"]
+    serve.add_argument("--socket", help="Unix socket path (default: per model/backend under ~/.cache)")
+    serve.add_argument("--idle-timeout", type=float, default=1800, help="Exit after this many idle seconds (0 = never)")
+    bench_parser = sub.choices["bench"]
+    bench_parser.add_argument("--requests", type=int, default=2000)
+    bench_parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        args.socket = args.socket or default_socket_path(args.model, args.backend)
+        asyncio.run(_serve(args))
+    else:
+        bench(args)
+
+
+if __name__ == "__main__":
+    main()
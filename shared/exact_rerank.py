@@ -0,0 +1,339 @@
+"""
+Two-stage retrieval: oversampled ANN candidates, exact NumPy re-rank.
+
+Approximate indexes (HNSW with a low ef, IVF with few probes, quantized
+vectors) trade recall for speed. A cheap way to win most of it back is to
+ask the backend for `k * oversample` candidates and re-score only those
+against the full-precision vectors:
+
+- VectorStore keeps the float32 vectors in a local memory-mapped file keyed
+  by document id (ints as-is, strings through sync_manifest.stable_id), so
+  it can be filled from the same upsert/delete callbacks as the index
+- rerank() gathers the candidate rows for a whole batch of queries, sorted
+  by row for sequential reads, and scores them with one batched matrix
+  product; candidates missing from the store get no score, and
+  rerank_hits() falls back to the backend's score for them
+- two_stage_search() wires a backend search function to rerank()
+
+    store = VectorStore("qdrant-ads", dim=384)
+    store.put(ids, vectors)
+    hits = client.query_points(..., limit=3 * 4).points
+    for hit, score in rerank_hits(store, q_vec, hits, k=3):
+        ...
+
+`python exact_rerank.py` measures recall@k of a deliberately lossy first
+stage with and without the re-rank at several oversample factors.
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from sync_manifest import stable_id
+
+DEFAULT_STORE_DIR = os.environ.get(
+    "RERANK_STORE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "ai-vectordatabases", "vectors")
+)
+METRICS = ("cosine", "dot", "l2")
+EMPTY = np.iinfo(np.int64).min  # Key of a free row; stable_id() never produces it
+
+
+def store_key(key):
+    """
+    Integer key of a document id: ints (and NumPy ints) as-is, anything else
+    (string keys, UUIDs) hashed with stable_id.
+    """
+    if isinstance(key, (int, np.integer)) and not isinstance(key, bool):
+        return int(key)
+    return stable_id(str(key))
+
+
+class VectorStore:
+    """
+    Full-precision vectors on disk, keyed by document id.
+
+    Rows live in a memory-mapped float32 file and their keys in a second
+    memory-mapped int64 file; the key -> row dict is rebuilt on open. Cosine
+    stores keep rows unit-normalized so scoring is a plain dot product.
+    """
+
+    def __init__(self, name, dim, metric="cosine", directory=DEFAULT_STORE_DIR):
+        if metric not in METRICS:
+            raise ValueError(f"metric must be one of {METRICS}, got {metric!r}")
+        self.directory = os.path.join(directory, name)
+        self.dim = dim
+        self.metric = metric
+        os.makedirs(self.directory, exist_ok=True)
+        self._header_path = self._file("header.json")
+
+        capacity = 0
+        if os.path.exists(self._header_path):
+            with open(self._header_path) as f:
+                header = json.load(f)
+            if header["dim"] != dim or header["metric"] != metric:
+                raise ValueError(f"Store at {self.directory} holds {header['dim']}-dim {header['metric']} vectors")
+            capacity = header["capacity"]
+        else:
+            # No header: any leftover maps are from an interrupted first write
+            for name in ("vectors.f32", "keys.i64"):
+                if os.path.exists(self._file(name)):
+                    os.remove(self._file(name))
+        self._open(capacity)
+
+        self._rows = {}
+        for row, key in enumerate(self._keys.tolist()):
+            if key != EMPTY:
+                self._rows[key] = row
+        self._free = [row for row in range(len(self._keys) - 1, -1, -1) if self._keys[row] == EMPTY]
+        self._index = None
+
+    def _file(self, name):
+        return os.path.join(self.directory, name)
+
+    def _map(self, name, dtype, shape, fill=0):
+        path = self._file(name)
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        with open(path, "ab") as f:
+            old = f.tell()
+            if old < size:
+                f.truncate(size)
+        if size == 0:
+            return np.zeros(shape, dtype=dtype)
+        array = np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+        if fill and old < size:
+            array.reshape(-1)[old // array.itemsize:] = fill
+        return array
+
+    def _open(self, capacity):
+        self._vectors = self._map("vectors.f32", np.float32, (capacity, self.dim))
+        self._keys = self._map("keys.i64", np.int64, (capacity,), fill=EMPTY)
+
+    def _grow(self, needed):
+        old = len(self._keys)
+        capacity = max(needed, 2 * old, 1024)
+        self.flush()
+        self._open(capacity)
+        self.flush()  # Record the new capacity before rows beyond the old one are used
+        self._free.extend(range(capacity - 1, old - 1, -1))
+
+    def __len__(self):
+        return len(self._rows)
+
+    def put(self, keys, vectors):
+        """
+        Insert or overwrite the vectors of `keys` (ints or strings).
+        """
+        keys = [store_key(key) for key in keys]
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(keys), self.dim)
+        if self.metric == "cosine":
+            vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        new = len({key for key in keys if key not in self._rows})
+        if new > len(self._free):
+            self._grow(len(self._rows) + new)
+        rows = []
+        for key in keys:
+            row = self._rows.get(key)
+            if row is None:
+                row = self._rows[key] = self._free.pop()
+                self._keys[row] = key
+            rows.append(row)
+        self._vectors[rows] = vectors
+        self._index = None
+
+    def delete(self, keys):
+        """
+        Remove `keys` from the store; unknown keys are ignored.
+        """
+        for key in map(store_key, keys):
+            row = self._rows.pop(key, None)
+            if row is not None:
+                self._keys[row] = EMPTY
+                self._free.append(row)
+        self._index = None
+
+    def clear(self):
+        self.delete(list(self._rows))
+
+    def rows(self, keys):
+        """
+        Row of each integer key in `keys` (any shape), -1 where absent.
+        """
+        if self._index is None:
+            sorted_keys = np.fromiter(self._rows.keys(), dtype=np.int64, count=len(self._rows))
+            sorted_rows = np.fromiter(self._rows.values(), dtype=np.int64, count=len(self._rows))
+            order = np.argsort(sorted_keys)
+            self._index = (sorted_keys[order], sorted_rows[order])
+        sorted_keys, sorted_rows = self._index
+        keys = np.asarray(keys, dtype=np.int64)
+        if not len(sorted_keys):
+            return np.full(keys.shape, -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+        return np.where(sorted_keys[pos] == keys, sorted_rows[pos], -1)
+
+    def get(self, keys):
+        """
+        (n, dim) float32 copy of the vectors of `keys`; raises KeyError for unknown keys.
+        """
+        rows = self.rows([store_key(key) for key in keys])
+        if (rows < 0).any():
+            raise KeyError(f"{int((rows < 0).sum())} key(s) not in {self.directory}")
+        return np.asarray(self._vectors[rows])
+
+    def gather(self, rows):
+        """
+        Vectors at `rows`, read from the memory map in ascending row order.
+        """
+        order = np.argsort(rows, kind="stable")
+        out = np.empty((len(rows), self.dim), dtype=np.float32)
+        out[order] = self._vectors[rows[order]]
+        return out
+
+    def flush(self):
+        """
+        Write the memory maps and header to disk.
+        """
+        for array in (self._vectors, self._keys):
+            if isinstance(array, np.memmap):
+                array.flush()
+        tmp = self._header_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"dim": self.dim, "metric": self.metric, "capacity": len(self._keys)}, f)
+        os.replace(tmp, self._header_path)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def rerank(store, queries, candidates, k):
+    """
+    Exact top-k of each query among its candidate ids.
+
+    `queries` is one vector or an (n, dim) batch, `candidates` a matching list
+    of id lists (ragged is fine). Returns (keys, scores), both (n, k): integer
+    store keys and exact scores, best first (cosine/dot similarity, or minus
+    the squared L2 distance). Short rows are padded with EMPTY / -inf.
+    """
+    queries = np.asarray(queries, dtype=np.float32)
+    if queries.ndim == 1:
+        queries, candidates = queries[None, :], [candidates]
+    if store.metric == "cosine":
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+
+    width = max((len(ids) for ids in candidates), default=0)
+    keys = np.full((len(queries), width), EMPTY, dtype=np.int64)
+    for i, ids in enumerate(candidates):
+        keys[i, :len(ids)] = [store_key(key) for key in ids]
+    rows = store.rows(keys)
+    found = rows >= 0
+
+    vectors = np.zeros((*keys.shape, store.dim), dtype=np.float32)
+    vectors[found] = store.gather(rows[found])
+    # (n, c, d) @ (n, d, 1): every query scored against its own candidates at once
+    scores = np.matmul(vectors, queries[:, :, None])[:, :, 0]
+    if store.metric == "l2":
+        scores = 2 * scores - np.einsum("ncd,ncd->nc", vectors, vectors) - np.einsum("nd,nd->n", queries, queries)[:, None]
+    scores[~found] = -np.inf
+
+    k = min(k, width)
+    if k == 0:
+        return keys[:, :0], scores[:, :0]
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top = np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    top_keys = np.where(np.isfinite(top_scores), np.take_along_axis(keys, top, axis=1), EMPTY)
+    return top_keys, top_scores
+
+
+def rerank_hits(store, query, hits, k, key=lambda hit: hit.id, score=lambda hit: hit.score):
+    """
+    Re-rank one query's backend hits (Qdrant points, Milvus hits, Redis result
+    dicts, ...) and return the best k as (hit, score) pairs, so payloads
+    fetched with the candidates can be used as-is.
+
+    Hits found in the store come first, by exact score. Hits missing from it
+    (a store that lags the index) are never dropped: they follow in backend
+    order with their backend `score(hit)`.
+    """
+    by_key = {store_key(key(hit)): hit for hit in hits}
+    keys, scores = rerank(store, query, list(by_key), k)
+    ranked = [(by_key[int(key)], float(score)) for key, score in zip(keys[0], scores[0]) if key != EMPTY]
+    if len(ranked) < min(k, len(by_key)):
+        missing = store.rows(list(by_key)) < 0
+        unscored = [hit for hit, absent in zip(by_key.values(), missing) if absent]
+        ranked += [(hit, float(score(hit))) for hit in unscored[:k - len(ranked)]]
+    return ranked
+
+
+def two_stage_search(search_fn, store, queries, k, oversample=4):
+    """
+    Run `search_fn(queries, limit)` -> one id list per query for the whole
+    batch with limit = k * oversample, then rerank() the candidates.
+    """
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    candidates = search_fn(queries, k * oversample)
+    return rerank(store, queries, candidates, k)
+
+
+def main():
+    """
+    Recall of a lossy first stage (sign-bit binary codes, Hamming distance)
+    with and without the exact re-rank, on clustered synthetic vectors.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--oversample", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(64, args.dim)).astype(np.float32)
+    base = centers[rng.integers(0, 64, args.rows)] + rng.normal(scale=0.8, size=(args.rows, args.dim)).astype(np.float32)
+    base /= np.linalg.norm(base, axis=1, keepdims=True)
+    queries = base[rng.choice(args.rows, args.queries, replace=False)] + rng.normal(
+        scale=0.02, size=(args.queries, args.dim)).astype(np.float32)
+    ids = np.arange(1, args.rows + 1)
+
+    store = VectorStore("rerank-benchmark", args.dim)
+    store.clear()
+    for start in range(0, args.rows, 10_000):
+        store.put(ids[start:start + 10_000], base[start:start + 10_000])
+    store.flush()
+    print(f"📦 Stored {len(store):,} x {args.dim} vectors in {store.directory}")
+
+    truth = ids[np.argsort(-(queries @ base.T), axis=1)[:, :args.k]]
+    codes = np.packbits(base > 0, axis=1)
+    popcount = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+    def hamming_search(batch, limit):
+        q_codes = np.packbits(batch > 0, axis=1)
+        distances = np.stack([popcount[codes ^ q].sum(axis=1) for q in q_codes])
+        return ids[np.argpartition(distances, limit - 1, axis=1)[:, :limit]].tolist()
+
+    def recall(found):
+        return np.mean([len(set(f) & set(t)) / args.k for f, t in zip(found, truth.tolist())])
+
+    first = recall(hamming_search(queries, args.k))
+    print(f"🎯 First stage alone: recall@{args.k} = {first:.3f}")
+    print(f"\n{'oversample':>10} {'candidates':>10} {'truth in candidates':>20} {'re-ranked recall':>17} {'re-rank ms/batch':>17}")
+    for factor in args.oversample:
+        candidates = hamming_search(queries, args.k * factor)
+        start = time.perf_counter()
+        keys, _ = rerank(store, queries, candidates, args.k)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{factor:>10} {args.k * factor:>10} {recall(candidates):>20.3f} {recall(keys.tolist()):>17.3f} {elapsed:>17.1f}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""
+Hot-path timing: per-stage latency histograms and counters for query paths.
+
+When a query is slow, this shows whether the time went to the model, the
+client round trip or the result decoding:
+
+    from instrumentation import count, request, stage, timed
+
+    with request("qdrant.query"):            # whole request, optionally profiled
+        with stage("embed"):
+            q_vec = model.encode(text)
+        with stage("qdrant.round_trip"):
+            hits = client.query_points(...).points
+        count("hits_returned", len(hits))
+
+Everything is off unless enabled, either with enable() or by setting
+VECTORDB_TIMING=1. When off, stage() returns a shared no-op object, and
+timed() and count() return after one flag check.
+
+When on:
+- report() prints a summary and snapshot() returns a JSON-ready dict
+- to_prometheus() renders the Prometheus text exposition format
+- VECTORDB_TIMING_EXPORT=timings.json (or .prom) writes a snapshot at exit
+
+Slow-request profiling (enable(profile_slow_ms=200) or
+VECTORDB_PROFILE_SLOW_MS=200) samples the calling thread's stack while a
+request() runs. Requests over the threshold keep their collapsed stacks, which
+flamegraph.pl and speedscope can read.
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+
+# Histogram bucket upper bounds in milliseconds (Prometheus "le" labels)
+BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_enabled = False
+_profile_slow_ms = None
+_profile_interval = 0.005
+_on_slow = None
+
+
+class Histogram:
+    __slots__ = ("buckets", "count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms):
+        self.buckets[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def quantile(self, q):
+        """
+        Upper bound of the bucket holding the q-quantile (capped at the max seen).
+        """
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, n in zip(BUCKETS_MS + (float("inf"),), self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.slow_requests = deque(maxlen=20)
+
+    def observe(self, name, ms):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(ms)
+
+    def add(self, name, value):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.slow_requests.clear()
+
+
+REGISTRY = Registry()
+
+
+class _Noop:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _Noop()
+
+
+class _Stage:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        REGISTRY.observe(self.name, (time.perf_counter() - self.started) * 1000)
+        return False
+
+
+class _StackSampler(threading.Thread):
+    """
+    Samples one thread's Python stack every `interval` seconds into collapsed-stack counts.
+    """
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.done = threading.Event()
+
+    def run(self):
+        while not self.done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self.done.set()
+        self.join()
+        return self.stacks
+
+
+class _Request(_Stage):
+    __slots__ = ("sampler", "slow_ms")
+
+    def __enter__(self):
+        # Read the threshold once: disable() may reset it while the request is open
+        self.sampler, self.slow_ms = None, _profile_slow_ms
+        if self.slow_ms is not None:
+            self.sampler = _StackSampler(threading.get_ident(), _profile_interval)
+            self.sampler.start()
+        return super().__enter__()
+
+    def __exit__(self, *exc):
+        ms = (time.perf_counter() - self.started) * 1000
+        REGISTRY.observe(self.name, ms)
+        if self.sampler is not None:
+            stacks = self.sampler.stop()
+            if ms >= self.slow_ms:
+                _record_slow(self.name, ms, stacks)
+        return False
+
+
+def stage(name):
+    """
+    Context manager timing one stage into the `name` histogram.
+    """
+    if not _enabled:
+        return _NOOP
+    return _Stage(name)
+
+
+def request(name):
+    """
+    Like stage(), for a whole request; slow ones are profiled when enabled.
+    """
+    if not _enabled:
+        return _NOOP
+    return _Request(name)
+
+
+def timed(name=None):
+    """
+    Decorator timing every call of a function (histogram defaults to its qualname).
+    """
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                REGISTRY.observe(label, (time.perf_counter() - started) * 1000)
+        return wrapper
+    return decorate
+
+
+def count(name, value=1):
+    """
+    Add `value` to a counter such as rows_embedded, bytes_sent or hits_returned.
+    """
+    if _enabled:
+        REGISTRY.add(name, value)
+
+
+def enabled():
+    return _enabled
+
+
+def enable(profile_slow_ms=None, profile_interval_ms=5.0, on_slow=None):
+    """
+    Start recording. With profile_slow_ms, request() blocks sample their stack
+    and requests slower than the threshold are handed to on_slow(name, ms, stacks)
+    (default: keep them for snapshot() and print the hottest frames to stderr).
+    The sampler needs the GIL, so intervals below sys.getswitchinterval() (5 ms)
+    don't add samples while the request runs Python code.
+    """
+    global _enabled, _profile_slow_ms, _profile_interval, _on_slow
+    _enabled = True
+    _profile_slow_ms = profile_slow_ms
+    _profile_interval = profile_interval_ms / 1000
+    _on_slow = on_slow
+
+
+def disable():
+    global _enabled, _profile_slow_ms
+    _enabled = False
+    _profile_slow_ms = None
+
+
+def _record_slow(name, ms, stacks):
+    if _on_slow is not None:
+        _on_slow(name, ms, stacks)
+        return
+    leaves = Counter()
+    for stack, n in stacks.items():
+        leaves[stack.rsplit(";", 1)[-1]] += n
+    REGISTRY.slow_requests.append({"request": name, "ms": round(ms, 3), "samples": sum(stacks.values()),
+                                   "top_frames": leaves.most_common(5), "stacks": dict(stacks)})
+    hot = ", ".join(f"{frame} ({n})" for frame, n in leaves.most_common(3)) or "no samples"
+    print(f"🐢 Slow {name}: {ms:.1f} ms; hottest frames: {hot}", file=sys.stderr)
+
+
+def write_folded(stacks, path):
+    """
+    Write collapsed stacks ("a;b;c count" lines) for flamegraph.pl or speedscope.
+    """
+    with open(path, "w") as f:
+        for stack, n in sorted(stacks.items()):
+            f.write(f"{stack} {n}\n")
+
+
+def snapshot():
+    """
+    JSON-ready view of every histogram, counter and kept slow request.
+    """
+    with REGISTRY.lock:
+        stages = {
+            name: {
+                "count": h.count,
+                "sum_ms": round(h.total_ms, 3),
+                "mean_ms": round(h.total_ms / h.count, 3) if h.count else 0.0,
+                "p50_ms": h.quantile(0.5),
+                "p95_ms": h.quantile(0.95),
+                "p99_ms": h.quantile(0.99),
+                "max_ms": round(h.max_ms, 3),
+                "buckets": dict(zip([str(b) for b in BUCKETS_MS] + ["+Inf"], h.buckets)),
+            }
+            for name, h in REGISTRY.histograms.items()
+        }
+        return {"stages": stages, "counters": dict(REGISTRY.counters),
+                "slow_requests": [{k: v for k, v in slow.items() if k != "stacks"} for slow in REGISTRY.slow_requests]}
+
+
+def to_prometheus(prefix="vectordb"):
+    """
+    Prometheus text exposition: one stage-labelled histogram plus one counter per name.
+    """
+    lines = [f"# HELP {prefix}_stage_seconds Latency per hot-path stage.", f"# TYPE {prefix}_stage_seconds histogram"]
+    with REGISTRY.lock:
+        for name, h in sorted(REGISTRY.histograms.items()):
+            cumulative = 0
+            for bound, n in zip(BUCKETS_MS + (float("inf"),), h.buckets):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound / 1000)
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {h.total_ms / 1000}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {h.count}')
+        for name, value in sorted(REGISTRY.counters.items()):
+            metric = f"{prefix}_{name.replace('.', '_')}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    return "\n".join(lines) + "\n"
+
+
+def export(path):
+    """
+    Write a snapshot to `path`: Prometheus text for .prom/.txt, JSON otherwise.
+    """
+    with open(path, "w") as f:
+        if path.endswith((".prom", ".txt")):
+            f.write(to_prometheus())
+        else:
+            json.dump(snapshot(), f, indent=2)
+
+
+def report(file=sys.stderr):
+    """
+    Print a per-stage latency table and the counters.
+    """
+    data = snapshot()
+    if not data["stages"] and not data["counters"]:
+        return
+    print(f"\n⏱️  {'stage':<28} {'count':>7} {'mean':>9} {'p50':>9} {'p99':>9} {'max':>9}", file=file)
+    for name, s in data["stages"].items():
+        print(f"   {name:<28} {s['count']:>7} {s['mean_ms']:>7.2f}ms {s['p50_ms']:>7.2f}ms "
+              f"{s['p99_ms']:>7.2f}ms {s['max_ms']:>7.2f}ms", file=file)
+    for name, value in data["counters"].items():
+        print(f"   {name:<28} {value:>7,}", file=file)
+
+
+def _at_exit():
+    if not _enabled:
+        return
+    report()
+    path = os.environ.get("VECTORDB_TIMING_EXPORT")
+    if path:
+        export(path)
+
+
+if os.environ.get("VECTORDB_TIMING", "").lower() in ("1", "true", "yes"):
+    slow_ms = os.environ.get("VECTORDB_PROFILE_SLOW_MS")
+    enable(profile_slow_ms=float(slow_ms) if slow_ms else None)
+atexit.register(_at_exit)
@@ -0,0 +1,135 @@
+"""
+Incremental sync for vector stores, driven by a local hash manifest.
+
+The demos wipe their collection and re-embed everything on each run. Here a
+JSON manifest remembers, per document key, the hash of the content that was
+embedded and the id it was stored under. Each run diffs the corpus against it:
+
+- new or changed documents are embedded and upserted in batches
+- documents that vanished from the corpus are deleted in batches
+- unchanged documents cost nothing
+
+Store-specific work is passed in as two callables, so any backend can sync:
+
+    manifest = SyncManifest.for_collection("qdrant-ads_collection", model_id="all-MiniLM-L6-v2")
+    stats = incremental_sync(documents, manifest, model.encode,
+                             upsert_fn=lambda ids, vectors, docs: ...,
+                             delete_fn=lambda ids: ...)
+"""
+
+import hashlib
+import json
+import os
+import re
+
+import numpy as np
+
+DEFAULT_MANIFEST_DIR = os.environ.get(
+    "SYNC_MANIFEST_DIR", os.path.join(os.path.expanduser("~"), ".cache", "ai-vectordatabases", "sync")
+)
+
+
+def content_hash(doc, salt=""):
+    """
+    Hex BLAKE2b of a document's canonical JSON (plus e.g. the model id).
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(salt.encode())
+    digest.update(b"\0")
+    digest.update(json.dumps(doc, sort_keys=True, ensure_ascii=False, default=str).encode())
+    return digest.hexdigest()
+
+
+def stable_id(key):
+    """
+    Positive 63-bit integer id derived from a document key, valid as a
+    Milvus INT64 primary key and a Qdrant point id.
+    """
+    return int.from_bytes(hashlib.blake2b(str(key).encode(), digest_size=8).digest(), "big") >> 1
+
+
+class SyncManifest:
+    """
+    Per-collection record of {document key: {"hash", "id"}}, saved atomically.
+    """
+
+    def __init__(self, path, model_id=""):
+        self.path = path
+        self.model_id = model_id
+        self.entries = {}
+        if os.path.exists(path):
+            # Hashes are salted with the model id, so switching models marks
+            # every document as changed while ids (and deletions) carry over
+            with open(path) as f:
+                self.entries = json.load(f)["entries"]
+
+    @classmethod
+    def for_collection(cls, name, model_id="", directory=DEFAULT_MANIFEST_DIR):
+        os.makedirs(directory, exist_ok=True)
+        return cls(os.path.join(directory, re.sub(r"[^A-Za-z0-9_.-]+", "_", name) + ".json"), model_id)
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"model_id": self.model_id, "entries": self.entries}, f)
+        os.replace(tmp, self.path)
+
+    def reset(self):
+        """
+        Forget everything, e.g. after the collection was rebuilt from scratch.
+        """
+        self.entries = {}
+        self.save()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def plan_sync(documents, manifest):
+    """
+    Diff a {key: doc} corpus against the manifest.
+    Returns {"added": [keys], "changed": [keys], "removed": [keys], "unchanged": count}.
+    """
+    added, changed, unchanged = [], [], 0
+    for key, doc in documents.items():
+        entry = manifest.entries.get(key)
+        if entry is None:
+            added.append(key)
+        elif entry["hash"] != content_hash(doc, manifest.model_id):
+            changed.append(key)
+        else:
+            unchanged += 1
+    removed = [key for key in manifest.entries if key not in documents]
+    return {"added": added, "changed": changed, "removed": removed, "unchanged": unchanged}
+
+
+def incremental_sync(documents, manifest, embed_fn, upsert_fn, delete_fn, text_field="text",
+                     batch_size=256, delete_batch_size=1000, id_fn=stable_id):
+    """
+    Bring a store in line with `documents` ({key: doc dict}) touching only the diff.
+
+    embed_fn(texts) -> (n, dim) vectors; upsert_fn(ids, vectors, docs) writes
+    one batch; delete_fn(ids) removes one batch. The manifest is saved after
+    every batch, so an interrupted sync resumes where it stopped.
+    """
+    plan = plan_sync(documents, manifest)
+    to_write = plan["added"] + plan["changed"]
+    for start in range(0, len(to_write), batch_size):
+        keys = to_write[start:start + batch_size]
+        docs = [documents[key] for key in keys]
+        ids = [manifest.entries[key]["id"] if key in manifest.entries else id_fn(key) for key in keys]
+        vectors = np.asarray(embed_fn([doc[text_field] for doc in docs]), dtype=np.float32)
+        upsert_fn(ids, vectors, docs)
+        for key, doc_id, doc in zip(keys, ids, docs):
+            manifest.entries[key] = {"hash": content_hash(doc, manifest.model_id), "id": doc_id}
+        manifest.save()
+
+    removed = plan["removed"]
+    for start in range(0, len(removed), delete_batch_size):
+        keys = removed[start:start + delete_batch_size]
+        delete_fn([manifest.entries[key]["id"] for key in keys])
+        for key in keys:
+            del manifest.entries[key]
+        manifest.save()
+
+    return {name: len(value) if isinstance(value, list) else value for name, value in plan.items()}
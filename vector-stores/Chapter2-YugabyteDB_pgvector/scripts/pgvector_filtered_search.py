@@ -0,0 +1,323 @@
+"""
+Filtered ANN for the products table: pick the index from the filter's selectivity.
+
+The hybrid query in load_data.sql filters on category and created_at and then
+orders by embedding <-> q over one global HNSW index. The index walk knows
+nothing about the filter, so a selective filter either under-returns (the
+ef_search candidates are mostly filtered out) or the planner falls back to a
+full scan. This module offers two physical layouts and a router:
+
+- Partial indexes: one HNSW index per category (WHERE category = '...')
+- List partitions: products_by_category, one partition (and index) per category
+- FilteredRouter.search(): estimates how many rows the filter keeps with
+  EXPLAIN, then
+    * few rows      -> exact search over just the filtered rows
+    * a category    -> its partial index / partition, ef_search raised for
+                       any remaining created_at filter
+    * otherwise     -> the global index, ef_search raised by 1 / selectivity
+
+    python scripts/pgvector_filtered_search.py --rows 200000 --setup partial partitioned
+"""
+
+import argparse
+import json
+import re
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import psycopg
+from psycopg import sql
+
+DEFAULT_DSN = "postgresql://yugabyte@localhost:5433/yugabyte"  # docker-setup.sh
+PARTITIONED_TABLE = "products_by_category"
+
+
+def vector_literal(vector):
+    return "[" + ",".join(map(str, np.asarray(vector, dtype=np.float32).tolist())) + "]"
+
+
+def _slug(category):
+    return re.sub(r"[^a-z0-9]+", "_", category.lower()).strip("_")
+
+
+def partial_index_name(category, table="products"):
+    return f"{table}_embedding_{_slug(category)}_idx"
+
+
+# --------------------------------------------------------------------------
+# Physical layouts
+def create_partial_indexes(conn, categories=None, m=16, ef_construction=64, table="products"):
+    """
+    One HNSW index per category, each covering only that category's rows.
+    """
+    if categories is None:
+        categories = [row[0] for row in conn.execute(f"SELECT DISTINCT category FROM {table}")]
+    for category in categories:
+        started = time.perf_counter()
+        conn.execute(sql.SQL(
+            "CREATE INDEX IF NOT EXISTS {name} ON {table} USING hnsw (embedding vector_l2_ops) "
+            "WITH (m = {m}, ef_construction = {ef}) WHERE category = {category}").format(
+            name=sql.Identifier(partial_index_name(category, table)), table=sql.Identifier(table),
+            m=sql.Literal(m), ef=sql.Literal(ef_construction), category=sql.Literal(category)))
+        print(f" • partial index for '{category}' built in {time.perf_counter() - started:.1f}s")
+    return categories
+
+
+def create_category_partitions(conn, dim, categories=None, m=16, ef_construction=64, source="products"):
+    """
+    Copy `source` into a table list-partitioned by category, with an HNSW
+    index and a created_at index on every partition.
+    """
+    if categories is None:
+        categories = [row[0] for row in conn.execute(f"SELECT DISTINCT category FROM {source}")]
+    conn.execute(f"DROP TABLE IF EXISTS {PARTITIONED_TABLE}")
+    conn.execute(f"""
+        CREATE TABLE {PARTITIONED_TABLE} (
+            id INT NOT NULL,
+            name TEXT NOT NULL,
+            category TEXT NOT NULL,
+            description TEXT,
+            embedding VECTOR({dim}),
+            created_at TIMESTAMP DEFAULT NOW(),
+            PRIMARY KEY (id, category)
+        ) PARTITION BY LIST (category)""")
+    for category in categories:
+        partition = f"{PARTITIONED_TABLE}_{_slug(category)}"
+        conn.execute(sql.SQL("CREATE TABLE {partition} PARTITION OF {parent} FOR VALUES IN ({category})").format(
+            partition=sql.Identifier(partition), parent=sql.Identifier(PARTITIONED_TABLE),
+            category=sql.Literal(category)))
+    conn.execute(f"INSERT INTO {PARTITIONED_TABLE} SELECT id, name, category, description, embedding, created_at "
+                 f"FROM {source}")
+    started = time.perf_counter()
+    # Indexes on the parent cascade to every partition
+    conn.execute(f"CREATE INDEX ON {PARTITIONED_TABLE} USING hnsw (embedding vector_l2_ops) "
+                 f"WITH (m = {m}, ef_construction = {ef_construction})")
+    conn.execute(f"CREATE INDEX ON {PARTITIONED_TABLE} (created_at)")
+    conn.execute(f"ANALYZE {PARTITIONED_TABLE}")
+    print(f" • {len(categories)} partitions indexed in {time.perf_counter() - started:.1f}s")
+    return categories
+
+
+# --------------------------------------------------------------------------
+# Routing
+def _where(category=None, since=None):
+    clauses = []
+    if category is not None:
+        # A literal (not a bind parameter) lets the planner match partial indexes
+        clauses.append(sql.SQL("category = {}").format(sql.Literal(category)))
+    if since is not None:
+        clauses.append(sql.SQL("created_at > {}").format(sql.Literal(since)))
+    return sql.SQL("WHERE ") + sql.SQL(" AND ").join(clauses) if clauses else sql.SQL("")
+
+
+class FilteredRouter:
+    """
+    Route filtered vector searches on `table` to the cheapest accurate plan.
+    The connection must be in autocommit mode; each search runs in its own
+    transaction so SET LOCAL settings don't leak.
+    """
+
+    STRATEGIES = ("auto", "global", "partial", "partitioned", "exact")
+
+    def __init__(self, conn, table="products", exact_max_rows=20_000, min_ef=40, max_ef=1000):
+        self.conn = conn
+        self.table = table
+        self.exact_max_rows = exact_max_rows
+        self.min_ef = min_ef
+        self.max_ef = max_ef
+        self.refresh()
+
+    def refresh(self):
+        """
+        Re-read which partial indexes / partitions exist and the table size.
+        """
+        self.partial = {
+            name for (name,) in self.conn.execute(
+                "SELECT indexname FROM pg_indexes WHERE tablename = %s", (self.table,))}
+        self.partitioned = self.conn.execute(
+            "SELECT to_regclass(%s) IS NOT NULL", (PARTITIONED_TABLE,)).fetchone()[0]
+        self.total_rows = max(self.estimate_rows(), 1)
+        version = self.conn.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector'").fetchone()
+        self.iterative_scan = version is not None and tuple(map(int, version[0].split(".")[:2])) >= (0, 8)
+
+    def estimate_rows(self, category=None, since=None, table=None):
+        """
+        The planner's row estimate for a filter (needs ANALYZE to be current).
+        """
+        query = sql.SQL("EXPLAIN (FORMAT JSON) SELECT 1 FROM {} ").format(sql.Identifier(table or self.table))
+        plan = self.conn.execute(query + _where(category, since)).fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]["Plan"]["Plan Rows"]
+
+    def _ef_for(self, selectivity, k):
+        # Enough candidates that ~2k of them survive the filter
+        return int(min(self.max_ef, max(self.min_ef, 2 * k / max(selectivity, 1e-6))))
+
+    def plan(self, category=None, since=None, k=5, strategy="auto"):
+        """
+        Decide how to run a search: returns {"strategy", "table", "ef_search", "estimated_rows"}.
+        """
+        estimated = self.estimate_rows(category, since)
+        selectivity = estimated / self.total_rows
+        has_partial = category is not None and partial_index_name(category, self.table) in self.partial
+        if strategy == "auto":
+            if category is None and since is None:
+                strategy = "global"
+            elif estimated <= self.exact_max_rows:
+                strategy = "exact"
+            elif category is not None and self.partitioned:
+                strategy = "partitioned"
+            elif has_partial:
+                strategy = "partial"
+            else:
+                strategy = "global"
+
+        ef = None
+        if strategy in ("partial", "partitioned") and category is not None:
+            # Within the category only the created_at filter still thins the candidates
+            in_category = self.estimate_rows(category)
+            ef = self._ef_for(estimated / max(in_category, 1), k)
+        elif strategy == "global":
+            ef = self._ef_for(selectivity, k)
+        table = PARTITIONED_TABLE if strategy == "partitioned" else self.table
+        return {"strategy": strategy, "table": table, "ef_search": ef, "estimated_rows": estimated}
+
+    def search(self, query_vector, category=None, since=None, k=5, strategy="auto",
+               columns=("id", "name", "category")):
+        """
+        Top-k rows matching the filter, nearest first. Returns (rows, plan).
+        """
+        plan = self.plan(category, since, k, strategy)
+        where = _where(category, since)
+        cols = sql.SQL(", ").join(map(sql.Identifier, columns))
+        vec = vector_literal(query_vector)
+        if plan["strategy"] == "exact":
+            # Materialize the filtered rows so no ANN index is used, then sort exactly
+            query = sql.SQL(
+                "WITH filtered AS MATERIALIZED (SELECT {cols}, embedding FROM {table} {where}) "
+                "SELECT {cols}, embedding <-> %s::vector AS distance FROM filtered ORDER BY distance LIMIT %s"
+            ).format(cols=cols, table=sql.Identifier(plan["table"]), where=where)
+        else:
+            query = sql.SQL(
+                "SELECT {cols}, embedding <-> %s::vector AS distance FROM {table} {where} "
+                "ORDER BY embedding <-> %s::vector LIMIT %s"
+            ).format(cols=cols, table=sql.Identifier(plan["table"]), where=where)
+
+        with self.conn.transaction():
+            if plan["ef_search"]:
+                self.conn.execute(f"SET LOCAL hnsw.ef_search = {plan['ef_search']}")
+                if self.iterative_scan:
+                    # pgvector >= 0.8 keeps scanning until k rows pass the filter
+                    self.conn.execute("SET LOCAL hnsw.iterative_scan = relaxed_order")
+            params = (vec, k) if plan["strategy"] == "exact" else (vec, vec, k)
+            rows = self.conn.execute(query, params).fetchall()
+        rows.sort(key=lambda row: row[-1])  # relaxed_order may return slightly out of order
+        return rows, plan
+
+
+# --------------------------------------------------------------------------
+# Benchmark
+CATEGORIES = {"electronics": 0.50, "apparel": 0.25, "home": 0.15, "books": 0.07, "toys": 0.025, "jewelry": 0.005}
+
+
+def load_synthetic_products(conn, rows, dim, seed=0, chunk_size=20_000):
+    """
+    (Re)create products and fill it with clustered vectors, skewed
+    categories and created_at spread over the last year.
+    """
+    rng = np.random.default_rng(seed)
+    conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    conn.execute(f"DROP TABLE IF EXISTS {PARTITIONED_TABLE}")
+    conn.execute("DROP TABLE IF EXISTS products")
+    conn.execute(f"""
+        CREATE TABLE products (
+            id SERIAL PRIMARY KEY,
+            name TEXT NOT NULL,
+            category TEXT NOT NULL,
+            description TEXT,
+            embedding VECTOR({dim}),
+            created_at TIMESTAMP DEFAULT NOW()
+        )""")
+    names, weights = list(CATEGORIES), np.array(list(CATEGORIES.values()))
+    centroids = rng.standard_normal((32, dim)).astype(np.float32)
+    now = datetime.now()
+    started = time.perf_counter()
+    with conn.cursor() as cur, cur.copy("COPY products (name, category, embedding, created_at) FROM STDIN") as copy:
+        for start in range(0, rows, chunk_size):
+            n = min(chunk_size, rows - start)
+            cats = rng.choice(len(names), size=n, p=weights / weights.sum())
+            vectors = centroids[rng.integers(0, 32, n)] + 0.5 * rng.standard_normal((n, dim)).astype(np.float32)
+            ages = rng.integers(0, 365 * 24 * 3600, n)
+            for i in range(n):
+                copy.write_row((f"product {start + i}", names[cats[i]], vector_literal(vectors[i]),
+                                now - timedelta(seconds=int(ages[i]))))
+    conn.execute("CREATE INDEX products_embedding_idx ON products USING hnsw (embedding vector_l2_ops) "
+                 "WITH (m = 16, ef_construction = 64)")
+    conn.execute("CREATE INDEX products_category_created_idx ON products (category, created_at)")
+    conn.execute("ANALYZE products")
+    print(f"📥 Loaded {rows:,} products ({dim}-dim) with global index in {time.perf_counter() - started:.1f}s")
+
+
+def benchmark(router, dim, queries=50, k=5, seed=1):
+    rng = np.random.default_rng(seed)
+    filters = [(None, None), ("electronics", None), ("electronics", 30), ("books", 90), ("jewelry", None),
+               ("toys", 30), (None, 7)]
+    strategies = ["global", "exact", "auto"]
+    if router.partial:
+        strategies.insert(1, "partial")
+    if router.partitioned:
+        strategies.insert(1, "partitioned")
+    print(f"\n{'filter':<24} {'est. rows':>10} {'strategy':<12} {'chose':<12} {'recall':>7} {'rows':>5} "
+          f"{'p50':>9} {'p99':>9}")
+    for category, days in filters:
+        since = datetime.now() - timedelta(days=days) if days else None
+        vectors = rng.standard_normal((queries, dim)).astype(np.float32)
+        truth = [{row[0] for row in router.search(v, category, since, k, "exact")[0]} for v in vectors]
+        for strategy in strategies:
+            if strategy == "partial" and partial_index_name(category or "", router.table) not in router.partial:
+                continue
+            if strategy == "partitioned" and category is None:
+                continue
+            latencies, recalls, returned, chosen = [], [], [], None
+            for v, expected in zip(vectors, truth):
+                t0 = time.perf_counter()
+                rows, plan = router.search(v, category, since, k, strategy)
+                latencies.append((time.perf_counter() - t0) * 1000)
+                chosen = plan["strategy"]
+                returned.append(len(rows))
+                recalls.append(len({row[0] for row in rows} & expected) / max(len(expected), 1))
+            label = f"{category or '*'}{f' <{days}d' if days else ''}"
+            print(f"{label:<24} {plan['estimated_rows']:>10,.0f} {strategy:<12} {chosen:<12} "
+                  f"{np.mean(recalls):>7.3f} {np.mean(returned):>5.1f} "
+                  f"{np.percentile(latencies, 50):>7.2f}ms {np.percentile(latencies, 99):>7.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Filtered ANN routing for pgvector")
+    parser.add_argument("--dsn", default=DEFAULT_DSN, help="YugabyteDB (default) or PostgreSQL connection string")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--skip-load", action="store_true", help="Reuse the existing products table")
+    parser.add_argument("--setup", nargs="*", default=["partial"], choices=["partial", "partitioned"],
+                        help="Layouts to build before benchmarking")
+    parser.add_argument("--exact-max-rows", type=int, default=20_000,
+                        help="Filters estimated to keep fewer rows use exact search")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    with psycopg.connect(args.dsn, autocommit=True) as conn:
+        if not args.skip_load:
+            load_synthetic_products(conn, args.rows, args.dim)
+        if "partial" in args.setup:
+            create_partial_indexes(conn)
+        if "partitioned" in args.setup:
+            create_category_partitions(conn, args.dim)
+        router = FilteredRouter(conn, exact_max_rows=args.exact_max_rows)
+        benchmark(router, args.dim, args.queries, args.k)
+
+
+if __name__ == "__main__":
+    main()
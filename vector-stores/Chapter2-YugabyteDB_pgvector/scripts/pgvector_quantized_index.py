@@ -0,0 +1,132 @@
+"""
+halfvec and binary-quantized HNSW indexes with an exact re-rank.
+
+A full-precision HNSW index over 1536-dim vectors stores ~6 KB per row and
+soon stops fitting in shared_buffers. Expression indexes over compact casts
+shrink it:
+
+- halfvec: embedding::halfvec(dim), 2 bytes per dimension
+- bit:     binary_quantize(embedding)::bit(dim), 1 bit per dimension (Hamming)
+
+A query walks the compact index for k * oversample candidates and re-ranks
+them by exact <-> distance on the full vectors, in a single SQL statement.
+The report compares index size, build time, recall@k and latency with a
+vector_l2_ops baseline, built as products_embedding_vector_idx so the
+table's own products_embedding_idx is left alone.
+
+    python scripts/pgvector_quantized_index.py --rows 100000 --dim 1536
+"""
+
+import argparse
+import time
+
+import numpy as np
+import psycopg
+
+from pgvector_filtered_search import DEFAULT_DSN, load_synthetic_products, vector_literal
+
+# Index expression, operator class, query-side expression and distance operator per kind
+INDEX_KINDS = {
+    "vector": ("embedding", "vector_l2_ops", "%s::vector", "<->"),
+    "halfvec": ("(embedding::halfvec({dim}))", "halfvec_l2_ops", "%s::halfvec({dim})", "<->"),
+    "bit": ("(binary_quantize(embedding)::bit({dim}))", "bit_hamming_ops", "binary_quantize(%s::vector)", "<~>"),
+}
+DEFAULT_OVERSAMPLE = {"vector": 1, "halfvec": 4, "bit": 10}
+# Index name suffix per kind; half/bit match quantized_indexes.sql. The full-precision
+# baseline gets its own name so the report never drops the table's products_embedding_idx.
+INDEX_SUFFIXES = {"vector": "vector", "halfvec": "half", "bit": "bit"}
+
+
+def index_name(kind, table="products"):
+    return f"{table}_embedding_{INDEX_SUFFIXES[kind]}_idx"
+
+
+def create_quantized_index(conn, kind, dim, m=16, ef_construction=64, table="products"):
+    """
+    Build (or rebuild) the index for `kind`. Returns build seconds and size in MB.
+    """
+    expression, opclass, _, _ = INDEX_KINDS[kind]
+    name = index_name(kind, table)
+    conn.execute(f"DROP INDEX IF EXISTS {name}")
+    started = time.perf_counter()
+    conn.execute(f"CREATE INDEX {name} ON {table} USING hnsw ({expression.format(dim=dim)} {opclass}) "
+                 f"WITH (m = {m}, ef_construction = {ef_construction})")
+    build_seconds = time.perf_counter() - started
+    return build_seconds, index_size_mb(conn, name)
+
+
+def index_size_mb(conn, name):
+    return conn.execute("SELECT pg_relation_size(%s::regclass)", (name,)).fetchone()[0] / 2**20
+
+
+def rerank_query(kind, dim, columns="id, name, category", table="products"):
+    """
+    One statement: compact-index candidates, then exact re-rank on the full vectors.
+    Parameters: (query, query, candidate_limit, k).
+    """
+    expression, _, query_expression, operator = INDEX_KINDS[kind]
+    order = f"{expression.format(dim=dim)} {operator} {query_expression.format(dim=dim)}"
+    return (f"SELECT {columns}, embedding <-> %s::vector AS distance FROM ("
+            f"SELECT {columns}, embedding FROM {table} ORDER BY {order} LIMIT %s"
+            f") candidates ORDER BY distance LIMIT %s")
+
+
+def quantized_search(conn, query_vector, kind, dim, k=5, oversample=None, ef_search=None):
+    """
+    Top-k rows by exact distance, using the `kind` index for candidates.
+    The connection must be in autocommit mode (SET LOCAL per search).
+    """
+    candidates = k * (oversample or DEFAULT_OVERSAMPLE[kind])
+    vec = vector_literal(query_vector)
+    with conn.transaction():
+        # The HNSW scan returns at most ef_search rows, so it must cover the candidates
+        conn.execute(f"SET LOCAL hnsw.ef_search = {max(ef_search or 40, candidates)}")
+        return conn.execute(rerank_query(kind, dim), (vec, vec, candidates, k)).fetchall()
+
+
+def exact_search(conn, query_vector, k=5):
+    vec = vector_literal(query_vector)
+    with conn.transaction():
+        conn.execute("SET LOCAL enable_indexscan = off")
+        return conn.execute("SELECT id FROM products ORDER BY embedding <-> %s::vector LIMIT %s", (vec, k)).fetchall()
+
+
+def report(conn, dim, kinds=("vector", "halfvec", "bit"), queries=50, k=10, oversample=None, seed=1):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((queries, dim)).astype(np.float32)
+    truth = [{row[0] for row in exact_search(conn, v, k)} for v in vectors]
+    print(f"\n{'index':<8} {'size':>10} {'build':>8} {'oversample':>10} {'recall@' + str(k):>9} {'p50':>9} {'p99':>9}")
+    for kind in kinds:
+        build_seconds, size_mb = create_quantized_index(conn, kind, dim)
+        factor = oversample or DEFAULT_OVERSAMPLE[kind]
+        latencies, recalls = [], []
+        for v, expected in zip(vectors, truth):
+            t0 = time.perf_counter()
+            rows = quantized_search(conn, v, kind, dim, k, factor)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            recalls.append(len({row[0] for row in rows} & expected) / k)
+        print(f"{kind:<8} {size_mb:>7.1f} MB {build_seconds:>7.1f}s {factor:>9}x {np.mean(recalls):>9.3f} "
+              f"{np.percentile(latencies, 50):>7.2f}ms {np.percentile(latencies, 99):>7.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="halfvec / binary-quantized pgvector index report")
+    parser.add_argument("--dsn", default=DEFAULT_DSN)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--skip-load", action="store_true", help="Reuse the existing products table; the report still (re)builds "
+                             "products_embedding_{vector,half,bit}_idx but never products_embedding_idx")
+    parser.add_argument("--kinds", nargs="+", default=list(INDEX_KINDS), choices=list(INDEX_KINDS))
+    parser.add_argument("--oversample", type=int, help="Override the per-index default")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    with psycopg.connect(args.dsn, autocommit=True) as conn:
+        if not args.skip_load:
+            load_synthetic_products(conn, args.rows, args.dim)
+        report(conn, args.dim, args.kinds, args.queries, args.k, args.oversample)
+
+
+if __name__ == "__main__":
+    main()
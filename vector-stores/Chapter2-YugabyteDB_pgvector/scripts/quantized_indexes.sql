@@ -0,0 +1,46 @@
+-- Compact HNSW indexes over the products table (run after load_data.sql).
+-- Requires pgvector >= 0.7 for halfvec and binary_quantize.
+-- The demo uses VECTOR(3); replace 3 with your embedding dimension (e.g. 1536).
+
+-- Half-precision index: 2 bytes per dimension instead of 4
+CREATE INDEX products_embedding_half_idx
+ON products USING hnsw ((embedding::halfvec(3)) halfvec_l2_ops)
+WITH (m = 16, ef_construction = 64);
+
+-- Binary-quantized index: 1 bit per dimension, compared by Hamming distance
+CREATE INDEX products_embedding_bit_idx
+ON products USING hnsw ((binary_quantize(embedding)::bit(3)) bit_hamming_ops)
+WITH (m = 16, ef_construction = 64);
+
+-- Compare index sizes
+SELECT indexname, pg_size_pretty(pg_relation_size(indexname::regclass)) AS size
+FROM pg_indexes
+WHERE tablename = 'products' AND indexname LIKE 'products_embedding%';
+
+-- ef_search must be at least the candidate LIMIT, or the index returns fewer candidates
+SET hnsw.ef_search = 100;
+
+-- halfvec search with exact re-rank: the ORDER BY matches the expression index,
+-- then the oversampled candidates (k x 4) are re-ordered by full-precision distance
+SELECT id, name, category, embedding <-> '[0.12, 0.24, 0.31]' AS distance
+FROM (
+    SELECT id, name, category, embedding
+    FROM products
+    ORDER BY embedding::halfvec(3) <-> '[0.12, 0.24, 0.31]'::halfvec(3)
+    LIMIT 20
+) candidates
+ORDER BY embedding <-> '[0.12, 0.24, 0.31]'
+LIMIT 5;
+
+-- Binary search with exact re-rank: Hamming distance on bits needs more oversampling (k x 10)
+SELECT id, name, category, embedding <-> '[0.12, 0.24, 0.31]' AS distance
+FROM (
+    SELECT id, name, category, embedding
+    FROM products
+    ORDER BY binary_quantize(embedding)::bit(3) <~> binary_quantize('[0.12, 0.24, 0.31]'::vector)
+    LIMIT 50
+) candidates
+ORDER BY embedding <-> '[0.12, 0.24, 0.31]'
+LIMIT 5;
+
+RESET hnsw.ef_search;
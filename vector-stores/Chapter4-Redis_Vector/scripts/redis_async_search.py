@@ -0,0 +1,174 @@
+import asyncio
+import inspect
+
+import numpy as np
+import redis
+import redis.asyncio as aioredis
+
+from redis_vector_demo import r, build_search_command
+
+# asyncio counterpart of each sync connection class (plain TCP otherwise)
+ASYNC_CONNECTION_CLASSES = {
+    redis.SSLConnection: aioredis.SSLConnection,
+    redis.UnixDomainSocketConnection: aioredis.UnixDomainSocketConnection,
+}
+# connection_kwargs entries holding objects bound to the sync client
+SYNC_ONLY_KWARGS = {"retry", "redis_connect_func", "maint_notifications_pool_handler", "himport_registry"}
+
+
+class SearchHits:
+    """
+    Lean view over a raw FT.SEARCH reply.
+
+    Scores are parsed once into a float64 NumPy array; keys and other fields
+    stay as raw bytes until a column is first requested, then that column is
+    decoded in one pass and cached.
+    """
+
+    def __init__(self, raw_results, score_field="similarity_score"):
+        self.total = raw_results[0] if raw_results else 0
+        self._raw_keys = raw_results[1::2]
+        self._raw_fields = raw_results[2::2]
+        self._columns = {}
+        self._keys = None
+        self.scores = np.array(self._raw_column(score_field), dtype=np.float64)
+
+    def __len__(self):
+        return len(self._raw_keys)
+
+    @property
+    def keys(self):
+        if self._keys is None:
+            self._keys = [key.decode() if isinstance(key, bytes) else key for key in self._raw_keys]
+        return self._keys
+
+    def column(self, name):
+        """
+        Decoded values of one returned field, None where a hit lacks it.
+        """
+        if name not in self._columns:
+            self._columns[name] = [value.decode() if isinstance(value, bytes) else value
+                                   for value in self._raw_column(name)]
+        return self._columns[name]
+
+    def to_dicts(self):
+        """
+        Same shape parse_search_results returns, for callers that want dicts.
+        """
+        names = {name for fields in self._raw_fields for name in fields[0::2]}
+        names = [name.decode() if isinstance(name, bytes) else name for name in names]
+        columns = {name: self.column(name) for name in names}
+        return [
+            {"key": key, **{name: values[i] for name, values in columns.items() if values[i] is not None}}
+            for i, key in enumerate(self.keys)
+        ]
+
+    def _raw_column(self, name):
+        if not self._raw_fields:
+            return []
+        encoded = name.encode()
+        first = self._raw_fields[0]
+        width = len(first)
+        # RediSearch emits fields in RETURN order, so when every hit carries the
+        # same number of fields the value sits at the same offset in each list
+        if all(len(fields) == width for fields in self._raw_fields):
+            for j in range(0, width, 2):
+                if first[j] in (encoded, name):
+                    return [fields[j + 1] for fields in self._raw_fields]
+            return [None] * len(self._raw_fields)
+        values = []
+        for fields in self._raw_fields:
+            lookup = dict(zip(fields[0::2], fields[1::2]))
+            values.append(lookup.get(encoded, lookup.get(name)))
+        return values
+
+
+def async_client(max_connections=64, base_client=None):
+    """
+    Build a redis.asyncio client whose connection pool is shared by every
+    concurrent search, with the sync client's full connection settings
+    (server, credentials, SSL, timeouts).
+    """
+    base_pool = (base_client or r).connection_pool
+    connection_class = ASYNC_CONNECTION_CLASSES.get(base_pool.connection_class, aioredis.Connection)
+    accepted = set()
+    for cls in connection_class.__mro__:
+        if "__init__" in vars(cls):
+            accepted.update(inspect.signature(cls.__init__).parameters)
+    kwargs = {name: value for name, value in base_pool.connection_kwargs.items()
+              if name in accepted and name not in SYNC_ONLY_KWARGS}
+    pool = aioredis.BlockingConnectionPool(
+        connection_class=connection_class, max_connections=max_connections, **kwargs
+    )
+    return aioredis.Redis(connection_pool=pool)
+
+
+async def async_vector_search(client, query_embedding, k=5, **search_kwargs):
+    """
+    Non-blocking vector_search returning SearchHits.
+    search_kwargs are the filters accepted by build_search_command.
+    """
+    raw = await client.execute_command(*build_search_command(query_embedding, k, **search_kwargs))
+    return SearchHits(raw)
+
+
+async def search_many(client, query_embeddings, k=5, concurrency=32, pipelined=False,
+                      batch_size=64, **search_kwargs):
+    """
+    Run many KNN queries at once, returning SearchHits in query order.
+
+    By default each query is its own request with at most `concurrency` in
+    flight. With pipelined=True queries are sent `batch_size` at a time
+    through non-transactional pipelines, `concurrency` batches in flight.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(query):
+        async with semaphore:
+            return await async_vector_search(client, query, k, **search_kwargs)
+
+    async def run_batch(batch):
+        async with semaphore:
+            pipe = client.pipeline(transaction=False)
+            for query in batch:
+                pipe.execute_command(*build_search_command(query, k, **search_kwargs))
+            return [SearchHits(raw) for raw in await pipe.execute()]
+
+    if not pipelined:
+        return await asyncio.gather(*(run_one(query) for query in query_embeddings))
+
+    batches = [query_embeddings[i:i + batch_size] for i in range(0, len(query_embeddings), batch_size)]
+    results = await asyncio.gather(*(run_batch(batch) for batch in batches))
+    return [hits for batch in results for hits in batch]
+
+
+def search_many_sync(query_embeddings, k=5, concurrency=32, pipelined=False, **search_kwargs):
+    """
+    Convenience entry point for synchronous callers: runs search_many on a
+    fresh event loop with its own pooled client.
+    """
+    async def run():
+        client = async_client(max_connections=concurrency)
+        try:
+            return await search_many(client, query_embeddings, k, concurrency, pipelined, **search_kwargs)
+        finally:
+            await client.aclose()
+
+    return asyncio.run(run())
+
+
+def main():
+    """
+    Demonstrate concurrent KNN queries over a shared async connection pool.
+    """
+    print("🚀 Redis Async Search Demo Starting...")
+    queries = np.random.rand(16, 1536)
+    results = search_many_sync(queries, k=3, concurrency=8)
+    for i, hits in enumerate(results[:3]):
+        titles = ", ".join(title or "<untitled>" for title in hits.column("title"))
+        print(f"  • Query {i}: {titles} (best score {hits.scores.min() if len(hits) else float('nan'):.4f})")
+    print(f"✅ Ran {len(results)} queries concurrently")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import redis
+
+from redis_vector_demo import r, batch_write_listeners, write_listeners, VECTOR_DTYPES
+
+# Same range insert_document draws its random timestamps from (2022)
+TIMESTAMP_RANGE = (1640995200, 1672531200)
+
+
+def pooled_client(max_connections, base_client=None):
+    """
+    Build a Redis client backed by a blocking connection pool so several
+    worker threads can each hold their own connection to the server.
+    """
+    base_client = base_client or r
+    pool = redis.BlockingConnectionPool(
+        max_connections=max_connections,
+        **base_client.connection_pool.connection_kwargs
+    )
+    return redis.Redis(connection_pool=pool)
+
+
+def _write_chunk(client, key_prefix, doc_ids, metadata, timestamps, embeddings, start, stop):
+    """
+    Write rows [start, stop) through one non-transactional pipeline.
+    The whole chunk costs a single network round trip.
+    """
+    pipe = client.pipeline(transaction=False)
+    for i in range(start, stop):
+        mapping = {field: values[i] for field, values in metadata.items()}
+        mapping["timestamp"] = int(timestamps[i])
+        mapping["embedding"] = embeddings[i].tobytes()
+        pipe.hset(f"{key_prefix}{doc_ids[i]}", mapping=mapping)
+    pipe.execute()
+    categories = metadata.get("category")
+    if batch_write_listeners:
+        keys = [f"{key_prefix}{doc_ids[i]}" for i in range(start, stop)]
+        chunk_categories = list(categories[start:stop]) if categories is not None else [None] * len(keys)
+        for listener in batch_write_listeners:
+            listener(keys, chunk_categories, embeddings[start:stop])
+    for listener in write_listeners:
+        for i in range(start, stop):
+            category = categories[i] if categories is not None else None
+            listener(f"{key_prefix}{doc_ids[i]}", category, embeddings[i])
+    return stop - start
+
+
+def bulk_insert_documents(doc_ids, embeddings, metadata, timestamps=None,
+                          chunk_size=500, workers=1, client=None, key_prefix="doc:",
+                          vector_type="FLOAT32"):
+    """
+    Insert many documents at once from a NumPy embedding matrix.
+
+    `embeddings` is an (n, dim) array, `metadata` maps field names such as
+    title/content/category to columns of length n. Rows are written in
+    chunks of `chunk_size` through non-transactional pipelines; with
+    `workers` > 1 the chunks are spread over a thread pool that shares a
+    pooled client. Embeddings are encoded once, up front, in the index's
+    vector_type. Returns a stats dict including docs/sec.
+    """
+    embeddings = np.ascontiguousarray(embeddings, dtype=VECTOR_DTYPES[vector_type])
+    if embeddings.ndim != 2:
+        raise ValueError("embeddings must be a 2-D (n, dim) array")
+
+    n = embeddings.shape[0]
+    if len(doc_ids) != n:
+        raise ValueError(f"Got {len(doc_ids)} ids for {n} embeddings")
+    for field, values in metadata.items():
+        if len(values) != n:
+            raise ValueError(f"Metadata column '{field}' has {len(values)} rows, expected {n}")
+
+    if timestamps is None:
+        timestamps = np.random.randint(*TIMESTAMP_RANGE, size=n)
+
+    if client is None:
+        client = pooled_client(workers) if workers > 1 else r
+
+    bounds = [(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+    args = (client, key_prefix, doc_ids, metadata, timestamps, embeddings)
+
+    started = time.perf_counter()
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_write_chunk, *args, start, stop) for start, stop in bounds]
+            written = sum(f.result() for f in futures)
+    else:
+        written = sum(_write_chunk(*args, start, stop) for start, stop in bounds)
+    elapsed = time.perf_counter() - started
+
+    stats = {
+        "docs": written,
+        "chunks": len(bounds),
+        "chunk_size": chunk_size,
+        "workers": workers,
+        "seconds": elapsed,
+        "docs_per_sec": written / elapsed if elapsed > 0 else float("inf"),
+    }
+    print(f"📦 Bulk inserted {written} documents in {len(bounds)} chunks "
+          f"({stats['docs_per_sec']:.0f} docs/sec, workers={workers})")
+    return stats
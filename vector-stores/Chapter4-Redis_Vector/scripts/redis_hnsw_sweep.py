@@ -0,0 +1,130 @@
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from redis_vector_demo import r, create_vector_index, vector_search
+from redis_bulk_ingest import bulk_insert_documents
+
+
+def ft_info(index_name):
+    """
+    Return FT.INFO as a dict with decoded keys.
+    """
+    raw = r.execute_command("FT.INFO", index_name)
+    info = {}
+    for i in range(0, len(raw) - 1, 2):
+        key = raw[i].decode() if isinstance(raw[i], bytes) else raw[i]
+        value = raw[i + 1]
+        info[key] = value.decode() if isinstance(value, bytes) else value
+    return info
+
+
+def wait_for_indexing(index_name, timeout=600):
+    """
+    Block until the background indexer has processed every document.
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        info = ft_info(index_name)
+        if str(info.get("indexing", "0")) == "0" and float(info.get("percent_indexed", 1)) >= 1:
+            return
+        time.sleep(0.1)
+    raise TimeoutError(f"Index '{index_name}' still building after {timeout}s")
+
+
+def exact_top_k(corpus, queries, k):
+    """
+    Ground truth by brute force: cosine similarity over normalized vectors.
+    """
+    corpus = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = queries @ corpus.T
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return [set(row) for row in top]
+
+
+def run_config(corpus, queries, truth, k, vector_type, m, ef_construction, ef_runtimes):
+    """
+    Build one index configuration and measure it at every EF_RUNTIME value.
+    """
+    tag = f"{vector_type.lower()}_m{m}_efc{ef_construction}"
+    index_name, prefix = f"sweep_{tag}", f"sweep:{tag}:"
+
+    used_before = r.info("memory")["used_memory"]
+    started = time.perf_counter()
+    create_vector_index(index_name=index_name, prefix=prefix, vector_type=vector_type,
+                        dim=corpus.shape[1], m=m, ef_construction=ef_construction)
+    n = corpus.shape[0]
+    bulk_insert_documents(
+        [str(i) for i in range(n)], corpus,
+        {"title": [""] * n, "content": [""] * n, "category": ["sweep"] * n},
+        key_prefix=prefix, vector_type=vector_type,
+    )
+    wait_for_indexing(index_name)
+    build_seconds = time.perf_counter() - started
+    info = ft_info(index_name)
+    used_mb = (r.info("memory")["used_memory"] - used_before) / 2**20
+
+    rows = []
+    for ef_runtime in ef_runtimes:
+        latencies, recalls = [], []
+        for query, expected in zip(queries, truth):
+            t0 = time.perf_counter()
+            hits = vector_search(query, k=k, index_name=index_name,
+                                 vector_type=vector_type, ef_runtime=ef_runtime)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            found = {int(hit["key"][len(prefix):]) for hit in hits}
+            recalls.append(len(found & expected) / k)
+        rows.append({
+            "type": vector_type, "m": m, "ef_construction": ef_construction, "ef_runtime": ef_runtime,
+            "recall": float(np.mean(recalls)),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+            "build_s": build_seconds,
+            "vector_index_mb": float(info.get("vector_index_sz_mb", 0)),
+            "used_memory_mb": used_mb,
+        })
+
+    r.execute_command("FT.DROPINDEX", index_name, "DD")
+    return rows
+
+
+def main():
+    """
+    Sweep HNSW parameters and storage types, reporting recall@k against
+    exact NumPy search, p50/p99 latency and memory for each configuration.
+    """
+    parser = argparse.ArgumentParser(description="Redis HNSW recall/latency/memory sweep")
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--types", nargs="+", default=["FLOAT32", "FLOAT16"])
+    parser.add_argument("--m", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--ef-construction", type=int, nargs="+", default=[100, 200])
+    parser.add_argument("--ef-runtime", type=int, nargs="+", default=[10, 50, 200])
+    args = parser.parse_args()
+
+    print("🚀 Redis HNSW Sweep Starting...")
+    rng = np.random.default_rng(0)
+    corpus = rng.standard_normal((args.docs, args.dim), dtype=np.float32)
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+    truth = exact_top_k(corpus, queries, args.k)
+    print(f"📐 {args.docs} docs x {args.dim} dims, {args.queries} queries, recall@{args.k}")
+
+    rows = []
+    for vector_type, m, ef_construction in itertools.product(args.types, args.m, args.ef_construction):
+        rows += run_config(corpus, queries, truth, args.k, vector_type, m, ef_construction, args.ef_runtime)
+
+    print(f"\n{'type':<8}{'M':>4}{'EF_C':>6}{'EF_R':>6}{'recall':>8}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'build s':>9}{'index MB':>10}{'used MB':>9}")
+    for row in rows:
+        print(f"{row['type']:<8}{row['m']:>4}{row['ef_construction']:>6}{row['ef_runtime']:>6}"
+              f"{row['recall']:>8.3f}{row['p50_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+              f"{row['build_s']:>9.1f}{row['vector_index_mb']:>10.1f}{row['used_memory_mb']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
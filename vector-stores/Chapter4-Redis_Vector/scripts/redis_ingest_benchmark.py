@@ -0,0 +1,96 @@
+import argparse
+import time
+
+import numpy as np
+
+from redis_vector_demo import r, create_vector_index
+from redis_bulk_ingest import bulk_insert_documents, pooled_client
+
+CATEGORIES = ["legal", "finance", "healthcare"]
+
+
+def make_corpus(n, dim, seed=0):
+    """
+    Generate n synthetic documents with random embeddings and metadata columns.
+    """
+    rng = np.random.default_rng(seed)
+    embeddings = rng.random((n, dim), dtype=np.float32)
+    doc_ids = [f"bench-{i}" for i in range(n)]
+    metadata = {
+        "title": [f"Benchmark document {i}" for i in range(n)],
+        "content": [f"Synthetic content for benchmark document {i}." for i in range(n)],
+        "category": [CATEGORIES[i % len(CATEGORIES)] for i in range(n)],
+    }
+    return doc_ids, embeddings, metadata
+
+
+def per_row_baseline(client, doc_ids, embeddings, metadata):
+    """
+    One HSET round trip per document, the way insert_document works.
+    """
+    started = time.perf_counter()
+    for i, doc_id in enumerate(doc_ids):
+        mapping = {field: values[i] for field, values in metadata.items()}
+        mapping["timestamp"] = int(np.random.uniform(1640995200, 1672531200))
+        mapping["embedding"] = embeddings[i].tobytes()
+        client.hset(f"doc:{doc_id}", mapping=mapping)
+    elapsed = time.perf_counter() - started
+    return len(doc_ids) / elapsed
+
+
+def clear_benchmark_keys(client):
+    """
+    Remove every key written by a previous benchmark run.
+    """
+    keys = list(client.scan_iter(match="doc:bench-*", count=1000))
+    for start in range(0, len(keys), 1000):
+        client.delete(*keys[start:start + 1000])
+
+
+def main():
+    """
+    Compare per-row inserts against pipelined bulk ingest for several
+    chunk sizes and worker counts.
+    """
+    parser = argparse.ArgumentParser(description="Redis vector ingest throughput benchmark")
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--fake", action="store_true",
+                        help="Use an in-process fakeredis server instead of Redis Stack")
+    args = parser.parse_args()
+
+    print("🚀 Redis Ingest Benchmark Starting...")
+    if args.fake:
+        import fakeredis  # Optional dependency: pip install fakeredis
+        client = fakeredis.FakeRedis()
+        print("🧪 Using in-process fakeredis stand-in (no HNSW indexing cost)")
+    else:
+        client = r
+        create_vector_index()
+
+    doc_ids, embeddings, metadata = make_corpus(args.docs, args.dim)
+    print(f"📐 Corpus: {args.docs} docs x {args.dim} dims")
+
+    clear_benchmark_keys(client)
+    baseline = per_row_baseline(client, doc_ids, embeddings, metadata)
+    print(f"🐢 Per-row HSET baseline: {baseline:.0f} docs/sec")
+
+    print("\n📊 Bulk ingest results:")
+    for workers in args.workers:
+        for chunk_size in args.chunk_sizes:
+            clear_benchmark_keys(client)
+            # fakeredis keeps its data per client object, so it is shared as-is
+            target = client if args.fake or workers == 1 else pooled_client(workers, client)
+            stats = bulk_insert_documents(doc_ids, embeddings, metadata,
+                                          chunk_size=chunk_size, workers=workers, client=target)
+            speedup = stats["docs_per_sec"] / baseline
+            print(f"  • workers={workers:<2} chunk={chunk_size:<5} "
+                  f"{stats['docs_per_sec']:>10.0f} docs/sec ({speedup:.1f}x)")
+
+    clear_benchmark_keys(client)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from redis_vector_demo import r, create_vector_index, insert_document, vector_search
+from redis_bulk_ingest import bulk_insert_documents
+
+# Registry of partitions: sorted set of period name -> period start timestamp
+PARTITION_REGISTRY = "ai_docs_partitions"
+ACTIVE_ALIAS = "ai_docs_active"
+
+
+def partition_for(timestamp):
+    """
+    Map a unix timestamp to its monthly partition name, e.g. '2022_07'.
+    """
+    return datetime.fromtimestamp(int(timestamp), tz=timezone.utc).strftime("%Y_%m")
+
+
+def partition_bounds(period):
+    """
+    Return the (start, end) unix timestamps covered by a partition, end inclusive.
+    """
+    year, month = (int(part) for part in period.split("_"))
+    start = datetime(year, month, 1, tzinfo=timezone.utc)
+    end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+    return int(start.timestamp()), int(end.timestamp()) - 1
+
+
+def partition_index(period):
+    return f"ai_docs_{period}"
+
+
+def partition_prefix(period):
+    # 'doc_' rather than 'doc:' so partition keys stay out of ai_docs_index
+    return f"doc_{period}:"
+
+
+def ensure_partition(period):
+    """
+    Create the HNSW index for a partition (once) and record it in the registry.
+    """
+    if r.zscore(PARTITION_REGISTRY, period) is None:
+        create_vector_index(index_name=partition_index(period), prefix=partition_prefix(period))
+        r.zadd(PARTITION_REGISTRY, {period: partition_bounds(period)[0]})
+    return partition_index(period)
+
+
+def set_active_partition(period):
+    """
+    Point the ai_docs_active alias at a partition so writers and readers that
+    only care about "now" never need to know the current period name.
+    """
+    ensure_partition(period)
+    r.execute_command("FT.ALIASUPDATE", ACTIVE_ALIAS, partition_index(period))
+    print(f"🔀 Alias '{ACTIVE_ALIAS}' -> '{partition_index(period)}'")
+
+
+def list_partitions(start_ts=None, end_ts=None):
+    """
+    Return the registered partitions that overlap [start_ts, end_ts], oldest first.
+    """
+    upper = "+inf" if end_ts is None else int(end_ts)
+    periods = [p.decode() if isinstance(p, bytes) else p
+               for p in r.zrangebyscore(PARTITION_REGISTRY, "-inf", upper)]
+    if start_ts is not None:
+        periods = [p for p in periods if partition_bounds(p)[1] >= start_ts]
+    return periods
+
+
+def insert_partitioned_document(doc_id, title, content, category, embedding_vector, timestamp):
+    """
+    Insert a document into the monthly partition its timestamp falls in.
+    """
+    period = partition_for(timestamp)
+    ensure_partition(period)
+    insert_document(doc_id, title, content, category, embedding_vector,
+                    timestamp=timestamp, key_prefix=partition_prefix(period))
+
+
+def bulk_insert_partitioned(doc_ids, embeddings, metadata, timestamps, **bulk_kwargs):
+    """
+    Group rows by partition and bulk insert each group through its own key prefix.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    periods = np.array([partition_for(ts) for ts in timestamps])
+    doc_ids = np.asarray(doc_ids)
+    stats = {}
+    for period in np.unique(periods):
+        rows = np.flatnonzero(periods == period)
+        ensure_partition(period)
+        stats[period] = bulk_insert_documents(
+            doc_ids[rows].tolist(),
+            np.asarray(embeddings)[rows],
+            {field: [values[i] for i in rows] for field, values in metadata.items()},
+            timestamps=timestamps[rows],
+            key_prefix=partition_prefix(period),
+            **bulk_kwargs
+        )
+    return stats
+
+
+def vector_search_range(query_embedding, start_ts, end_ts, k=5, category_filter=None, max_workers=8):
+    """
+    Search only the partitions overlapping [start_ts, end_ts], in parallel,
+    and merge the per-partition top-k into a global top-k by similarity_score
+    (cosine distance, lower is closer).
+    """
+    periods = list_partitions(start_ts, end_ts)
+    if not periods:
+        return []
+
+    def search_partition(period):
+        first, last = partition_bounds(period)
+        # Partitions fully inside the range need no timestamp pre-filter
+        time_range = None if start_ts <= first and last <= end_ts else (start_ts, end_ts)
+        return vector_search(query_embedding, k=k, category_filter=category_filter,
+                             index_name=partition_index(period), time_range=time_range)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(periods))) as executor:
+        partials = list(executor.map(search_partition, periods))
+
+    return heapq.nsmallest(k, (doc for hits in partials for doc in hits),
+                           key=lambda doc: float(doc["similarity_score"]))
+
+
+def drop_partition(period, delete_documents=False):
+    """
+    Retire a whole partition with a single FT.DROPINDEX instead of deleting
+    documents one by one. By default only the index is dropped, which does
+    not touch the documents; their hashes stay under the partition's
+    `doc_<period>:` prefix for a later cleanup off the hot path.
+    delete_documents=True adds DD, which also deletes every hash in the
+    partition inside Redis: O(documents) work, not a constant-time drop.
+    """
+    args = ["FT.DROPINDEX", partition_index(period)]
+    if delete_documents:
+        args.append("DD")
+    r.execute_command(*args)
+    r.zrem(PARTITION_REGISTRY, period)
+    print(f"🗑️ Dropped partition '{period}'")
+
+
+def main():
+    """
+    Demonstrate rolling monthly partitions and a time-ranged fan-out search.
+    """
+    print("🚀 Redis Partitioned Index Demo Starting...")
+
+    rng = np.random.default_rng(7)
+    n = 300
+    timestamps = rng.integers(1640995200, 1672531200, size=n)  # Throughout 2022
+    categories = ["legal", "finance", "healthcare"]
+    metadata = {
+        "title": [f"Document {i}" for i in range(n)],
+        "content": [f"Synthetic content {i}" for i in range(n)],
+        "category": [categories[i % 3] for i in range(n)],
+    }
+    bulk_insert_partitioned([str(i) for i in range(n)], rng.random((n, 1536)), metadata, timestamps)
+    set_active_partition(partition_for(timestamps.max()))
+    print(f"🗂️ Partitions: {', '.join(list_partitions())}")
+
+    # Q2 2022 only
+    start_ts, end_ts = 1648771200, 1656633599
+    results = vector_search_range(rng.random(1536), start_ts, end_ts, k=3, category_filter="finance")
+    print(f"\n📋 Top {len(results)} finance documents from Q2 2022:")
+    for result in results:
+        print(f"  • {result['title']} ({result['key']}, Score: {result['similarity_score']})")
+
+    oldest = list_partitions()[0]
+    drop_partition(oldest)
+
+
+if __name__ == "__main__":
+    main()
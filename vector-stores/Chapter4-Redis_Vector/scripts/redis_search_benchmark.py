@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from redis_vector_demo import vector_search, parse_search_results
+from redis_async_search import SearchHits, async_client, search_many
+
+
+def synthetic_reply(k):
+    """
+    Build a raw FT.SEARCH reply shaped like the one vector_search receives.
+    """
+    reply = [k]
+    for i in range(k):
+        reply.append(f"doc:{i}".encode())
+        reply.append([
+            b"similarity_score", f"{0.1 + i / 1000:.12f}".encode(),
+            b"title", f"Document {i}".encode(),
+            b"category", b"legal",
+            b"content", b"Synthetic content " * 8,
+        ])
+    return reply
+
+
+def bench_decode(k, repeats):
+    """
+    Compare parse_search_results against SearchHits on identical replies.
+    """
+    reply = synthetic_reply(k)
+    started = time.perf_counter()
+    for _ in range(repeats):
+        parse_search_results(reply)
+    dict_rate = repeats / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        SearchHits(reply).scores
+    lean_rate = repeats / (time.perf_counter() - started)
+
+    print(f"🧮 Decode k={k}: parse_search_results {dict_rate:,.0f}/s, "
+          f"SearchHits (scores only) {lean_rate:,.0f}/s ({lean_rate / dict_rate:.1f}x)")
+
+
+def bench_sync(queries, k):
+    started = time.perf_counter()
+    for query in queries:
+        vector_search(query, k=k)
+    return len(queries) / (time.perf_counter() - started)
+
+
+async def bench_async(queries, k, concurrency, pipelined):
+    client = async_client(max_connections=concurrency)
+    try:
+        await search_many(client, queries[:concurrency], k, concurrency, pipelined)  # Warm the pool
+        started = time.perf_counter()
+        await search_many(client, queries, k, concurrency, pipelined)
+        return len(queries) / (time.perf_counter() - started)
+    finally:
+        await client.aclose()
+
+
+def main():
+    """
+    Compare QPS of the blocking vector_search loop with concurrent and
+    pipelined async search, plus the cost of result decoding alone.
+    """
+    parser = argparse.ArgumentParser(description="Redis search QPS benchmark (sync vs async)")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32, 64])
+    parser.add_argument("--decode-only", action="store_true",
+                        help="Only run the decoding microbenchmark (no Redis needed)")
+    args = parser.parse_args()
+
+    print("🚀 Redis Search Benchmark Starting...")
+    bench_decode(args.k, repeats=20000)
+    if args.decode_only:
+        return
+
+    # Run against the ai_docs_index populated by the demo or redis_ingest_benchmark.py
+    queries = np.random.default_rng(1).random((args.queries, args.dim), dtype=np.float32)
+    sync_qps = bench_sync(queries, args.k)
+    print(f"\n🐢 Sync vector_search: {sync_qps:,.0f} QPS")
+    for concurrency in args.concurrency:
+        for pipelined in (False, True):
+            qps = asyncio.run(bench_async(queries, args.k, concurrency, pipelined))
+            mode = "pipelined " if pipelined else "concurrent"
+            print(f"  • async {mode} concurrency={concurrency:<3} {qps:>10,.0f} QPS ({qps / sync_qps:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
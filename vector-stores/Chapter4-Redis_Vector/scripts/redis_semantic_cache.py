@@ -0,0 +1,206 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from redis_vector_demo import batch_write_listeners, vector_search
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32).ravel()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+class SemanticCache:
+    """
+    In-process cache of parsed vector_search results keyed by query meaning.
+
+    A lookup hits when a cached query with the same (index, category_filter, k)
+    has cosine similarity >= `threshold` with the new query embedding.
+    Entries expire after `ttl_seconds` and the least recently used entry is
+    evicted once `max_entries` is exceeded.
+    """
+
+    def __init__(self, threshold=0.98, max_entries=1024, ttl_seconds=300):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # Any query within `threshold` of a cached one lies within this
+        # euclidean radius of it on the unit sphere
+        self._radius = math.sqrt(max(0.0, 2.0 * (1.0 - threshold)))
+        self._entries = OrderedDict()  # entry id -> entry, in LRU order
+        self._groups = {}              # (index, filter, k) -> set of entry ids
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def lookup(self, query_embedding, k, category_filter=None, index_name="ai_docs_index"):
+        """
+        Return cached results for a semantically equivalent query, or None.
+        """
+        query = _unit(query_embedding)
+        group = (index_name, category_filter, k)
+        now = time.monotonic()
+        with self._lock:
+            # Iterate over a copy: _expire() removes ids from the group set
+            ids = [i for i in list(self._groups.get(group, ())) if not self._expire(i, now)]
+            if ids:
+                matrix = np.stack([self._entries[i]["vector"] for i in ids])
+                scores = matrix @ query
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self._entries.move_to_end(ids[best])
+                    self.hits += 1
+                    return self._entries[ids[best]]["results"]
+            self.misses += 1
+            return None
+
+    def store(self, query_embedding, k, category_filter, index_name, results):
+        """
+        Cache parsed results for a query, evicting the LRU entry when full.
+        """
+        group = (index_name, category_filter, k)
+        distances = [float(doc["similarity_score"]) for doc in results]
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = {
+                "group": group,
+                "vector": _unit(query_embedding),
+                "results": results,
+                "keys": {doc["key"] for doc in results},
+                "worst_distance": max(distances) if distances else None,
+                "created": time.monotonic(),
+            }
+            self._groups.setdefault(group, set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_document(self, doc_key, category, embedding_vector):
+        """
+        Drop every entry whose results a write of this document could change.
+        """
+        self.invalidate_documents([doc_key], [category], np.asarray(embedding_vector)[None, :])
+
+    def invalidate_documents(self, doc_keys, categories, embeddings):
+        """
+        Drop every entry whose results a write of these documents could change:
+        entries that already contain one of the keys, and entries with a
+        matching filter that one of the new vectors could enter the top-k of.
+        All entries are tested against the whole batch with one matrix product.
+        """
+        docs = np.asarray(embeddings, dtype=np.float32).reshape(len(doc_keys), -1)
+        docs = docs / np.maximum(np.linalg.norm(docs, axis=1, keepdims=True), 1e-12)
+        categories = np.array([c.decode() if isinstance(c, bytes) else c for c in categories], dtype=object)
+        written = set(doc_keys)
+        with self._lock:
+            if not self._entries:
+                return
+            entry_ids = list(self._entries)
+            entries = [self._entries[i] for i in entry_ids]
+            # Which documents each entry's category filter lets through
+            filters = np.array([entry["group"][1] for entry in entries], dtype=object)
+            allowed = np.ones((len(entries), len(docs)), dtype=bool)
+            for category_filter in set(filters.tolist()) - {None}:
+                allowed[filters == category_filter] = categories == category_filter
+            # Compare as euclidean distances on the unit sphere, widened by the
+            # radius of queries an entry may be served to; short entries take any doc
+            worst_gap = np.array([
+                math.sqrt(max(0.0, 2.0 * entry["worst_distance"])) + 2 * self._radius
+                if len(entry["results"]) >= entry["group"][2] else np.inf
+                for entry in entries
+            ])
+            similarity = np.stack([entry["vector"] for entry in entries]) @ docs.T
+            doc_gap = np.sqrt(np.maximum(0.0, 2.0 * (1.0 - similarity)))
+            reachable = (allowed & (doc_gap <= worst_gap[:, None])).any(axis=1)
+            stale = [entry_id for entry_id, entry, hit in zip(entry_ids, entries, reachable)
+                     if hit or not written.isdisjoint(entry["keys"])]
+            for entry_id in stale:
+                self._remove(entry_id)
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _expire(self, entry_id, now):
+        if now - self._entries[entry_id]["created"] > self.ttl_seconds:
+            self._remove(entry_id)
+            self.evictions += 1
+            return True
+        return False
+
+    def _remove(self, entry_id):
+        entry = self._entries.pop(entry_id)
+        self._groups[entry["group"]].discard(entry_id)
+
+
+def enable_query_cache(threshold=0.98, max_entries=1024, ttl_seconds=300):
+    """
+    Create a SemanticCache and subscribe it to document writes so that
+    insert_document and bulk inserts invalidate affected entries (bulk
+    inserts once per chunk).
+    """
+    cache = SemanticCache(threshold, max_entries, ttl_seconds)
+    batch_write_listeners.append(cache.invalidate_documents)
+    return cache
+
+
+def cached_vector_search(cache, query_embedding, k=5, category_filter=None, index_name="ai_docs_index"):
+    """
+    vector_search with a semantic cache in front of it.
+    """
+    results = cache.lookup(query_embedding, k, category_filter, index_name)
+    if results is None:
+        results = vector_search(query_embedding, k=k, category_filter=category_filter, index_name=index_name)
+        cache.store(query_embedding, k, category_filter, index_name, results)
+    return results
+
+
+def main():
+    """
+    Demonstrate cache hits for near-duplicate queries and invalidation on write.
+    """
+    from redis_vector_demo import create_vector_index, insert_document
+
+    print("🚀 Redis Semantic Cache Demo Starting...")
+    create_vector_index()
+    cache = enable_query_cache(threshold=0.99)
+
+    rng = np.random.default_rng(3)
+    for i, category in enumerate(["legal", "finance", "healthcare"], start=1):
+        insert_document(f"cache-{i}", f"Cached doc {i}", "Synthetic content.", category, rng.random(1536))
+
+    query = rng.random(1536)
+    near_duplicate = query + rng.normal(0, 0.01, 1536)
+    cached_vector_search(cache, query, k=3)
+    cached_vector_search(cache, near_duplicate, k=3)
+    print(f"📈 After a repeated query: {cache.stats()}")
+
+    insert_document("cache-4", "Fresh doc", "Written after caching.", "legal", query)
+    results = cached_vector_search(cache, query, k=3)
+    print(f"📈 After a write near the query: {cache.stats()}")
+    print(f"🥇 Top result now: {results[0]['title']}")
+
+
+if __name__ == "__main__":
+    main()
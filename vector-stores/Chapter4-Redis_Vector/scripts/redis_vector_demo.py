@@ -1,81 +1,166 @@
+import os
+import sys
+
 import redis
 import numpy as np
 
+# Shared helpers (hot-path timing) live in <repo>/shared
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "shared"))
+from instrumentation import count, enabled as timing_enabled, request, stage
+from exact_rerank import rerank_hits
+
 # Connect to Redis Stack
 r = redis.Redis(host='localhost', port=6379, decode_responses=False)
 
-def create_vector_index():
+# Callbacks run after every document write as listener(doc_key, category, embedding),
+# e.g. to invalidate cached search results
+write_listeners = []
+# Called once per batch of writes as listener(doc_keys, categories, embeddings)
+# with an (n, dim) embedding matrix; bulk ingest calls them once per chunk
+batch_write_listeners = []
+
+# NumPy dtype used to encode vectors for each supported index TYPE
+VECTOR_DTYPES = {"FLOAT32": np.float32, "FLOAT16": np.float16}
+
+def encode_vector(vector, vector_type="FLOAT32"):
+    """
+    Encode a vector as the raw bytes RediSearch expects for the index TYPE.
+    FLOAT16 halves the blob size (3 KB instead of 6 KB at 1536 dims).
+    """
+    return np.asarray(vector).astype(VECTOR_DTYPES[vector_type]).tobytes()
+
+def create_vector_index(index_name="ai_docs_index", prefix="doc:", vector_type="FLOAT32",
+                        dim=1536, m=16, ef_construction=200, ef_runtime=10):
     """
     Create a RediSearch index optimized for vector search using HNSW algorithm.
     This index supports both vector similarity and traditional text/tag filtering.
+
+    M, EF_CONSTRUCTION and EF_RUNTIME default to the RediSearch defaults;
+    vector_type may be FLOAT32 or FLOAT16.
     """
     try:
         r.execute_command(
-            "FT.CREATE", "ai_docs_index",      # Index name
+            "FT.CREATE", index_name,           # Index name
             "ON", "HASH",                      # Use Redis HASH data structure
-            "PREFIX", "1", "doc:",             # Index keys starting with 'doc:'
+            "PREFIX", "1", prefix,             # Index keys starting with the prefix (default 'doc:')
             "SCHEMA",                          # Define searchable fields
             "title", "TEXT", "WEIGHT", "2.0",  # Title field with higher weight
             "content", "TEXT",                 # Full-text searchable content
             "category", "TAG",                 # Category for filtering
             "timestamp", "NUMERIC",            # Timestamp for time-based queries
-            "embedding", "VECTOR", "HNSW", "6", # Vector field configuration
-            "TYPE", "FLOAT32",                 # Vector data type
-            "DIM", "1536",                     # Dimensionality (matches OpenAI)
-            "DISTANCE_METRIC", "COSINE"        # Similarity metric
+            "embedding", "VECTOR", "HNSW", "12", # Vector field configuration
+            "TYPE", vector_type,               # Vector data type (FLOAT32 or FLOAT16)
+            "DIM", str(dim),                   # Dimensionality (1536 matches OpenAI)
+            "DISTANCE_METRIC", "COSINE",       # Similarity metric
+            "M", str(m),                       # Max graph edges per node
+            "EF_CONSTRUCTION", str(ef_construction),  # Candidate list size while building
+            "EF_RUNTIME", str(ef_runtime)      # Default candidate list size while querying
         )
-        print("✅ Vector index created successfully")
+        print(f"✅ Vector index '{index_name}' created successfully")
     except redis.exceptions.ResponseError as e:
         if "Index already exists" in str(e):
             print("ℹ️ Index already exists, continuing...")
         else:
             raise e
 
-def insert_document(doc_id, title, content, category, embedding_vector):
+def insert_document(doc_id, title, content, category, embedding_vector, timestamp=None, key_prefix="doc:",
+                    vector_type="FLOAT32"):
     """
     Insert a document with its embedding into Redis.
     Each document is stored as a Redis Hash with multiple fields.
     """
-    # Convert numpy array to bytes for Redis storage
-    embedding_bytes = embedding_vector.astype('float32').tobytes()
+    # Convert numpy array to bytes for Redis storage (must match the index TYPE)
+    embedding_bytes = encode_vector(embedding_vector, vector_type)
+    if timestamp is None:
+        timestamp = np.random.uniform(1640995200, 1672531200)  # Random timestamp
     
     # Store document with all metadata
-    doc_key = f"doc:{doc_id}"
+    doc_key = f"{key_prefix}{doc_id}"
     r.hset(doc_key, mapping={
         "title": title,
         "content": content,
         "category": category,
-        "timestamp": int(np.random.uniform(1640995200, 1672531200)),  # Random timestamp
+        "timestamp": int(timestamp),
         "embedding": embedding_bytes
     })
+    for listener in write_listeners:
+        listener(doc_key, category, embedding_vector)
+    for listener in batch_write_listeners:
+        listener([doc_key], [category], np.asarray(embedding_vector)[None, :])
     print(f"📄 Document '{title}' inserted with key {doc_key}")
 
-def vector_search(query_embedding, k=5, category_filter=None):
+def build_search_command(query_embedding, k=5, category_filter=None, index_name="ai_docs_index",
+                         time_range=None, vector_type="FLOAT32", ef_runtime=None):
     """
-    Perform semantic vector search with optional category filtering.
-    Returns the k most similar documents.
+    Build the FT.SEARCH arguments for a KNN query with optional category and
+    time filtering. ef_runtime overrides the index's EF_RUNTIME for this query only.
     """
-    query_bytes = query_embedding.astype('float32').tobytes()
+    query_bytes = encode_vector(query_embedding, vector_type)
     
     # Build search query with optional filtering
-    search_query = "*"
+    filters = []
     if category_filter:
-        search_query = f"@category:{{{category_filter}}}"
+        filters.append(f"@category:{{{category_filter}}}")
+    if time_range:
+        filters.append(f"@timestamp:[{int(time_range[0])} {int(time_range[1])}]")
+    search_query = f"({' '.join(filters)})" if filters else "*"
     
     # Add KNN vector search clause
-    search_query += f"=>[KNN {k} @embedding $query_vec AS similarity_score]"
+    params = ["query_vec", query_bytes]
+    if ef_runtime is not None:
+        search_query += f"=>[KNN {k} @embedding $query_vec EF_RUNTIME $ef_runtime AS similarity_score]"
+        params += ["ef_runtime", ef_runtime]
+    else:
+        search_query += f"=>[KNN {k} @embedding $query_vec AS similarity_score]"
     
-    # Execute the search
-    results = r.execute_command(
-        "FT.SEARCH", "ai_docs_index",
+    return [
+        "FT.SEARCH", index_name,
         search_query,
-        "PARAMS", "2", "query_vec", query_bytes,
+        "PARAMS", str(len(params)), *params,
         "SORTBY", "similarity_score",
         "RETURN", "4", "title", "category", "similarity_score", "content",
+        "LIMIT", "0", str(k),              # FT.SEARCH returns only 10 hits unless told otherwise
         "DIALECT", "2"
-    )
+    ]
+
+def vector_search(query_embedding, k=5, category_filter=None, index_name="ai_docs_index", time_range=None,
+                  vector_type="FLOAT32", ef_runtime=None):
+    """
+    Perform semantic vector search with optional category and time filtering.
+    Returns the k most similar documents.
+    """
+    # Stages are no-ops unless timing is enabled (VECTORDB_TIMING=1)
+    with request("redis.vector_search"):
+        with stage("redis.encode"):
+            command = build_search_command(
+                query_embedding, k, category_filter, index_name, time_range, vector_type, ef_runtime
+            )
+        if timing_enabled():
+            count("redis.bytes_sent", sum(len(arg) for arg in command if isinstance(arg, (bytes, str))))
+        with stage("redis.round_trip"):
+            results = r.execute_command(*command)
+        with stage("redis.decode"):
+            hits = parse_search_results(results)
+        count("redis.hits_returned", len(hits))
     
-    return parse_search_results(results)
+    return hits
+
+def vector_search_reranked(store, query_embedding, k=5, oversample=4, **search_kwargs):
+    """
+    Two-stage search: fetch k * oversample candidates from the index, then
+    re-rank them exactly against `store` (an exact_rerank.VectorStore keyed by
+    document key) and return the best k, each with an added "exact_score".
+    Keep the store current with
+    write_listeners.append(lambda key, _category, vec: store.put([key], [vec])).
+    """
+    hits = vector_search(query_embedding, k=k * oversample, **search_kwargs)
+    with stage("redis.rerank"):
+        # Hits missing from the store keep their index score, as a cosine similarity
+        reranked = rerank_hits(store, query_embedding, hits, k, key=lambda hit: hit["key"],
+                               score=lambda hit: 1 - float(hit["similarity_score"]))
+    for hit, score in reranked:
+        hit["exact_score"] = score
+    return [hit for hit, _ in reranked]
 
 def parse_search_results(raw_results):
     """